@@ -0,0 +1,367 @@
+import sqlite3
+import pickle
+import hashlib
+import os
+import collections
+
+#Tagging cache consulted by all of LEXenstein's classes:
+tagging_cache = None
+
+class FeatureCache:
+
+	def __init__(self, path, max_entries=10000000):
+		"""
+		Creates an instance of the FeatureCache class.
+		A FeatureCache stores feature values on disk, so that they do not have to be calculated again for instances that were already seen.
+		When the cache holds more than "max_entries" values, the least recently used ones are discarded.
+
+		@param path: Path to the file in which to store the cache.
+		If the file already exists, its values are reused.
+		@param max_entries: Maximum number of feature values to be kept in the cache.
+		"""
+		self.path = path
+		self.max_entries = max_entries
+		#Hit and miss counters:
+		self.hits = 0
+		self.misses = 0
+		self.connect()
+
+	def connect(self):
+		"""
+		Opens the connection to the cache file.
+		Must be called again by processes forked from the one that created the cache.
+		"""
+		self.connection = sqlite3.connect(self.path, timeout=600)
+		self.connection.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB, used INTEGER)')
+		self.connection.execute('CREATE INDEX IF NOT EXISTS entries_used ON entries (used)')
+		self.connection.commit()
+		self.clock = self.connection.execute('SELECT MAX(used) FROM entries').fetchone()[0] or 0
+		#Number of values stored, which is kept up to date by each write instead of being counted again:
+		self.entries = self.size()
+		self.writes = 0
+
+	def getValues(self, keys):
+		"""
+		Retrieves the cached values of a set of keys.
+
+		@param keys: List of keys to be retrieved.
+		@return: A dictionary that assigns the keys found in the cache to their values.
+		"""
+		result = {}
+		keys = list(set(keys))
+		for i in range(0, len(keys), 500):
+			batch = keys[i:i+500]
+			query = 'SELECT key, value FROM entries WHERE key IN (' + ','.join(['?']*len(batch)) + ')'
+			for key, value in self.connection.execute(query, batch):
+				result[key] = pickle.loads(bytes(value))
+
+		#Mark values found as recently used:
+		if len(result)>0:
+			self.clock += 1
+			self.connection.executemany('UPDATE entries SET used=? WHERE key=?', [(self.clock, key) for key in result])
+			self.connection.commit()
+
+		self.hits += len(result)
+		self.misses += len(keys)-len(result)
+		return result
+
+	def setValues(self, values):
+		"""
+		Stores a set of values in the cache.
+		If the cache exceeds its maximum size, the least recently used values are discarded.
+
+		@param values: A dictionary that assigns keys to values.
+		"""
+		if len(values)==0:
+			return
+		self.clock += 1
+		entries = [(sqlite3.Binary(pickle.dumps(values[key], protocol=pickle.HIGHEST_PROTOCOL)), self.clock, key) for key in values]
+		self.connection.executemany('UPDATE entries SET value=?, used=? WHERE key=?', entries)
+		cursor = self.connection.executemany('INSERT OR IGNORE INTO entries (value, used, key) VALUES (?, ?, ?)', entries)
+		self.entries += max(cursor.rowcount, 0)
+
+		#Other processes may write to the same file, so the values stored are counted again from time to time:
+		self.writes += 1
+		if self.writes % 1000==0:
+			self.entries = self.size()
+
+		#Evict least recently used values:
+		if self.entries>self.max_entries:
+			self.entries = self.size()
+			if self.entries>self.max_entries:
+				cursor = self.connection.execute('DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY used LIMIT ?)', (self.entries-self.max_entries,))
+				self.entries -= max(cursor.rowcount, 0)
+		self.connection.commit()
+
+	def size(self):
+		"""
+		Returns the number of values stored in the cache.
+
+		@return: The number of values in the cache.
+		"""
+		return self.connection.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+	def getHitRate(self):
+		"""
+		Returns the proportion of values requested that were found in the cache.
+
+		@return: The hit rate of the cache, between 0.0 and 1.0.
+		"""
+		total = self.hits+self.misses
+		if total==0:
+			return 0.0
+		return float(self.hits)/float(total)
+
+	def resetCounters(self):
+		"""
+		Resets the hit and miss counters of the cache.
+		"""
+		self.hits = 0
+		self.misses = 0
+
+	def clear(self):
+		"""
+		Removes all values from the cache.
+		"""
+		self.connection.execute('DELETE FROM entries')
+		self.connection.commit()
+		self.entries = 0
+
+	def close(self):
+		"""
+		Closes the cache file.
+		"""
+		self.connection.close()
+
+class TaggingCache(FeatureCache):
+
+	def __init__(self, path, max_entries=10000000):
+		"""
+		Creates an instance of the TaggingCache class.
+		A TaggingCache stores the POS tags of sentences on disk, so that they do not have to be tagged again.
+		Tags are indexed by the tagging model and the tokens of each sentence.
+		When the cache holds more than "max_entries" sentences, the least recently used ones are discarded.
+
+		@param path: Path to the file in which to store the cache.
+		If the file already exists, its sentences are reused.
+		@param max_entries: Maximum number of tagged sentences to be kept in the cache.
+		"""
+		FeatureCache.__init__(self, path, max_entries)
+
+	def tagSentences(self, tagger, sentences):
+		"""
+		Tags a set of sentences, sending to the tagger only the ones not in the cache, in a single batch.
+
+		@param tagger: A tagger with a "tag_sents" method, such as an instance of nltk.tag.stanford.StanfordPOSTagger.
+		@param sentences: List of sentences, each one a list of tokens.
+		@return A list with the tagged tokens of each sentence, as produced by the tagger.
+		"""
+		signature = self.getTaggerSignature(tagger)
+		keys = [self.getSentenceKey(signature, sentence) for sentence in sentences]
+		cached = self.getValues(keys)
+
+		#Tag missing sentences:
+		missing = []
+		missing_sentences = []
+		for i in range(0, len(sentences)):
+			if keys[i] not in cached:
+				cached[keys[i]] = None
+				missing.append(keys[i])
+				missing_sentences.append(sentences[i])
+		if len(missing)>0:
+			tagged_sents = tagger.tag_sents(missing_sentences)
+			new_values = {}
+			for i in range(0, len(missing)):
+				new_values[missing[i]] = tagged_sents[i]
+			self.setValues(new_values)
+			cached.update(new_values)
+		return [cached[key] for key in keys]
+
+	def getTaggerSignature(self, tagger):
+		#Taggers are identified by their models and their modification times:
+		model = getattr(tagger, '_stanford_model', None)
+		if model is None:
+			return tagger.__class__.__name__
+		signature = model
+		if os.path.isfile(model):
+			signature += ':' + repr(os.path.getmtime(model))
+		return signature
+
+	def getSentenceKey(self, signature, sentence):
+		key = signature + '\t' + '\0'.join(sentence)
+		if not isinstance(key, bytes):
+			key = key.encode('utf8')
+		return hashlib.sha1(key).hexdigest()
+
+class MorphologyCache(FeatureCache):
+
+	def __init__(self, path, max_entries=10000000, memory_entries=100000):
+		"""
+		Creates an instance of the MorphologyCache class.
+		A MorphologyCache stores the results of the MorphAdorner Toolkit, so that the same words do not have to be lemmatized, inflected or conjugated again.
+		Results are indexed by the jar that produced them and the arguments it received.
+		The most recently used results are also kept in memory, and the least recently used ones are discarded from memory and disk when their limits are reached.
+
+		@param path: Path to the file in which to store the cache.
+		If the file already exists, its results are reused.
+		@param max_entries: Maximum number of results to be kept on disk.
+		@param memory_entries: Maximum number of results to be kept in memory.
+		"""
+		self.memory = collections.OrderedDict()
+		self.memory_entries = memory_entries
+		self.memory_hits = 0
+		FeatureCache.__init__(self, path, max_entries)
+
+	def getValues(self, keys):
+		"""
+		Retrieves the cached values of a set of keys, looking first in memory and then on disk.
+
+		@param keys: List of keys to be retrieved.
+		@return: A dictionary that assigns the keys found in the cache to their values.
+		"""
+		result = {}
+		missing = []
+		for key in set(keys):
+			if key in self.memory:
+				result[key] = self.remember(key, self.memory.pop(key))
+			else:
+				missing.append(key)
+		self.memory_hits += len(result)
+		self.hits += len(result)
+		if len(missing)>0:
+			found = FeatureCache.getValues(self, missing)
+			for key in found:
+				result[key] = self.remember(key, found[key])
+		return result
+
+	def setValues(self, values):
+		"""
+		Stores a set of values in memory and on disk.
+
+		@param values: A dictionary that assigns keys to values.
+		"""
+		FeatureCache.setValues(self, values)
+		for key in values:
+			self.memory.pop(key, None)
+			self.remember(key, values[key])
+
+	def remember(self, key, value):
+		#Add value to the memory tier as the most recently used one:
+		self.memory[key] = value
+		while len(self.memory)>self.memory_entries:
+			self.memory.popitem(last=False)
+		return value
+
+	def getResults(self, jar, lines, function, mode=None):
+		"""
+		Returns the output of a jar for a set of input lines, sending to the jar only the lines not in the cache, in a single batch.
+
+		@param jar: Path to the jar.
+		@param lines: List of input lines, each one encoding the arguments of a request to the jar.
+		@param function: Function that receives a list of input lines and returns the output line of each of them.
+		@param mode: Name of the way in which the jar is run, such as "workers" or "process".
+		Results produced in different modes are stored apart.
+		@return A list with the output line of each input line, in the same order.
+		"""
+		signature = self.getJarSignature(jar, mode)
+		keys = [self.getLineKey(signature, line) for line in lines]
+		cached = self.getValues(keys)
+
+		#Send missing lines, each only once:
+		missing = []
+		missing_lines = []
+		for i in range(0, len(lines)):
+			if keys[i] not in cached:
+				cached[keys[i]] = None
+				missing.append(keys[i])
+				missing_lines.append(lines[i])
+		if len(missing)>0:
+			results = function(missing_lines)
+			new_values = {}
+			for i in range(0, len(missing)):
+				new_values[missing[i]] = results[i] if i<len(results) else ''
+			#Results misaligned with their inputs are not kept:
+			if len(results)==len(missing):
+				self.setValues(new_values)
+			cached.update(new_values)
+		return [cached[key] for key in keys]
+
+	def getJarSignature(self, jar, mode=None):
+		#Jars are identified by their paths, their modification times and the way in which they are run:
+		signature = jar
+		if os.path.isfile(jar):
+			signature += ':' + repr(os.path.getmtime(jar))
+		if mode:
+			signature += ':' + mode
+		return signature
+
+	def getLineKey(self, signature, line):
+		key = signature + '\t' + line
+		if not isinstance(key, bytes):
+			key = key.encode('utf8')
+		return hashlib.sha1(key).hexdigest()
+
+	def getStats(self):
+		"""
+		Returns the usage statistics of the cache.
+
+		@return A dictionary with the following keys: memory_hits (results found in memory), disk_hits (results found on disk), misses (results sent to the jars), hit_rate, memory_size and disk_size (number of results stored).
+		"""
+		stats = {}
+		stats['memory_hits'] = self.memory_hits
+		stats['disk_hits'] = self.hits-self.memory_hits
+		stats['misses'] = self.misses
+		stats['hit_rate'] = self.getHitRate()
+		stats['memory_size'] = len(self.memory)
+		stats['disk_size'] = self.size()
+		return stats
+
+	def resetCounters(self):
+		"""
+		Resets the hit and miss counters of the cache.
+		"""
+		FeatureCache.resetCounters(self)
+		self.memory_hits = 0
+
+	def clear(self):
+		"""
+		Removes all results from the cache.
+		"""
+		FeatureCache.clear(self)
+		self.memory.clear()
+
+def setTaggingCache(path, max_entries=10000000):
+	"""
+	Sets the tagging cache consulted by all of LEXenstein's classes that use POS taggers, such as PaetzoldGenerator, POSProbSelector and FeatureEstimator.
+
+	@param path: Path to the file in which to store the cache, or None to stop using a cache.
+	@param max_entries: Maximum number of tagged sentences to be kept in the cache.
+	@return The TaggingCache object created, or None.
+	"""
+	global tagging_cache
+	if tagging_cache:
+		tagging_cache.close()
+	tagging_cache = None
+	if path is not None:
+		tagging_cache = TaggingCache(path, max_entries)
+	return tagging_cache
+
+def getTaggingCache():
+	"""
+	Returns the tagging cache consulted by LEXenstein's classes.
+
+	@return A TaggingCache object, or None if no cache was set with setTaggingCache.
+	"""
+	return tagging_cache
+
+def tagSentences(tagger, sentences):
+	"""
+	Tags a set of sentences, consulting the tagging cache set with setTaggingCache, if any.
+
+	@param tagger: A tagger with a "tag_sents" method, such as an instance of nltk.tag.stanford.StanfordPOSTagger.
+	@param sentences: List of sentences, each one a list of tokens.
+	@return A list with the tagged tokens of each sentence, as produced by the tagger.
+	"""
+	if tagging_cache:
+		return tagging_cache.tagSentences(tagger, sentences)
+	return tagger.tag_sents(sentences)
@@ -0,0 +1,1094 @@
+import os
+import hashlib
+import tempfile
+import heapq
+import math
+import numpy
+
+#Identifiers of the files of each type of count store:
+COUNT_STORE_MAGIC = b'LXNGRAM1'
+BLOOM_FILTER_MAGIC = b'LXBLOOM1'
+COUNT_MIN_SKETCH_MAGIC = b'LXSKETC1'
+NGRAM_TRIE_MAGIC = b'LXNGTRIE'
+
+#Size of the header of count store files, in bytes:
+COUNT_STORE_HEADER = 64
+
+def getKeyHash(key):
+	"""
+	Returns the 64 bit hash of a key, as used by LEXenstein's count stores.
+
+	@param key: An n-gram, or any other string.
+	@return The hash of the key as an integer.
+	"""
+	if not isinstance(key, bytes):
+		key = key.encode('utf8')
+	return int(numpy.frombuffer(hashlib.md5(key).digest()[0:8], dtype='<u8')[0])
+
+def getKeyHashes(keys):
+	"""
+	Returns the 64 bit hashes of a list of keys.
+
+	@param keys: List of n-grams, or of any other strings.
+	@return A numpy array with the hash of each key.
+	"""
+	digests = []
+	for key in keys:
+		if not isinstance(key, bytes):
+			key = key.encode('utf8')
+		digests.append(hashlib.md5(key).digest()[0:8])
+	return numpy.frombuffer(b''.join(digests), dtype='<u8').astype(numpy.uint64)
+
+def readCountsFiles(counts_files):
+	#Read the keys and counts of files in the format produced by the "-write" option of SRILM's ngram-count:
+	if not isinstance(counts_files, list):
+		counts_files = [counts_files]
+	c = 0
+	for counts_file in counts_files:
+		f = open(counts_file)
+		for line in f:
+			c += 1
+			if c % 1000000 == 0:
+				print(str(c) + ' n-grams read.')
+			data = line.strip().split('\t')
+			if len(data)>1:
+				yield data[0], int(data[1])
+		f.close()
+
+def openCountStore(path):
+	"""
+	Opens a count store file created by any of the functions in this module.
+
+	@param path: Path to the count store file.
+	@return An object that can be used in place of the shelve files produced by the "addNgramCountsFileToShelve" function from the "util" module, or None if the file is not a count store.
+	"""
+	if not os.path.isfile(path):
+		return None
+	magic, fields = readHeader(path)
+	if magic==COUNT_STORE_MAGIC:
+		return NgramCountStore(path)
+	elif magic==BLOOM_FILTER_MAGIC:
+		return BloomFilter(path)
+	elif magic==COUNT_MIN_SKETCH_MAGIC:
+		return CountMinSketch(path)
+	elif magic==NGRAM_TRIE_MAGIC:
+		return NgramTrie(path)
+	return None
+
+def readHeader(path):
+	#Read the identifier and the numeric fields of the header of a count store file:
+	f = open(path, 'rb')
+	header = f.read(COUNT_STORE_HEADER)
+	f.close()
+	if len(header)<COUNT_STORE_HEADER:
+		return None, []
+	fields = numpy.frombuffer(header[8:COUNT_STORE_HEADER], dtype='<u8').tolist()
+	return header[0:8], fields
+
+def writeHeader(f, magic, fields):
+	#Write the identifier and the numeric fields of the header of a count store file:
+	values = numpy.zeros((COUNT_STORE_HEADER-8)//8, dtype='<u8')
+	values[0:len(fields)] = fields
+	f.write(magic + values.tobytes())
+
+def getCounts(counts, keys):
+	"""
+	Retrieves the counts of a list of keys from a count store, a shelve file, or a dictionary.
+	Count stores resolve all keys in a single batched lookup.
+
+	@param counts: A count store, shelve file, or dictionary.
+	@param keys: List of keys.
+	@return A dictionary that assigns each key to its count, or to None if the key is not in the counts.
+	"""
+	if hasattr(counts, 'getCounts'):
+		return counts.getCounts(keys)
+	result = {}
+	for key in keys:
+		result[key] = counts.get(key, None)
+	return result
+
+def createNgramCountStore(counts_files, output, buffer_size=10000000):
+	"""
+	Creates an n-gram count store from n-gram counts files.
+	The files must be in the format produced by the "-write" option of SRILM's ngram-count application.
+	The counts of n-grams that appear more than once are summed.
+	The files are read sequentially, and at most "buffer_size" n-grams are held in memory at a time.
+
+	@param counts_files: Path to an n-gram counts file, or list of paths.
+	@param output: Path to the count store file to be created.
+	@param buffer_size: Maximum number of n-grams to be sorted in memory at a time.
+	"""
+	#Produce sorted runs of hashes and counts:
+	print('Reading n-grams files...')
+	runs = []
+	keys = []
+	counts = []
+	for key, count in readCountsFiles(counts_files):
+		keys.append(key)
+		counts.append(count)
+		if len(keys)==buffer_size:
+			runs.append(createSortedRun(keys, counts))
+			keys = []
+			counts = []
+	if len(keys)>0 or len(runs)==0:
+		runs.append(createSortedRun(keys, counts))
+	keys = None
+	counts = None
+	print('N-grams files read!')
+
+	#Merge runs:
+	print('Saving count store...')
+	if len(runs)==1:
+		hashes, values = numpy.load(runs[0][0]), numpy.load(runs[0][1])
+		writeCountStore(output, hashes, values)
+	else:
+		writeCountStore(output, *mergeSortedRuns(runs))
+	for run in runs:
+		os.remove(run[0])
+		os.remove(run[1])
+	print('Finished!')
+
+def createSortedRun(keys, counts):
+	#Sort a set of keys by hash, sum the counts of repeated keys, and save them to temporary files:
+	hashes, values = aggregateCounts(getKeyHashes(keys), numpy.array(counts, dtype=numpy.uint64))
+	files = []
+	for array in [hashes, values]:
+		handle, path = tempfile.mkstemp(suffix='.npy')
+		os.close(handle)
+		numpy.save(path, array)
+		files.append(path)
+	return files
+
+def aggregateCounts(hashes, counts):
+	#Sort hashes and sum the counts of repeated ones:
+	if len(hashes)==0:
+		return hashes, counts
+	order = numpy.argsort(hashes, kind='mergesort')
+	hashes = hashes[order]
+	counts = counts[order]
+	starts = numpy.concatenate(([0], numpy.nonzero(hashes[1:]!=hashes[:-1])[0]+1))
+	return hashes[starts], numpy.add.reduceat(counts, starts)
+
+def mergeSortedRuns(runs):
+	#Merge sorted runs of hashes and counts, which are memory-mapped and read in blocks:
+	def iterateRun(run):
+		hashes = numpy.load(run[0], mmap_mode='r')
+		values = numpy.load(run[1], mmap_mode='r')
+		for i in range(0, len(hashes), 1000000):
+			block_hashes = numpy.array(hashes[i:i+1000000]).tolist()
+			block_values = numpy.array(values[i:i+1000000]).tolist()
+			for j in range(0, len(block_hashes)):
+				yield block_hashes[j], block_values[j]
+	handle, hashes_path = tempfile.mkstemp()
+	os.close(handle)
+	handle, values_path = tempfile.mkstemp()
+	os.close(handle)
+	hashes_file = open(hashes_path, 'wb')
+	values_file = open(values_path, 'wb')
+	last = None
+	total = 0
+	size = 0
+	block_hashes = []
+	block_values = []
+	for key, count in heapq.merge(*[iterateRun(run) for run in runs]):
+		if key==last:
+			total += count
+		else:
+			if last is not None:
+				block_hashes.append(last)
+				block_values.append(total)
+				size += 1
+			last = key
+			total = count
+		if len(block_hashes)==1000000:
+			hashes_file.write(numpy.array(block_hashes, dtype='<u8').tobytes())
+			values_file.write(numpy.array(block_values, dtype='<u8').tobytes())
+			block_hashes = []
+			block_values = []
+	if last is not None:
+		block_hashes.append(last)
+		block_values.append(total)
+		size += 1
+	hashes_file.write(numpy.array(block_hashes, dtype='<u8').tobytes())
+	values_file.write(numpy.array(block_values, dtype='<u8').tobytes())
+	hashes_file.close()
+	values_file.close()
+	hashes = numpy.memmap(hashes_path, dtype='<u8', mode='r', shape=(size,))
+	values = numpy.memmap(values_path, dtype='<u8', mode='r', shape=(size,))
+	os.remove(hashes_path)
+	os.remove(values_path)
+	return hashes, values
+
+def writeCountStore(output, hashes, counts):
+	#Write the header, the sorted hashes, and the counts packed in the smallest integer type that fits them:
+	count_type = numpy.dtype('<u4')
+	if len(counts)>0 and int(numpy.max(counts))>=2**32:
+		count_type = numpy.dtype('<u8')
+	f = open(output, 'wb')
+	writeHeader(f, COUNT_STORE_MAGIC, [len(hashes), count_type.itemsize])
+	for i in range(0, len(hashes), 10000000):
+		f.write(numpy.asarray(hashes[i:i+10000000], dtype='<u8').tobytes())
+	for i in range(0, len(counts), 10000000):
+		f.write(numpy.asarray(counts[i:i+10000000]).astype(count_type).tobytes())
+	f.close()
+
+class NgramCountStore:
+
+	def __init__(self, path):
+		"""
+		Creates an instance of the NgramCountStore class.
+		An NgramCountStore offers read-only access to n-gram counts through a memory map.
+		N-grams are identified by 64 bit hashes, so distinct n-grams can be confused with a negligible probability.
+		It can be used in place of the shelve files produced by the "addNgramCountsFileToShelve" function from the "util" module.
+
+		@param path: Path to a count store file created with the createNgramCountStore function.
+		"""
+		self.path = path
+		magic, fields = readHeader(path)
+		size = fields[0]
+		itemsize = fields[1]
+		self.hashes = numpy.memmap(path, dtype='<u8', mode='r', offset=COUNT_STORE_HEADER, shape=(size,))
+		self.counts = numpy.memmap(path, dtype='<u'+str(itemsize), mode='r', offset=COUNT_STORE_HEADER+8*size, shape=(size,))
+
+	def __len__(self):
+		return len(self.hashes)
+
+	def __contains__(self, key):
+		return self.getIndex(key)>=0
+
+	def __getitem__(self, key):
+		index = self.getIndex(key)
+		if index<0:
+			raise KeyError(key)
+		return int(self.counts[index])
+
+	def get(self, key, default=None):
+		index = self.getIndex(key)
+		if index<0:
+			return default
+		return int(self.counts[index])
+
+	def getCounts(self, keys):
+		"""
+		Retrieves the counts of a list of keys in a single batched lookup.
+
+		@param keys: List of keys.
+		@return A dictionary that assigns each key to its count, or to None if the key is not in the store.
+		"""
+		keys = list(keys)
+		result = {}
+		if len(keys)==0:
+			return result
+		indexes = self.getIndexes(getKeyHashes(keys))
+		found = indexes>=0
+		values = numpy.zeros(len(keys), dtype=numpy.uint64)
+		values[found] = self.counts[indexes[found]]
+		values = values.tolist()
+		found = found.tolist()
+		for i in range(0, len(keys)):
+			if found[i]:
+				result[keys[i]] = values[i]
+			else:
+				result[keys[i]] = None
+		return result
+
+	def getIndexes(self, hashes):
+		#Find the positions of a set of hashes, visiting the store in sorted order:
+		result = numpy.zeros(len(hashes), dtype=numpy.int64)-1
+		if len(self.hashes)==0:
+			return result
+		order = numpy.argsort(hashes)
+		indexes = numpy.searchsorted(self.hashes, hashes[order])
+		valid = indexes<len(self.hashes)
+		valid[valid] = self.hashes[indexes[valid]]==hashes[order][valid]
+		result[order[valid]] = indexes[valid]
+		return result
+
+	def getIndex(self, key):
+		#Find the position of a key through binary search over the hashes:
+		if len(self.hashes)==0:
+			return -1
+		hash = numpy.uint64(getKeyHash(key))
+		index = int(numpy.searchsorted(self.hashes, hash))
+		if index<len(self.hashes) and self.hashes[index]==hash:
+			return index
+		return -1
+
+	def close(self):
+		"""
+		Closes the count store file.
+		"""
+		self.hashes = None
+		self.counts = None
+
+def getBloomFilterSize(items, false_positive_rate):
+	"""
+	Returns the optimal dimensions of a Bloom filter.
+
+	@param items: Number of items to be inserted in the filter.
+	@param false_positive_rate: Desired probability of an item not inserted being reported as a member.
+	@return The number of bits and the number of hash functions of the filter.
+	"""
+	items = max(1, items)
+	bits = int(math.ceil(-items*math.log(false_positive_rate)/(math.log(2)**2)))
+	bits = max(8, ((bits+7)//8)*8)
+	hashes = max(1, int(round(float(bits)/items*math.log(2))))
+	return bits, hashes
+
+def getHashPositions(keys, size, hashes):
+	#Produce "hashes" positions between 0 and "size" for each key through double hashing of its MD5 digest:
+	digests = []
+	for key in keys:
+		if not isinstance(key, bytes):
+			key = key.encode('utf8')
+		digests.append(hashlib.md5(key).digest())
+	values = numpy.frombuffer(b''.join(digests), dtype='<u8').astype(numpy.uint64).reshape(-1, 2)
+	steps = numpy.arange(hashes, dtype=numpy.uint64)
+	positions = values[:, 0:1] + steps[numpy.newaxis, :]*(values[:, 1:2] | numpy.uint64(1))
+	return positions % numpy.uint64(size)
+
+def createBloomFilter(counts_files, output, false_positive_rate=0.01, buffer_size=1000000):
+	"""
+	Creates a Bloom filter with the keys of n-gram or dependency link counts files.
+	A Bloom filter only tells whether a key is in the files, and can wrongly report keys not in them as members with probability "false_positive_rate".
+	It occupies -ln(false_positive_rate)/ln(2)^2 bits per key, which is about 1.2 bytes per key for a rate of 0.01.
+	The files must be in the format produced by the "-write" option of SRILM's ngram-count application.
+
+	@param counts_files: Path to a counts file, or list of paths.
+	@param output: Path to the Bloom filter file to be created.
+	@param false_positive_rate: Desired probability of a key not in the files being reported as a member.
+	@param buffer_size: Number of keys to be inserted in the filter at a time.
+	"""
+	#Count keys:
+	print('Counting keys...')
+	items = 0
+	for key, count in readCountsFiles(counts_files):
+		items += 1
+	bits, hashes = getBloomFilterSize(items, false_positive_rate)
+	print('Creating filter with ' + str(bits) + ' bits and ' + str(hashes) + ' hash functions...')
+
+	#Create filter file:
+	f = open(output, 'wb')
+	writeHeader(f, BLOOM_FILTER_MAGIC, [bits, hashes, items])
+	f.seek(COUNT_STORE_HEADER+bits//8-1)
+	f.write(b'\0')
+	f.close()
+	array = numpy.memmap(output, dtype=numpy.uint8, mode='r+', offset=COUNT_STORE_HEADER, shape=(bits//8,))
+
+	#Insert keys:
+	print('Inserting keys...')
+	keys = []
+	for key, count in readCountsFiles(counts_files):
+		keys.append(key)
+		if len(keys)==buffer_size:
+			insertBloomFilterKeys(array, keys, bits, hashes)
+			keys = []
+	insertBloomFilterKeys(array, keys, bits, hashes)
+	array.flush()
+	del array
+	print('Finished!')
+
+def insertBloomFilterKeys(array, keys, bits, hashes):
+	if len(keys)==0:
+		return
+	positions = getHashPositions(keys, bits, hashes).reshape(-1)
+	numpy.bitwise_or.at(array, (positions >> numpy.uint64(3)).astype(numpy.int64), (numpy.uint8(1) << (positions & numpy.uint64(7)).astype(numpy.uint8)))
+
+class BloomFilter:
+
+	def __init__(self, path):
+		"""
+		Creates an instance of the BloomFilter class.
+		A BloomFilter tells whether keys are members of a set, and is much smaller than a count store of the same keys.
+		It can be used in place of the shelve files of binary features, such as the ones added by the addBinaryNGramFrequencyFeature and addBinarySubjectDependencyFeature methods of FeatureEstimator.
+		Keys not in the set are reported as members with the false positive rate with which the filter was created.
+
+		@param path: Path to a Bloom filter file created with the createBloomFilter function.
+		"""
+		self.path = path
+		magic, fields = readHeader(path)
+		self.bits = fields[0]
+		self.hashes = fields[1]
+		self.items = fields[2]
+		self.array = numpy.memmap(path, dtype=numpy.uint8, mode='r', offset=COUNT_STORE_HEADER, shape=(self.bits//8,))
+
+	def __len__(self):
+		return self.items
+
+	def __contains__(self, key):
+		return self.getMembership([key])[0]
+
+	def getMembership(self, keys):
+		"""
+		Tells whether each key in a list is a member of the filter.
+
+		@param keys: List of keys.
+		@return A numpy array of booleans, one per key.
+		"""
+		if len(keys)==0:
+			return numpy.zeros(0, dtype=bool)
+		positions = getHashPositions(keys, self.bits, self.hashes)
+		values = self.array[(positions >> numpy.uint64(3)).astype(numpy.int64)]
+		present = (values >> (positions & numpy.uint64(7)).astype(numpy.uint8)) & numpy.uint8(1)
+		return present.all(axis=1)
+
+	def getCounts(self, keys):
+		"""
+		Retrieves the membership of a list of keys, in the format of the getCounts function.
+		Since filters hold no counts, members are assigned a count of 1.
+
+		@param keys: List of keys.
+		@return A dictionary that assigns each key to 1 if it is a member, or to None otherwise.
+		"""
+		keys = list(keys)
+		result = {}
+		membership = self.getMembership(keys).tolist()
+		for i in range(0, len(keys)):
+			if membership[i]:
+				result[keys[i]] = 1
+			else:
+				result[keys[i]] = None
+		return result
+
+	def close(self):
+		"""
+		Closes the Bloom filter file.
+		"""
+		self.array = None
+
+def getCountMinSketchSize(memory=None, epsilon=None, delta=0.01):
+	"""
+	Returns the dimensions of a count-min sketch that fits a memory budget or an error bound.
+	A sketch of width w and depth d never underestimates counts, and overestimates a count by more than (e/w)*N with probability at most e^-d, where N is the sum of all counts inserted.
+	For example, a sketch of 5 rows and 2^27 counters per row occupies 2.5GB, and with probability 0.993 overestimates a count by no more than 2*10^-8*N.
+
+	@param memory: Memory budget of the sketch, in bytes.
+	If provided, the width is the largest that fits the budget with the depth derived from "delta".
+	@param epsilon: Desired error, as a proportion of the sum of all counts.
+	Used only if "memory" is None.
+	@param delta: Desired probability of the error being exceeded.
+	@return The width and the depth of the sketch.
+	"""
+	depth = max(1, int(math.ceil(math.log(1.0/delta))))
+	if memory is not None:
+		width = max(1, int(memory)//(4*depth))
+	else:
+		width = max(1, int(math.ceil(math.e/epsilon)))
+	return width, depth
+
+def getCountMinSketchError(width, depth, total):
+	"""
+	Returns the error bounds of a count-min sketch.
+
+	@param width: Number of counters per row of the sketch.
+	@param depth: Number of rows of the sketch.
+	@param total: Sum of all counts inserted in the sketch.
+	@return The maximum overestimation of a count, and the probability of it being exceeded.
+	"""
+	return math.e/width*total, math.exp(-depth)
+
+def createCountMinSketch(counts_files, output, width=None, depth=None, memory=None, buffer_size=1000000):
+	"""
+	Creates a count-min sketch with the approximate counts of n-gram counts files, in a single pass over the files.
+	The sketch uses conservative update: each insertion only raises the counters needed to keep the estimate of its key correct.
+	This never makes estimates lower than the true counts, and reduces the overestimation of standard count-min sketches.
+	The files must be in the format produced by the "-write" option of SRILM's ngram-count application.
+	Counters are 32 bit, and saturate at 2^32-1.
+
+	@param counts_files: Path to an n-gram counts file, or list of paths.
+	@param output: Path to the count-min sketch file to be created.
+	@param width: Number of counters per row.
+	@param depth: Number of rows.
+	@param memory: Memory budget of the sketch, in bytes.
+	If "width" or "depth" are not provided, they are calculated with the getCountMinSketchSize function.
+	@param buffer_size: Number of n-grams to be inserted in the sketch at a time.
+	"""
+	if width is None or depth is None:
+		if memory is None:
+			memory = 1073741824
+		width, depth = getCountMinSketchSize(memory=memory)
+
+	#Create sketch file:
+	f = open(output, 'wb')
+	writeHeader(f, COUNT_MIN_SKETCH_MAGIC, [width, depth, 0])
+	f.seek(COUNT_STORE_HEADER+4*width*depth-1)
+	f.write(b'\0')
+	f.close()
+	table = numpy.memmap(output, dtype='<u4', mode='r+', offset=COUNT_STORE_HEADER, shape=(depth, width))
+
+	#Insert n-grams:
+	print('Inserting n-grams in a sketch of width ' + str(width) + ' and depth ' + str(depth) + '...')
+	total = 0
+	keys = []
+	counts = []
+	for key, count in readCountsFiles(counts_files):
+		keys.append(key)
+		counts.append(count)
+		total += count
+		if len(keys)==buffer_size:
+			insertCountMinSketchKeys(table, keys, counts)
+			keys = []
+			counts = []
+	insertCountMinSketchKeys(table, keys, counts)
+	table.flush()
+	del table
+
+	#Save the sum of all counts:
+	f = open(output, 'r+b')
+	writeHeader(f, COUNT_MIN_SKETCH_MAGIC, [width, depth, total])
+	f.close()
+	error, probability = getCountMinSketchError(width, depth, total)
+	print('Counts overestimated by at most ' + str(error) + ' with probability ' + str(1.0-probability) + '.')
+	print('Finished!')
+
+def insertCountMinSketchKeys(table, keys, counts):
+	#Insert a batch of keys with conservative update:
+	if len(keys)==0:
+		return
+	depth, width = table.shape
+	
+	#Sum the counts of keys repeated in the batch:
+	unique = {}
+	for i in range(0, len(keys)):
+		unique[keys[i]] = unique.get(keys[i], 0) + counts[i]
+	keys = list(unique.keys())
+	counts = numpy.array([unique[key] for key in keys], dtype=numpy.uint64)
+	
+	#Raise the counters of each key to its current estimate plus its count:
+	positions = getHashPositions(keys, width, depth).astype(numpy.int64)
+	rows = numpy.arange(depth)[numpy.newaxis, :]
+	estimates = table[rows, positions].min(axis=1).astype(numpy.uint64)
+	targets = numpy.minimum(estimates+counts, numpy.uint64(4294967295)).astype(numpy.uint32)
+	for row in range(0, depth):
+		numpy.maximum.at(table[row], positions[:, row], targets)
+
+class CountMinSketch:
+
+	def __init__(self, path):
+		"""
+		Creates an instance of the CountMinSketch class.
+		A CountMinSketch offers approximate n-gram counts in a fixed amount of memory, which can be much smaller than the one needed by exact counts.
+		Estimated counts are never lower than the true counts, and the getErrorBounds method tells how much higher they can be.
+		It can be used in place of the shelve files of any frequency feature of FeatureEstimator.
+		N-grams with an estimated count of 0 are treated as absent.
+
+		@param path: Path to a count-min sketch file created with the createCountMinSketch function.
+		"""
+		self.path = path
+		magic, fields = readHeader(path)
+		self.width = fields[0]
+		self.depth = fields[1]
+		self.total = fields[2]
+		self.table = numpy.memmap(path, dtype='<u4', mode='r', offset=COUNT_STORE_HEADER, shape=(self.depth, self.width))
+
+	def __contains__(self, key):
+		return self.getEstimates([key])[0]>0
+
+	def __getitem__(self, key):
+		estimate = self.getEstimates([key])[0]
+		if estimate==0:
+			raise KeyError(key)
+		return estimate
+
+	def get(self, key, default=None):
+		estimate = self.getEstimates([key])[0]
+		if estimate==0:
+			return default
+		return estimate
+
+	def getEstimates(self, keys):
+		"""
+		Estimates the counts of a list of keys.
+
+		@param keys: List of keys.
+		@return A list with the estimated count of each key.
+		"""
+		if len(keys)==0:
+			return []
+		positions = getHashPositions(keys, self.width, self.depth).astype(numpy.int64)
+		rows = numpy.arange(self.depth)[numpy.newaxis, :]
+		return self.table[rows, positions].min(axis=1).tolist()
+
+	def getCounts(self, keys):
+		"""
+		Estimates the counts of a list of keys, in the format of the getCounts function.
+
+		@param keys: List of keys.
+		@return A dictionary that assigns each key to its estimated count, or to None if it is 0.
+		"""
+		keys = list(keys)
+		result = {}
+		estimates = self.getEstimates(keys)
+		for i in range(0, len(keys)):
+			if estimates[i]>0:
+				result[keys[i]] = estimates[i]
+			else:
+				result[keys[i]] = None
+		return result
+
+	def getErrorBounds(self):
+		"""
+		Returns the error bounds of the sketch.
+
+		@return The maximum overestimation of a count, and the probability of it being exceeded.
+		"""
+		return getCountMinSketchError(self.width, self.depth, self.total)
+
+	def close(self):
+		"""
+		Closes the count-min sketch file.
+		"""
+		self.table = None
+
+def createNgramTrie(counts_files, output, buffer_size=10000000):
+	"""
+	Creates an n-gram trie from n-gram counts files.
+	The trie stores the tokens of each n-gram in reverse order, so that the counts of an n-gram and of all its suffixes are found in a single traversal.
+	Tokens are mapped to integer identifiers, and each level of the trie is stored as sorted arrays in a single memory-mapped file.
+	The files must be in the format produced by the "-write" option of SRILM's ngram-count application.
+	The counts of n-grams that appear more than once are summed.
+	The files are read sequentially, and at most "buffer_size" tokens or n-grams are held in memory at a time: the remaining ones are kept in sorted runs on disk, which are merged.
+
+	@param counts_files: Path to an n-gram counts file, or list of paths.
+	@param output: Path to the trie file to be created.
+	@param buffer_size: Maximum number of tokens or n-grams to be sorted in memory at a time.
+	"""
+	temporary = []
+	try:
+		#Create vocabulary:
+		print('Reading vocabulary...')
+		vocab_path, vocab_offsets, vocab_hashes, vocab_ids, max_order = createTrieVocabulary(counts_files, buffer_size, temporary)
+
+		#Map n-grams to sorted runs of reversed sequences of identifiers, grouped by order:
+		print('Reading n-grams...')
+		runs = {}
+		keys = []
+		counts = []
+		for key, count in readCountsFiles(counts_files):
+			keys.append(key)
+			counts.append(count)
+			if len(keys)==buffer_size:
+				createTrieRuns(keys, counts, vocab_hashes, vocab_ids, runs, temporary)
+				keys = []
+				counts = []
+		if len(keys)>0:
+			createTrieRuns(keys, counts, vocab_hashes, vocab_ids, runs, temporary)
+		keys = None
+		counts = None
+		vocab_hashes = None
+		vocab_ids = None
+
+		#Merge the runs of each order:
+		sequences = {}
+		for order in runs:
+			sequences[order] = mergeTrieRuns(runs[order], order, temporary)
+
+		#Build levels, identifying each node by the position of its parent and its token:
+		print('Building trie...')
+		levels = []
+		for level in range(0, max_order):
+			levels.append(createTrieLevel(sequences, level, temporary))
+
+		#Write trie:
+		print('Saving trie...')
+		size = len(vocab_offsets)-1
+		blob_size = int(vocab_offsets[-1])
+		padded_size = blob_size + (8-blob_size%8)%8
+		f = open(output, 'wb')
+		writeHeader(f, NGRAM_TRIE_MAGIC, [max_order, size, padded_size])
+		f.write(numpy.array([len(level[1]) for level in levels], dtype='<u8').tobytes())
+		f.write(numpy.asarray(vocab_offsets, dtype='<u8').tobytes())
+		blob = open(vocab_path, 'rb')
+		data = blob.read(10000000)
+		while len(data)>0:
+			f.write(data)
+			data = blob.read(10000000)
+		blob.close()
+		f.write(b'\0'*(padded_size-blob_size))
+		for level in range(0, max_order):
+			parents, ids, counts = levels[level]
+			for i in range(0, len(ids), 10000000):
+				f.write(numpy.asarray(ids[i:i+10000000], dtype='<u4').tobytes())
+			if len(ids) % 2==1:
+				f.write(b'\0'*4)
+			for i in range(0, len(counts), 10000000):
+				f.write(numpy.asarray(counts[i:i+10000000], dtype='<u8').tobytes())
+			#Get the range of children of each node:
+			if level<max_order-1:
+				children = levels[level+1][0]
+				for i in range(0, len(ids)+1, 10000000):
+					positions = numpy.arange(i, min(i+10000000, len(ids)+1))
+					f.write(numpy.searchsorted(children, positions).astype('<u8').tobytes())
+		f.close()
+		levels = None
+		sequences = None
+		print('Finished!')
+	finally:
+		for path in temporary:
+			if os.path.exists(path):
+				os.remove(path)
+
+def getTemporaryPath(temporary, suffix=''):
+	#Create a temporary file, to be removed once the trie is written:
+	handle, path = tempfile.mkstemp(suffix=suffix)
+	os.close(handle)
+	temporary.append(path)
+	return path
+
+def encodeToken(token):
+	if isinstance(token, bytes):
+		return token
+	return token.encode('utf8')
+
+def createTrieVocabulary(counts_files, buffer_size, temporary):
+	#Write sorted runs of distinct tokens, and find the largest order:
+	runs = []
+	tokens = set([])
+	max_order = 0
+	for key, count in readCountsFiles(counts_files):
+		key_tokens = key.split(' ')
+		max_order = max(max_order, len(key_tokens))
+		tokens.update(key_tokens)
+		if len(tokens)>=buffer_size:
+			runs.append(writeTokenRun(tokens, temporary))
+			tokens = set([])
+	if len(tokens)>0:
+		runs.append(writeTokenRun(tokens, temporary))
+	tokens = None
+
+	#Merge runs into the sorted vocabulary, stored as a blob of tokens and their offsets:
+	vocab_path = getTemporaryPath(temporary)
+	blob = open(vocab_path, 'wb')
+	files = [open(run, 'rb') for run in runs]
+	lengths = []
+	hashes = []
+	block = []
+	last = None
+	for line in heapq.merge(*files):
+		token = line[0:len(line)-1]
+		if token!=last:
+			blob.write(token)
+			lengths.append(len(token))
+			block.append(token)
+			last = token
+		if len(block)==1000000:
+			hashes.append(getKeyHashes(block))
+			block = []
+	if len(block)>0:
+		hashes.append(getKeyHashes(block))
+	for f in files:
+		f.close()
+	blob.close()
+
+	#Sort the hashes of the tokens, so that identifiers can be found with binary searches:
+	offsets = numpy.zeros(len(lengths)+1, dtype='<u8')
+	offsets[1:] = numpy.cumsum(numpy.array(lengths, dtype=numpy.uint64))
+	lengths = None
+	if len(hashes)>0:
+		hashes = numpy.concatenate(hashes)
+	else:
+		hashes = numpy.zeros(0, dtype=numpy.uint64)
+	ids = numpy.argsort(hashes, kind='mergesort')
+	return vocab_path, offsets, hashes[ids], ids, max_order
+
+def writeTokenRun(tokens, temporary):
+	path = getTemporaryPath(temporary)
+	f = open(path, 'wb')
+	for token in sorted([encodeToken(token) for token in tokens]):
+		f.write(token + b'\n')
+	f.close()
+	return path
+
+def createTrieRuns(keys, counts, vocab_hashes, vocab_ids, runs, temporary):
+	#Find the identifiers of the tokens of the n-grams:
+	split_keys = [key.split(' ') for key in keys]
+	tokens = []
+	for key_tokens in split_keys:
+		tokens.extend(key_tokens)
+	ids = vocab_ids[numpy.searchsorted(vocab_hashes, getKeyHashes(tokens))]
+	tokens = None
+
+	#Sort the reversed sequences of each order, sum the counts of repeated ones, and save them to temporary files:
+	orders = numpy.array([len(key_tokens) for key_tokens in split_keys], dtype=numpy.int64)
+	starts = numpy.zeros(len(orders), dtype=numpy.int64)
+	starts[1:] = numpy.cumsum(orders)[:-1]
+	counts = numpy.array(counts, dtype=numpy.uint64)
+	for order in numpy.unique(orders).tolist():
+		selected = numpy.flatnonzero(orders==order)
+		positions = starts[selected][:, numpy.newaxis] + numpy.arange(order-1, -1, -1)
+		sequences = ids[positions]
+		sequences, values = aggregateSequences(sequences, counts[selected])
+		paths = [getTemporaryPath(temporary, '.npy'), getTemporaryPath(temporary, '.npy')]
+		numpy.save(paths[0], sequences)
+		numpy.save(paths[1], values)
+		if order not in runs:
+			runs[order] = []
+		runs[order].append(paths)
+
+def aggregateSequences(sequences, counts):
+	#Sort sequences lexicographically and sum the counts of repeated ones:
+	if len(sequences)==0:
+		return sequences, counts
+	order = numpy.lexsort(sequences.T[::-1])
+	sequences = sequences[order]
+	counts = counts[order]
+	starts = numpy.concatenate(([0], numpy.flatnonzero(numpy.any(sequences[1:]!=sequences[:-1], axis=1))+1))
+	return sequences[starts], numpy.add.reduceat(counts, starts)
+
+def iterateSequences(sequences, counts, width, block=1000000):
+	#Read the first "width" identifiers of sorted sequences and their counts, a block at a time:
+	for i in range(0, len(sequences), block):
+		block_sequences = [tuple(sequence) for sequence in numpy.array(sequences[i:i+block, 0:width]).tolist()]
+		if counts is None:
+			block_counts = [0]*len(block_sequences)
+		else:
+			block_counts = numpy.array(counts[i:i+block]).tolist()
+		for j in range(0, len(block_sequences)):
+			yield block_sequences[j], block_counts[j]
+
+def mergeTrieRuns(runs, order, temporary):
+	#Merge sorted runs of sequences of the same order, which are memory-mapped and read in blocks:
+	if len(runs)==1:
+		return numpy.load(runs[0][0], mmap_mode='r'), numpy.load(runs[0][1], mmap_mode='r')
+	iterators = [iterateSequences(numpy.load(run[0], mmap_mode='r'), numpy.load(run[1], mmap_mode='r'), order) for run in runs]
+	sequences_path = getTemporaryPath(temporary)
+	counts_path = getTemporaryPath(temporary)
+	size = writeMergedSequences(heapq.merge(*iterators), sequences_path, counts_path)
+	sequences = numpy.memmap(sequences_path, dtype='<i8', mode='r', shape=(size, order))
+	counts = numpy.memmap(counts_path, dtype='<u8', mode='r', shape=(size,))
+	return sequences, counts
+
+def writeMergedSequences(iterator, sequences_path, counts_path, last_only=False):
+	#Write merged sequences, summing the counts of repeated ones, and return how many were written:
+	sequences_file = open(sequences_path, 'wb')
+	counts_file = open(counts_path, 'wb')
+	last = None
+	total = 0
+	size = 0
+	block_sequences = []
+	block_counts = []
+	for sequence, count in iterator:
+		if sequence==last:
+			total += count
+		else:
+			if last is not None:
+				block_sequences.append(last[-1] if last_only else last)
+				block_counts.append(total)
+				size += 1
+			last = sequence
+			total = count
+		if len(block_sequences)==1000000:
+			sequences_file.write(numpy.array(block_sequences, dtype='<i8').tobytes())
+			counts_file.write(numpy.array(block_counts, dtype='<u8').tobytes())
+			block_sequences = []
+			block_counts = []
+	if last is not None:
+		block_sequences.append(last[-1] if last_only else last)
+		block_counts.append(total)
+		size += 1
+	if len(block_sequences)>0:
+		sequences_file.write(numpy.array(block_sequences, dtype='<i8').tobytes())
+		counts_file.write(numpy.array(block_counts, dtype='<u8').tobytes())
+	sequences_file.close()
+	counts_file.close()
+	return size
+
+def iterateTrieLevel(sequences, level):
+	#Merge the distinct prefixes of all orders that reach a level, counting only the n-grams that end in it:
+	iterators = []
+	for order in sorted(sequences.keys()):
+		if order>level:
+			counts = sequences[order][1] if order==level+1 else None
+			iterators.append(iterateSequences(sequences[order][0], counts, level+1))
+	last = None
+	total = 0
+	for prefix, count in heapq.merge(*iterators):
+		if prefix==last:
+			total += count
+		else:
+			if last is not None:
+				yield last, total
+			last = prefix
+			total = count
+	if last is not None:
+		yield last, total
+
+def createTrieLevel(sequences, level, temporary):
+	#Write the tokens and counts of the nodes of a level, and the position of the parent of each node in the level above:
+	ids_path = getTemporaryPath(temporary)
+	counts_path = getTemporaryPath(temporary)
+	size = writeMergedSequences(iterateTrieLevel(sequences, level), ids_path, counts_path, last_only=True)
+	ids = numpy.memmap(ids_path, dtype='<i8', mode='r', shape=(size,)) if size>0 else numpy.zeros(0, dtype=numpy.int64)
+	counts = numpy.memmap(counts_path, dtype='<u8', mode='r', shape=(size,)) if size>0 else numpy.zeros(0, dtype=numpy.uint64)
+	if level==0:
+		return numpy.zeros(size, dtype=numpy.int64), ids, counts
+
+	#Both levels are sorted, so parents are found by walking them together:
+	parents_path = getTemporaryPath(temporary)
+	parents_file = open(parents_path, 'wb')
+	parent_nodes = iterateTrieLevel(sequences, level-1)
+	parent = None
+	position = -1
+	block = []
+	for prefix, count in iterateTrieLevel(sequences, level):
+		while parent!=prefix[0:level]:
+			parent = next(parent_nodes)[0]
+			position += 1
+		block.append(position)
+		if len(block)==1000000:
+			parents_file.write(numpy.array(block, dtype='<i8').tobytes())
+			block = []
+	parents_file.write(numpy.array(block, dtype='<i8').tobytes())
+	parents_file.close()
+	parents = numpy.memmap(parents_path, dtype='<i8', mode='r', shape=(size,)) if size>0 else numpy.zeros(0, dtype=numpy.int64)
+	return parents, ids, counts
+
+class NgramTrie:
+
+	def __init__(self, path):
+		"""
+		Creates an instance of the NgramTrie class.
+		An NgramTrie offers read-only access to n-gram counts through a memory map, and finds the counts of an n-gram and of all its suffixes in a single traversal.
+		It can be used in place of the shelve files of any frequency feature of FeatureEstimator, and speeds up the backoff behavior nominal feature.
+
+		@param path: Path to a trie file created with the createNgramTrie function.
+		"""
+		self.path = path
+		magic, fields = readHeader(path)
+		self.order = fields[0]
+		size = fields[1]
+		blob_size = fields[2]
+
+		#Map vocabulary:
+		offset = COUNT_STORE_HEADER
+		level_sizes = numpy.fromfile(path, dtype='<u8', count=self.order, offset=offset).tolist()
+		offset += 8*self.order
+		self.vocab_offsets = numpy.memmap(path, dtype='<u8', mode='r', offset=offset, shape=(size+1,))
+		offset += 8*(size+1)
+		self.vocab = numpy.memmap(path, dtype=numpy.uint8, mode='r', offset=offset, shape=(max(1, blob_size),))
+		offset += blob_size
+
+		#Map levels:
+		self.ids = []
+		self.counts = []
+		self.children = []
+		for level in range(0, self.order):
+			nodes = level_sizes[level]
+			self.ids.append(numpy.memmap(path, dtype='<u4', mode='r', offset=offset, shape=(nodes,)))
+			offset += 4*nodes + 4*(nodes % 2)
+			self.counts.append(numpy.memmap(path, dtype='<u8', mode='r', offset=offset, shape=(nodes,)))
+			offset += 8*nodes
+			if level<self.order-1:
+				self.children.append(numpy.memmap(path, dtype='<u8', mode='r', offset=offset, shape=(nodes+1,)))
+				offset += 8*(nodes+1)
+		self.size = len(self.vocab_offsets)-1
+		self.token_ids = {}
+
+	def __contains__(self, key):
+		return self.get(key, None) is not None
+
+	def __getitem__(self, key):
+		count = self.get(key, None)
+		if count is None:
+			raise KeyError(key)
+		return count
+
+	def get(self, key, default=None):
+		tokens = key.split(' ')
+		count = self.getSuffixCounts(tokens)[-1]
+		if count==0:
+			return default
+		return count
+
+	def getCounts(self, keys):
+		"""
+		Retrieves the counts of a list of keys, in the format of the getCounts function.
+
+		@param keys: List of keys.
+		@return A dictionary that assigns each key to its count, or to None if the key is not in the trie.
+		"""
+		result = {}
+		for key in keys:
+			result[key] = self.get(key, None)
+		return result
+
+	def getTokenId(self, token):
+		"""
+		Returns the integer identifier of a token.
+
+		@param token: A token.
+		@return The identifier of the token, or -1 if it is not in the vocabulary.
+		"""
+		if token in self.token_ids:
+			return self.token_ids[token]
+		
+		#Binary search over the sorted vocabulary:
+		target = token.encode('utf8')
+		low = 0
+		high = self.size
+		while low<high:
+			middle = (low+high)//2
+			start = int(self.vocab_offsets[middle])
+			end = int(self.vocab_offsets[middle+1])
+			if self.vocab[start:end].tobytes()<target:
+				low = middle+1
+			else:
+				high = middle
+		result = -1
+		if low<self.size:
+			start = int(self.vocab_offsets[low])
+			end = int(self.vocab_offsets[low+1])
+			if self.vocab[start:end].tobytes()==target:
+				result = low
+		if len(self.token_ids)<1000000:
+			self.token_ids[token] = result
+		return result
+
+	def getSuffixCounts(self, tokens):
+		"""
+		Returns the counts of all suffixes of an n-gram in a single traversal of the trie.
+
+		@param tokens: List with the tokens of the n-gram.
+		@return A list in which position i holds the count of the suffix with the last i+1 tokens, or 0 if it is not in the trie.
+		"""
+		result = [0]*len(tokens)
+		low = 0
+		high = 0
+		if self.order>0:
+			high = len(self.ids[0])
+		for i in range(0, min(len(tokens), self.order)):
+			id = self.getTokenId(tokens[len(tokens)-1-i])
+			if id<0:
+				break
+			
+			#Find the token among the children of the current node:
+			index = low + int(numpy.searchsorted(self.ids[i][low:high], id))
+			if index>=high or self.ids[i][index]!=id:
+				break
+			result[i] = int(self.counts[i][index])
+			if i<self.order-1:
+				low = int(self.children[i][index])
+				high = int(self.children[i][index+1])
+		return result
+
+	def getBackoffOrder(self, tokens):
+		"""
+		Returns the order of the longest suffix of an n-gram in the trie, which is the order a backoff language model would use to score its last token.
+
+		@param tokens: List with the tokens of the n-gram.
+		@return The number of tokens of the longest suffix in the trie, or 0 if not even the last token is in it.
+		"""
+		result = 0
+		counts = self.getSuffixCounts(tokens)
+		for i in range(0, len(counts)):
+			if counts[i]>0:
+				result = i+1
+		return result
+
+	def close(self):
+		"""
+		Closes the trie file.
+		"""
+		self.ids = None
+		self.counts = None
+		self.children = None
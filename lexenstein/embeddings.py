@@ -0,0 +1,566 @@
+import os
+import time
+import numpy
+import gensim
+from lexenstein.util import getWordVectorIndexes, getUnitWordVectors
+
+#Word vector models loaded in this process, indexed by path:
+loaded_models = {}
+
+def getWordVectorModel(path):
+	"""
+	Returns the word vector model stored in a given path.
+	Each model is loaded only once per process: all components that request the same path share the same object.
+	Processes forked after a model is loaded share its memory-mapped vectors with their parent.
+
+	@param path: Path to either a binary word vector model, to an embedding store created with convertWordVectorModel, or to an index created with createNeighbourIndex.
+	For instructions on how to create the model, please refer to the LEXenstein Manual.
+	@return A NeighbourIndex object if the path refers to an index, an EmbeddingStore object if it refers to an embedding store, or a gensim KeyedVectors object otherwise.
+	"""
+	if path not in loaded_models:
+		if os.path.exists(path+'.centroids.npy') and os.path.exists(path+'.vocab'):
+			loaded_models[path] = NeighbourIndex(path)
+		elif os.path.exists(path+'.npy') and os.path.exists(path+'.vocab'):
+			loaded_models[path] = EmbeddingStore(path)
+		else:
+			loaded_models[path] = gensim.models.KeyedVectors.load_word2vec_format(path, binary=True)
+	return loaded_models[path]
+
+def releaseWordVectorModel(path):
+	"""
+	Removes a word vector model from the models loaded in this process.
+	The model's memory is released once no component references it.
+
+	@param path: Path with which the model was loaded.
+	"""
+	if path in loaded_models:
+		del loaded_models[path]
+
+def convertWordVectorModel(w2vmodel, output):
+	"""
+	Converts a binary word vector model into an embedding store, which can be memory-mapped instead of loaded.
+	The store is composed by three files: <output>.vocab, with one word per line, <output>.npy, with the vectors of the words, and <output>.norms.npy, with their lengths.
+	The model is read sequentially, so its vectors are never loaded in memory all at once.
+
+	@param w2vmodel: Path to a binary word vector model, in the format produced by word2vec.
+	@param output: Path prefix of the embedding store to be created.
+	"""
+	print('Opening word vector model...')
+	f = open(w2vmodel, 'rb')
+	header = f.readline().strip().split()
+	count = int(header[0])
+	size = int(header[1])
+	vectors = numpy.lib.format.open_memmap(output+'.npy', mode='w+', dtype=numpy.float32, shape=(count, size))
+	norms = numpy.zeros(count, dtype=numpy.float32)
+	vocab = open(output+'.vocab', 'wb')
+
+	print('Converting vectors...')
+	for i in range(0, count):
+		if i % 1000000 == 0 and i>0:
+			print(str(i) + ' vectors converted.')
+		#Read word:
+		chars = []
+		char = f.read(1)
+		while char!=b' ':
+			if char!=b'\n':
+				chars.append(char)
+			char = f.read(1)
+		vocab.write(b''.join(chars) + b'\n')
+
+		#Read vector:
+		vector = numpy.frombuffer(f.read(4*size), dtype=numpy.float32)
+		vectors[i] = vector
+		norms[i] = numpy.sqrt(numpy.dot(vector, vector))
+	f.close()
+	vocab.close()
+
+	print('Saving embedding store...')
+	vectors.flush()
+	del vectors
+	numpy.save(output+'.norms.npy', norms)
+	print('Finished!')
+
+def getMostSimilarWords(model, words, topn=50, tile_size=100000, query_block=1000, subset=None, probes=None):
+	"""
+	Returns the words with the most similar vectors to each word of a list, as the "most_similar" method of gensim KeyedVectors objects does for a single word.
+	Each distinct word is searched only once, and all of them are searched together: the vocabulary is read in tiles of "tile_size" vectors, and the similarities of each tile are calculated with a single matrix multiplication per block of "query_block" words.
+	The memory used is therefore bounded by the size of a tile times the size of a block.
+
+	@param model: A word vector model, such as a gensim KeyedVectors object or an EmbeddingStore object.
+	@param words: List of words to be searched.
+	@param topn: Number of similar words to be returned for each word.
+	@param tile_size: Number of vocabulary vectors read at a time.
+	@param query_block: Maximum number of words whose similarities are calculated at a time.
+	@param subset: Sorted numpy array with the vocabulary indexes of the only words that can be returned, such as the ones produced by getWordVectorPartitions.
+	If None, all words of the vocabulary can be returned.
+	@param probes: Number of clusters visited by each search of approximate nearest neighbour indexes, such as NeighbourIndex objects.
+	If None, the number of probes of the index is used. Exact searches ignore this parameter.
+	@return A list with the (word, similarity) tuples of each word, in decreasing order of similarity, or None for words not in the vocabulary.
+	The words searched are not included among their similar words.
+	"""
+	#Approximate nearest neighbour indexes search words by themselves:
+	if hasattr(model, 'getMostSimilarWords'):
+		return model.getMostSimilarWords(words, topn=topn, subset=subset, probes=probes)
+
+	#Search each distinct word in the vocabulary only once:
+	unique = list(set(words))
+	indexes = getWordVectorIndexes(model, unique)
+	found = indexes>=0
+	queries = indexes[found]
+	index_to_key = model.index_to_key if hasattr(model, 'index_to_key') else model.index2word
+	vectors = model.vectors if hasattr(model, 'vectors') else model.syn0
+	if subset is None:
+		subset = numpy.arange(0, len(index_to_key))
+	amount = min(topn, len(subset))
+	best_sims = numpy.full((len(queries), max(amount, 0)), -numpy.inf, dtype=numpy.float32)
+	best_indexes = numpy.full((len(queries), max(amount, 0)), -1, dtype=numpy.int64)
+
+	if len(queries)>0 and amount>0:
+		units = getUnitWordVectors(model, queries).astype(numpy.float32)
+		for start in range(0, len(subset), tile_size):
+			#Read and normalize a tile of the vocabulary:
+			tile_indexes = subset[start:start+tile_size]
+			tile = numpy.array(vectors[tile_indexes], dtype=numpy.float32)
+			#Gensim 4 models set their norms to None until they are calculated:
+			if getattr(model, 'norms', None) is not None:
+				norms = numpy.array(model.norms[tile_indexes], dtype=numpy.float32)
+			else:
+				norms = numpy.sqrt(numpy.einsum('ij,ij->i', tile, tile))
+			norms[norms==0] = 1.0
+			tile /= norms[:, numpy.newaxis]
+
+			for qstart in range(0, len(queries), query_block):
+				qend = min(qstart+query_block, len(queries))
+				sims = numpy.dot(units[qstart:qend], tile.T)
+
+				#Words are not similar to themselves:
+				rows = numpy.arange(0, qend-qstart)
+				selves = numpy.minimum(numpy.searchsorted(tile_indexes, queries[qstart:qend]), len(tile)-1)
+				inside = tile_indexes[selves]==queries[qstart:qend]
+				sims[rows[inside], selves[inside]] = -numpy.inf
+
+				#Keep the best words of the tile, then merge them with the best so far:
+				if sims.shape[1]>amount:
+					top = numpy.argpartition(-sims, amount-1, axis=1)[:, 0:amount]
+				else:
+					top = numpy.tile(numpy.arange(0, sims.shape[1]), (len(rows), 1))
+				top_sims = numpy.take_along_axis(sims, top, axis=1)
+				merged_sims = numpy.concatenate([best_sims[qstart:qend], top_sims], axis=1)
+				merged_indexes = numpy.concatenate([best_indexes[qstart:qend], tile_indexes[top]], axis=1)
+				keep = numpy.argpartition(-merged_sims, amount-1, axis=1)[:, 0:amount]
+				best_sims[qstart:qend] = numpy.take_along_axis(merged_sims, keep, axis=1)
+				best_indexes[qstart:qend] = numpy.take_along_axis(merged_indexes, keep, axis=1)
+
+		#Sort best words by decreasing similarity:
+		order = numpy.argsort(-best_sims, axis=1, kind='stable')
+		best_sims = numpy.take_along_axis(best_sims, order, axis=1)
+		best_indexes = numpy.take_along_axis(best_indexes, order, axis=1)
+
+	#Fan results out to the words requested:
+	results = {}
+	positions = numpy.flatnonzero(found)
+	for i in range(0, len(queries)):
+		results[unique[positions[i]]] = [(index_to_key[best_indexes[i][j]], float(best_sims[i][j])) for j in range(0, best_indexes.shape[1]) if best_sims[i][j]>-numpy.inf]
+	return [results.get(word, None) for word in words]
+
+def getWordVectorPartitions(model, separator='|||'):
+	"""
+	Partitions the vocabulary of a word vector model annotated with POS tags, such as the ones used by PaetzoldGenerator, in which words are written as "word|||TAG".
+
+	@param model: A word vector model, such as a gensim KeyedVectors object or an EmbeddingStore object.
+	@param separator: Separator between words and tags.
+	@return A dictionary that assigns each tag to a sorted numpy array with the vocabulary indexes of the words with that tag.
+	Words without tags are not included.
+	"""
+	index_to_key = model.index_to_key if hasattr(model, 'index_to_key') else model.index2word
+	partitions = {}
+	for i in range(0, len(index_to_key)):
+		position = index_to_key[i].rfind(separator)
+		if position>=0:
+			tag = index_to_key[i][position+len(separator):].strip()
+			if tag not in partitions:
+				partitions[tag] = []
+			partitions[tag].append(i)
+	for tag in partitions:
+		partitions[tag] = numpy.array(partitions[tag], dtype=numpy.int64)
+	return partitions
+
+class EmbeddingStore:
+
+	def __init__(self, path):
+		"""
+		Creates an instance of the EmbeddingStore class.
+		An EmbeddingStore offers read-only access to a word vector model through a memory map, so that its vectors are only read from disk when used.
+		It can be used in place of the gensim KeyedVectors objects employed by LEXenstein's classes.
+		Instead of creating instances of this class directly, it is recommended to use the getWordVectorModel function.
+
+		@param path: Path prefix of an embedding store created with convertWordVectorModel.
+		"""
+		self.path = path
+		start = time.time()
+
+		#Read vocabulary:
+		self.index_to_key = []
+		f = open(path+'.vocab', 'rb')
+		for line in f:
+			self.index_to_key.append(line[0:len(line)-1].decode('utf8', 'replace'))
+		f.close()
+		self.key_to_index = {}
+		for i in range(0, len(self.index_to_key)):
+			self.key_to_index[self.index_to_key[i]] = i
+
+		#Map vectors:
+		self.vectors = numpy.load(path+'.npy', mmap_mode='r')
+		if os.path.exists(path+'.norms.npy'):
+			self.norms = numpy.load(path+'.norms.npy')
+		else:
+			self.norms = self.getNorms()
+		self.load_time = time.time()-start
+
+	def __contains__(self, word):
+		return word in self.key_to_index
+
+	def __getitem__(self, word):
+		return self.vectors[self.key_to_index[word]]
+
+	def __len__(self):
+		return len(self.index_to_key)
+
+	def getNorms(self):
+		norms = numpy.zeros(len(self.vectors), dtype=numpy.float32)
+		for i in range(0, len(self.vectors), 100000):
+			block = numpy.array(self.vectors[i:i+100000], dtype=numpy.float32)
+			norms[i:i+100000] = numpy.sqrt(numpy.einsum('ij,ij->i', block, block))
+		return norms
+
+	def getUnitVector(self, word):
+		index = self.key_to_index[word]
+		norm = self.norms[index]
+		if norm==0:
+			norm = 1.0
+		return numpy.array(self.vectors[index], dtype=numpy.float64)/norm
+
+	def similarity(self, word1, word2):
+		"""
+		Calculates the cosine similarity between the vectors of two words.
+		Raises a KeyError if either word is not in the vocabulary.
+
+		@param word1: First word.
+		@param word2: Second word.
+		@return The cosine similarity between the words.
+		"""
+		return numpy.dot(self.getUnitVector(word1), self.getUnitVector(word2))
+
+	def most_similar(self, positive=[], topn=10):
+		"""
+		Returns the words with the vectors most similar to the average of a set of words, as gensim KeyedVectors objects do.
+		Raises a KeyError if any of the words is not in the vocabulary.
+
+		@param positive: List of words.
+		@param topn: Number of words to be returned.
+		@return A list of (word, similarity) tuples, in decreasing order of similarity.
+		The words in "positive" are not included.
+		"""
+		#Produce query vector:
+		query = numpy.zeros(self.vectors.shape[1])
+		for word in positive:
+			query += self.getUnitVector(word)
+		norm = numpy.sqrt(numpy.dot(query, query))
+		if norm>0:
+			query /= norm
+		query = query.astype(numpy.float32)
+
+		#Calculate similarities with all words:
+		norms = numpy.where(self.norms==0, 1.0, self.norms)
+		similarities = numpy.zeros(len(self.vectors), dtype=numpy.float32)
+		for i in range(0, len(self.vectors), 100000):
+			similarities[i:i+100000] = numpy.dot(self.vectors[i:i+100000], query)
+		similarities /= norms
+
+		#Get most similar words:
+		ignore = set([self.key_to_index[word] for word in positive])
+		amount = min(topn+len(ignore), len(similarities))
+		best = numpy.argpartition(-similarities, amount-1)[0:amount]
+		best = best[numpy.argsort(-similarities[best], kind='stable')]
+		result = []
+		for index in best:
+			if index not in ignore and len(result)<topn:
+				result.append((self.index_to_key[index], float(similarities[index])))
+		return result
+
+def createNeighbourIndex(w2vmodel, output, clusters=None, subspaces=16, sample_size=100000, iterations=10, dtype=numpy.float16):
+	"""
+	Creates an approximate nearest neighbour index for the words of a word vector model, which can be memory-mapped and used in place of the model.
+	The index partitions the vocabulary in clusters of similar words, and encodes the vectors of each cluster with product quantization (IVF-PQ).
+	Searches only visit the clusters closest to the word searched, and rank their words by their encoded vectors, which is much faster than comparing the word with the whole vocabulary.
+	The index also stores the unit vectors of all words, so that the best words found can be ranked by their exact similarities, and the lengths of their original vectors, so that these can be restored.
+
+	@param w2vmodel: Path to a binary word vector model, or to an embedding store created with convertWordVectorModel.
+	@param output: Path prefix of the index to be created.
+	@param clusters: Number of clusters in which to partition the vocabulary.
+	If None, four times the square root of the vocabulary size is used.
+	@param subspaces: Number of bytes with which each vector is encoded.
+	If the number of dimensions of the vectors is not a multiple of it, the closest smaller divisor is used.
+	@param sample_size: Number of vectors with which to train clusters and codes.
+	@param iterations: Number of k-means iterations with which to train clusters and codes.
+	@param dtype: Numeric type of the unit vectors stored.
+	"""
+	print('Opening word vector model...')
+	model = getWordVectorModel(w2vmodel)
+	index_to_key = model.index_to_key if hasattr(model, 'index_to_key') else model.index2word
+	vectors = model.vectors if hasattr(model, 'vectors') else model.syn0
+	count = len(index_to_key)
+	size = vectors.shape[1]
+	if clusters is None:
+		clusters = int(4*numpy.sqrt(count))
+	clusters = max(1, min(clusters, count))
+	while size % subspaces != 0:
+		subspaces -= 1
+	width = size//subspaces
+	random = numpy.random.RandomState(0)
+
+	print('Storing unit vectors...')
+	f = open(output+'.vocab', 'wb')
+	for word in index_to_key:
+		f.write(word.encode('utf8') + b'\n')
+	f.close()
+	units = numpy.lib.format.open_memmap(output+'.npy', mode='w+', dtype=dtype, shape=(count, size))
+	norms = numpy.zeros(count, dtype=numpy.float32)
+	for start in range(0, count, 100000):
+		tile = numpy.array(vectors[start:start+100000], dtype=numpy.float32)
+		norms[start:start+len(tile)] = numpy.sqrt(numpy.einsum('ij,ij->i', tile, tile))
+		units[start:start+100000] = getUnitTile(vectors, start, 100000)
+	units.flush()
+	numpy.save(output+'.norms.npy', norms)
+
+	print('Training clusters...')
+	sample = numpy.sort(random.choice(count, min(sample_size, count), replace=False))
+	sample_units = numpy.array(units[sample], dtype=numpy.float32)
+	centroids = getKMeansCentroids(sample_units, clusters, iterations, random)
+
+	print('Training codes...')
+	residuals = sample_units-centroids[getNearestCentroids(sample_units, centroids)]
+	codebooks = numpy.zeros((subspaces, 256, width), dtype=numpy.float32)
+	for m in range(0, subspaces):
+		codebooks[m] = getKMeansCentroids(residuals[:, m*width:(m+1)*width], 256, iterations, random)
+
+	print('Encoding vectors...')
+	assignments = numpy.zeros(count, dtype=numpy.int64)
+	codes = numpy.zeros((count, subspaces), dtype=numpy.uint8)
+	for start in range(0, count, 100000):
+		tile = numpy.array(units[start:start+100000], dtype=numpy.float32)
+		assignments[start:start+len(tile)] = getNearestCentroids(tile, centroids)
+		residuals = tile-centroids[assignments[start:start+len(tile)]]
+		for m in range(0, subspaces):
+			codes[start:start+len(tile), m] = getNearestCentroids(residuals[:, m*width:(m+1)*width], codebooks[m])
+
+	print('Saving index...')
+	#Store the words of each cluster contiguously:
+	ids = numpy.argsort(assignments, kind='stable')
+	offsets = numpy.zeros(clusters+1, dtype=numpy.int64)
+	offsets[1:] = numpy.cumsum(numpy.bincount(assignments, minlength=clusters))
+	numpy.save(output+'.centroids.npy', centroids)
+	numpy.save(output+'.codebooks.npy', codebooks)
+	numpy.save(output+'.codes.npy', codes[ids])
+	numpy.save(output+'.ids.npy', ids)
+	numpy.save(output+'.offsets.npy', offsets)
+	print('Finished!')
+
+def getUnitTile(vectors, start, size):
+	tile = numpy.array(vectors[start:start+size], dtype=numpy.float32)
+	norms = numpy.sqrt(numpy.einsum('ij,ij->i', tile, tile))
+	norms[norms==0] = 1.0
+	return tile/norms[:, numpy.newaxis]
+
+def getNearestCentroids(data, centroids, block=10000):
+	#Find the closest centroid of each vector, a block of vectors at a time:
+	result = numpy.zeros(len(data), dtype=numpy.int64)
+	halfnorms = numpy.einsum('ij,ij->i', centroids, centroids)/2.0
+	for start in range(0, len(data), block):
+		scores = numpy.dot(data[start:start+block], centroids.T)-halfnorms
+		result[start:start+block] = numpy.argmax(scores, axis=1)
+	return result
+
+def getKMeansCentroids(data, k, iterations, random):
+	#Train centroids with Lloyd's algorithm, starting from random vectors:
+	k = min(k, len(data))
+	centroids = numpy.array(data[random.choice(len(data), k, replace=False)], dtype=numpy.float32)
+	for i in range(0, iterations):
+		assignments = numpy.array(getNearestCentroids(data, centroids))
+		sizes = numpy.bincount(assignments, minlength=k)
+		sums = numpy.zeros(centroids.shape, dtype=numpy.float64)
+		numpy.add.at(sums, assignments, data)
+		filled = sizes>0
+		centroids[filled] = (sums[filled]/sizes[filled][:, numpy.newaxis]).astype(numpy.float32)
+		#Move empty clusters to random vectors:
+		empty = numpy.flatnonzero(~filled)
+		if len(empty)>0:
+			centroids[empty] = data[random.choice(len(data), len(empty), replace=False)]
+	return centroids
+
+def getNeighbourRecall(index, model, words, topn=50):
+	"""
+	Measures how many of the most similar words found by exact search are also found by an approximate nearest neighbour index.
+
+	@param index: A NeighbourIndex object.
+	@param model: The word vector model from which the index was created, such as a gensim KeyedVectors object or an EmbeddingStore object.
+	@param words: List of words to be searched.
+	@param topn: Number of similar words to be searched for each word.
+	@return A dictionary with the following keys: recall (average proportion of the exact results found by the index), exact_time and index_time (seconds spent by each search).
+	"""
+	start = time.time()
+	exact = getMostSimilarWords(model, words, topn=topn)
+	exact_time = time.time()-start
+	start = time.time()
+	approximate = index.getMostSimilarWords(words, topn=topn)
+	index_time = time.time()-start
+
+	recalls = []
+	for i in range(0, len(words)):
+		if exact[i]:
+			found = set([w for w, s in approximate[i] or []])
+			recalls.append(float(len([w for w, s in exact[i] if w in found]))/float(len(exact[i])))
+	recall = float(numpy.mean(recalls)) if len(recalls)>0 else 0.0
+	return {'recall': recall, 'exact_time': exact_time, 'index_time': index_time}
+
+class NeighbourIndex(EmbeddingStore):
+
+	def __init__(self, path, probes=16, rerank=500):
+		"""
+		Creates an instance of the NeighbourIndex class.
+		A NeighbourIndex finds the most similar words of a word by visiting only the clusters of the vocabulary closest to it.
+		It offers the same methods as the EmbeddingStore class, and can be used in place of gensim KeyedVectors objects by LEXenstein's classes.
+		Its "vectors" attribute holds the unit vectors of the words, while its "norms" attribute holds the lengths of their original vectors.
+		Indexing the object with a word, as in index[word], returns the word's original vector, restored from its unit vector with the precision in which the index was created.
+		Instead of creating instances of this class directly, it is recommended to use the getWordVectorModel function.
+
+		@param path: Path prefix of an index created with createNeighbourIndex.
+		@param probes: Number of clusters visited by each search.
+		Larger values find more of the most similar words, but make searches slower.
+		@param rerank: Number of words found by each search which are ranked by their exact similarities.
+		Larger values find more of the most similar words, but make searches slower.
+		"""
+		EmbeddingStore.__init__(self, path)
+		self.centroids = numpy.load(path+'.centroids.npy')
+		self.codebooks = numpy.load(path+'.codebooks.npy')
+		self.codes = numpy.load(path+'.codes.npy', mmap_mode='r')
+		self.ids = numpy.load(path+'.ids.npy', mmap_mode='r')
+		self.offsets = numpy.load(path+'.offsets.npy')
+		self.probes = probes
+		self.rerank = rerank
+		#Inverted lists restricted to subsets of the vocabulary, indexed by the id of the subset:
+		self.subset_lists = {}
+
+	def __getitem__(self, word):
+		#Restore the length of the original vector:
+		index = self.key_to_index[word]
+		return numpy.array(self.vectors[index], dtype=numpy.float32)*self.norms[index]
+
+	def getUnitVector(self, word):
+		return numpy.array(self.vectors[self.key_to_index[word]], dtype=numpy.float64)
+
+	def getMostSimilarWords(self, words, topn=50, subset=None, probes=None):
+		"""
+		Returns the words with the most similar vectors to each word of a list, as the getMostSimilarWords function does.
+
+		@param words: List of words to be searched.
+		@param topn: Number of similar words to be returned for each word.
+		@param subset: Sorted numpy array with the vocabulary indexes of the only words that can be returned.
+		If None, all words of the vocabulary can be returned.
+		Searches within a subset only visit the words of the subset, in as many of the clusters that contain them as needed to visit as many words as searches of the whole vocabulary do.
+		@param probes: Number of clusters visited by each search.
+		If None, the number of probes of the index is used.
+		@return A list with the (word, similarity) tuples of each word, in decreasing order of similarity, or None for words not in the vocabulary.
+		"""
+		result = {}
+		for word in set(words):
+			if word in self.key_to_index:
+				index = self.key_to_index[word]
+				result[word] = self.search(self.getUnitVector(word).astype(numpy.float32), topn, set([index]), subset, probes)
+		return [result.get(word, None) for word in words]
+
+	def getSubsetLists(self, subset):
+		"""
+		Returns the inverted lists of the index restricted to a subset of the vocabulary.
+		The lists of each subset are built only once, and kept while the subset exists.
+
+		@param subset: Sorted numpy array with the vocabulary indexes of the words of the subset, such as the ones produced by getWordVectorPartitions.
+		@return A tuple with the positions of the words of the subset in the index, grouped by cluster, and the offsets of each cluster in these positions.
+		"""
+		key = id(subset)
+		if key not in self.subset_lists or self.subset_lists[key][0] is not subset:
+			mask = numpy.zeros(len(self.index_to_key), dtype=bool)
+			mask[subset] = True
+			positions = numpy.flatnonzero(mask[numpy.array(self.ids)])
+			clusters = numpy.searchsorted(self.offsets, positions, side='right')-1
+			offsets = numpy.zeros(len(self.centroids)+1, dtype=numpy.int64)
+			offsets[1:] = numpy.cumsum(numpy.bincount(clusters, minlength=len(self.centroids)))
+			self.subset_lists[key] = (subset, positions, offsets)
+		return self.subset_lists[key][1:]
+
+	def most_similar(self, positive=[], topn=10):
+		"""
+		Returns the words with the vectors most similar to the average of a set of words, as gensim KeyedVectors objects do.
+		Raises a KeyError if any of the words is not in the vocabulary.
+
+		@param positive: List of words.
+		@param topn: Number of words to be returned.
+		@return A list of (word, similarity) tuples, in decreasing order of similarity.
+		The words in "positive" are not included.
+		"""
+		query = numpy.zeros(self.vectors.shape[1])
+		for word in positive:
+			query += self.getUnitVector(word)
+		norm = numpy.sqrt(numpy.dot(query, query))
+		if norm>0:
+			query /= norm
+		return self.search(query.astype(numpy.float32), topn, set([self.key_to_index[word] for word in positive]))
+
+	def search(self, query, topn, ignore, subset=None, probes=None):
+		#Use the inverted lists of the subset, if any, and visit only the clusters with words in them:
+		if subset is None:
+			lists, offsets = None, self.offsets
+			clusters = numpy.arange(0, len(self.centroids))
+		else:
+			lists, offsets = self.getSubsetLists(subset)
+			clusters = numpy.flatnonzero(offsets[1:]>offsets[:-1])
+		if len(clusters)==0:
+			return []
+
+		#Visit the clusters closest to the query:
+		probes = min(probes or self.probes, len(clusters))
+		if lists is None:
+			closest = clusters[numpy.argpartition(-numpy.dot(self.centroids[clusters], query), probes-1)[0:probes]]
+		else:
+			#Visit as many words of the subset as a search of the whole vocabulary would, which may take more clusters:
+			closest = clusters[numpy.argsort(-numpy.dot(self.centroids[clusters], query), kind='stable')]
+			visited = numpy.cumsum(offsets[closest+1]-offsets[closest])
+			minimum = probes*len(self.ids)/float(len(self.centroids))
+			closest = closest[0:max(probes, numpy.searchsorted(visited, minimum)+1)]
+		starts = offsets[closest]
+		ends = offsets[closest+1]
+		positions = numpy.concatenate([numpy.arange(starts[i], ends[i]) for i in range(0, len(closest))])
+		if lists is not None:
+			positions = lists[positions]
+		if len(positions)==0:
+			return []
+		bases = numpy.repeat(numpy.dot(self.centroids[closest], query), ends-starts)
+
+		#Estimate similarities from the codes of the words:
+		subspaces, width = self.codebooks.shape[0], self.codebooks.shape[2]
+		table = numpy.einsum('mkw,mw->mk', self.codebooks, query.reshape(subspaces, width))
+		codes = numpy.array(self.codes[positions])
+		estimates = bases + table[numpy.arange(subspaces), codes].sum(axis=1)
+
+		#Rank the best words by their exact similarities:
+		amount = min(max(self.rerank, topn+len(ignore)), len(positions))
+		best = numpy.argpartition(-estimates, amount-1)[0:amount]
+		candidates = numpy.array(self.ids[positions[best]])
+		candidates = numpy.sort(candidates)
+		similarities = numpy.dot(numpy.array(self.vectors[candidates], dtype=numpy.float32), query)
+		order = numpy.argsort(-similarities, kind='stable')
+		result = []
+		for i in order:
+			if candidates[i] not in ignore and len(result)<topn:
+				result.append((self.index_to_key[candidates[i]], float(similarities[i])))
+		return result
@@ -1,4 +1,9 @@
 from lexenstein.util import *
+from lexenstein.embeddings import *
+from lexenstein.languagemodels import *
+from lexenstein.counts import *
+from lexenstein.caches import *
+from lexenstein.workers import *
 from nltk.stem.porter import *
 from nltk.corpus import wordnet as wn
 import kenlm
@@ -14,14 +19,42 @@ import shelve
 import urllib2
 import json
 import re
+import multiprocessing
+import hashlib
+
+#Estimator used by the processes of a parallel feature estimation:
+worker_estimator = None
+
+def initializeFeatureWorker():
+	#Re-open shelve files, since their handles cannot be shared between processes:
+	for path in worker_estimator.resources:
+		if isinstance(worker_estimator.resources[path], shelve.Shelf):
+			worker_estimator.resources[path] = worker_estimator.readNgramFile(path)
+	#Open a connection of its own to the feature cache:
+	if worker_estimator.cache:
+		worker_estimator.cache.connect()
+	if getTaggingCache():
+		getTaggingCache().connect()
+	#Start worker processes of its own:
+	detachWorkers()
+
+def calculateWorkerFeatures(data):
+	result = worker_estimator.calculateFeatureMatrix(data)
+	worker_estimator.temp_resources = {}
+	return result
 
 class FeatureEstimator:
 
-	def __init__(self, norm=False):
+	def __init__(self, norm=False, dtype=numpy.float64, cache=None):
 		"""
 		Creates an instance of the FeatureEstimator class.
 	
 		@param norm: Boolean variable that determines whether or not feature values should be normalized.
+		@param dtype: Numeric type of the feature matrices produced.
+		Values supported: numpy.float64, numpy.float32.
+		If nominal features are added to the estimator, the matrices will be of the object type instead.
+		@param cache: A FeatureCache object from LEXenstein's "caches" module.
+		If provided, feature values are read from the cache whenever available, and the values calculated are stored in it.
 		"""
 		#List of features to be calculated:
 		self.features = []
@@ -29,12 +62,16 @@ class FeatureEstimator:
 		self.identifiers = []
 		#Normalization parameter:
 		self.norm = norm
+		#Type of the feature matrices:
+		self.dtype = dtype
+		#Persistent feature value cache:
+		self.cache = cache
 		#Persistent resource list:
 		self.resources = {}
 		#One-run resource list:
 		self.temp_resources = {}
 		
-	def calculateFeatures(self, corpus, format='victor', input='file'):
+	def calculateFeatures(self, corpus, format='victor', input='file', workers=1, chunk_size=10000):
 		"""
 		Calculate the selected features over the candidates of a VICTOR or CWICTOR corpus.
 	
@@ -44,47 +81,31 @@ class FeatureEstimator:
 		Values available: victor, cwictor.
 		@param input: Type of input provided.
 		Values available: file, text.
+		@param workers: Number of processes in which to calculate the features.
+		If larger than 1, the corpus is split in chunks of instances, which are distributed between the processes.
+		The processes are forked from the current one, so each of them shares the resources already loaded by the estimator.
+		@param chunk_size: Maximum number of instances in each chunk when workers is larger than 1.
 		@return: Returns a MxN matrix, where M is the number of substitutions of all instances in the VICTOR corpus, and N the number of selected features.
 		"""
-		data = []
-		if format.strip().lower()=='victor':
-			if input=='file':
-				data = [line.strip().split('\t') for line in open(corpus)]
-			elif input=='text':
-				data = [line.strip().split('\t') for line in corpus.split('\n')]
-			else:
-				print('Unrecognized format: must be file or text.')
-		elif format.strip().lower()=='cwictor':
-			if input=='file':
-				f = open(corpus)
-				for line in f:
-					line_data = line.strip().split('\t')
-					data.append([line_data[0].strip(), line_data[1].strip(), line_data[2].strip(), '0:'+line_data[1].strip()])
-			elif input=='text':
-				for line in corpus.split('\n'):
-					line_data = line.strip().split('\t')
-					data.append([line_data[0].strip(), line_data[1].strip(), line_data[2].strip(), '0:'+line_data[1].strip()])
+		if workers>1:
+			if format.strip().lower() not in ['victor', 'cwictor']:
+				print('Unknown input format during feature estimation!')
+				return []
+			blocks = list(self.calculateFeaturesInChunks(corpus, format, input, chunk_size, workers))
+			if len(blocks)>0:
+				result = numpy.concatenate(blocks)
 			else:
-				print('Unrecognized format: must be file or text.')
+				result = numpy.zeros((0, sum(self.getFeatureWidths())), dtype=self.getMatrixType())
+			blocks = None
 		else:
-			print('Unknown input format during feature estimation!')
-			return []
-		
-		values = []
-		for feature in self.features:
-			values.append(feature[0].__call__(data, feature[1]))
-			
-		result = []
-		index = 0
-		for line in data:
-			for i in range(3, len(line)):
-				vector = self.generateVector(values, index)
-				result.append(vector)
-				index += 1
+			data = self.readCorpus(corpus, format, input)
+			if data is None:
+				return []
+			result = self.calculateFeatureMatrix(data)
 				
 		#Normalize if required:
 		if self.norm:
-			result = normalize(result, axis=0)
+			result = normalize(result, axis=0, copy=False)
 			
 		#Clear one-run resources:
 		self.temp_resources = {}
@@ -104,11 +125,374 @@ class FeatureEstimator:
 	
 		data = [[sent, target, head, '0:'+candidate]]
 		
-		values = []
+		result = self.calculateFeatureMatrix(data)
+		
+		#Clear one-run resources:
+		self.temp_resources = {}
+		
+		return result[0]
+		
+	def calculateFeaturesInChunks(self, corpus, format='victor', input='file', chunk_size=10000, workers=1):
+		"""
+		Calculate the selected features over the candidates of a VICTOR or CWICTOR corpus, one chunk of instances at a time.
+		Only the instances of the current chunks are kept in memory, and one-run resources are cleared after each chunk.
+		Feature values are not normalized, since normalization requires the values of the whole corpus.
+	
+		@param corpus: Path to a corpus in the VICTOR or CWICTOR format.
+		For more information about the input's format, refer to the LEXenstein Manual.
+		@param format: Input format.
+		Values available: victor, cwictor.
+		@param input: Type of input provided.
+		Values available: file, text.
+		@param chunk_size: Maximum number of instances in each chunk.
+		@param workers: Number of processes in which to calculate the features.
+		If larger than 1, up to "workers" chunks are calculated at the same time, one per process.
+		@return: A generator of matrices, one per chunk and in the order of the corpus, with the feature values of the substitutions of the chunk's instances.
+		"""
+		if workers>1:
+			for result in self.calculateParallelChunks(corpus, format, input, chunk_size, workers):
+				yield result
+			return
+		
+		for data in self.iterateCorpus(corpus, format, input, chunk_size):
+			result = self.calculateFeatureMatrix(data)
+			
+			#Clear one-run resources:
+			self.temp_resources = {}
+			
+			yield result
+			
+	def calculateParallelChunks(self, corpus, format, input, chunk_size, workers):
+		#Workers are forked so that they inherit the resources already loaded:
+		global worker_estimator
+		worker_estimator = self
+		try:
+			context = multiprocessing.get_context('fork')
+		except AttributeError:
+			context = multiprocessing
+		pool = context.Pool(processes=workers, initializer=initializeFeatureWorker)
+		try:
+			#Send at most one chunk per worker at a time, to keep memory usage bounded:
+			chunks = []
+			for data in self.iterateCorpus(corpus, format, input, chunk_size):
+				chunks.append(data)
+				if len(chunks)==workers:
+					for result in pool.map(calculateWorkerFeatures, chunks):
+						yield result
+					chunks = []
+			if len(chunks)>0:
+				for result in pool.map(calculateWorkerFeatures, chunks):
+					yield result
+		finally:
+			pool.terminate()
+			pool.join()
+			worker_estimator = None
+			
+	def calculateFeaturesToFile(self, corpus, output, format='victor', input='file', chunk_size=10000, workers=1):
+		"""
+		Calculate the selected features over the candidates of a VICTOR or CWICTOR corpus, and save them in a memory-mapped numpy matrix.
+		The corpus is read in chunks, so memory usage depends on the size of the chunks, not of the corpus.
+		The matrix can be re-opened with numpy.memmap(output, dtype=<dtype>, mode='r', shape=(M, N)).
+	
+		@param corpus: Path to a corpus in the VICTOR or CWICTOR format.
+		For more information about the input's format, refer to the LEXenstein Manual.
+		@param output: Path in which to save the feature matrix.
+		@param format: Input format.
+		Values available: victor, cwictor.
+		@param input: Type of input provided.
+		Values available: file, text.
+		@param chunk_size: Maximum number of instances in each chunk.
+		@param workers: Number of processes in which to calculate the features.
+		@return: A MxN numpy.memmap matrix, where M is the number of substitutions of all instances in the corpus, and N the number of selected features.
+		If the corpus has no substitutions, an empty file is created, and an empty numpy array is returned instead, since empty files cannot be memory-mapped.
+		"""
+		if self.getMatrixType()==object:
+			print('Nominal features cannot be saved in a memory-mapped matrix.')
+			return None
+		
+		#Count substitutions:
+		rows = 0
+		for data in self.iterateCorpus(corpus, format, input, chunk_size):
+			for line in data:
+				rows += len(line)-3
+		if rows==0:
+			open(output, 'wb').close()
+			return numpy.zeros((0, sum(self.getFeatureWidths())), dtype=self.dtype)
+		
+		#Fill matrix:
+		result = numpy.memmap(output, dtype=self.dtype, mode='w+', shape=(rows, sum(self.getFeatureWidths())))
+		index = 0
+		for values in self.calculateFeaturesInChunks(corpus, format, input, chunk_size, workers):
+			result[index:index+len(values)] = values
+			index += len(values)
+		
+		#Normalize if required:
+		if self.norm:
+			norms = numpy.zeros(result.shape[1], dtype=numpy.float64)
+			for i in range(0, rows, chunk_size):
+				norms += numpy.sum(numpy.square(result[i:i+chunk_size], dtype=numpy.float64), axis=0)
+			norms = numpy.sqrt(norms)
+			norms[norms==0.0] = 1.0
+			for i in range(0, rows, chunk_size):
+				result[i:i+chunk_size] /= norms.astype(self.dtype)
+		
+		result.flush()
+		return result
+		
+	def readCorpus(self, corpus, format='victor', input='file'):
+		"""
+		Reads the instances of a VICTOR or CWICTOR corpus in the format expected by the feature functions.
+	
+		@param corpus: Path to a corpus in the VICTOR or CWICTOR format.
+		@param format: Input format.
+		Values available: victor, cwictor.
+		@param input: Type of input provided.
+		Values available: file, text.
+		@return: A list of instances, or None if the format is unknown.
+		"""
+		if format.strip().lower() not in ['victor', 'cwictor']:
+			print('Unknown input format during feature estimation!')
+			return None
+		data = []
+		for chunk in self.iterateCorpus(corpus, format, input, None):
+			data.extend(chunk)
+		return data
+		
+	def iterateCorpus(self, corpus, format='victor', input='file', chunk_size=10000):
+		"""
+		Reads the instances of a VICTOR or CWICTOR corpus in chunks.
+	
+		@param corpus: Path to a corpus in the VICTOR or CWICTOR format.
+		@param format: Input format.
+		Values available: victor, cwictor.
+		@param input: Type of input provided.
+		Values available: file, text.
+		@param chunk_size: Maximum number of instances in each chunk.
+		If None, all instances are returned in a single chunk.
+		@return: A generator of lists of instances.
+		"""
+		format = format.strip().lower()
+		if format not in ['victor', 'cwictor']:
+			print('Unknown input format during feature estimation!')
+			return
+		
+		lines = None
+		f = None
+		if input=='file':
+			f = open(corpus)
+			lines = f
+		elif input=='text':
+			lines = corpus.split('\n')
+		else:
+			print('Unrecognized format: must be file or text.')
+			return
+		
+		data = []
+		for line in lines:
+			line_data = line.strip().split('\t')
+			if format=='victor':
+				data.append(line_data)
+			else:
+				data.append([line_data[0].strip(), line_data[1].strip(), line_data[2].strip(), '0:'+line_data[1].strip()])
+			if chunk_size and len(data)==chunk_size:
+				yield data
+				data = []
+		if f:
+			f.close()
+		if len(data)>0:
+			yield data
+		
+	def calculateFeatureMatrix(self, data):
+		"""
+		Calculates the selected features over a list of instances.
+		The matrix is allocated once, and the values of each feature are written into their own column slice.
+		Features that depend exclusively on the candidate, such as length and WordNet features, are calculated once per unique candidate.
+	
+		@param data: List of instances, as produced by readCorpus.
+		@return: A MxN numpy matrix, where M is the number of substitutions in the instances, and N the number of selected features.
+		"""
+		#Allocate matrix:
+		rows = 0
+		for line in data:
+			rows += len(line)-3
+		widths = self.getFeatureWidths()
+		result = numpy.zeros((rows, sum(widths)), dtype=self.getMatrixType())
+		
+		#Read values from the cache if there is one:
+		if self.cache:
+			return self.calculateCachedFeatureMatrix(data, result, widths)
+		
+		#Fill in the column slice of each feature:
+		table = None
+		start = 0
+		for i in range(0, len(self.features)):
+			feature = self.features[i]
+			end = start+widths[i]
+			if self.isContextFreeFeature(feature):
+				if table is None:
+					table = self.getWordTable(data)
+				values = self.calculateWordFeature(feature, table)
+			else:
+				values = feature[0].__call__(data, feature[1])
+			if widths[i]==1:
+				result[:, start] = values
+			else:
+				result[:, start:end] = values
+			start = end
+		return result
+		
+	def calculateCachedFeatureMatrix(self, data, result, widths):
+		#Get the instance of each substitution:
+		instances = []
+		line_indexes = []
+		for i in range(0, len(data)):
+			line = data[i]
+			for subst in line[3:len(line)]:
+				word = subst.split(':')[1].strip()
+				instances.append(line[0]+'\t'+line[1]+'\t'+str(line[2])+'\t'+word)
+				line_indexes.append(i)
+		
+		#Get cached values:
+		keys = []
+		all_keys = []
+		for feature in self.features:
+			signature = self.getFeatureSignature(feature)
+			feature_keys = [self.getCacheKey(signature, instance) for instance in instances]
+			keys.append(feature_keys)
+			all_keys.extend(feature_keys)
+		cached = self.cache.getValues(all_keys)
+		all_keys = None
+		
+		#Get instances with values missing from the cache:
+		missing_lines = set([])
+		for feature_keys in keys:
+			for j in range(0, len(feature_keys)):
+				if feature_keys[j] not in cached:
+					missing_lines.add(line_indexes[j])
+		missing_data = [data[i] for i in sorted(missing_lines)]
+		missing_rows = [j for j in range(0, len(instances)) if line_indexes[j] in missing_lines]
+		
+		#Fill in the column slice of each feature:
+		table = None
+		new_values = {}
+		start = 0
+		for i in range(0, len(self.features)):
+			feature = self.features[i]
+			feature_keys = keys[i]
+			end = start+widths[i]
+			missing = False
+			for j in range(0, len(feature_keys)):
+				if feature_keys[j] in cached:
+					result[j, start:end] = cached[feature_keys[j]]
+				else:
+					missing = True
+			
+			#Calculate the values of the instances missing from the cache:
+			if missing:
+				if self.isContextFreeFeature(feature):
+					if table is None:
+						table = self.getWordTable(missing_data)
+					values = self.calculateWordFeature(feature, table)
+				else:
+					values = feature[0].__call__(missing_data, feature[1])
+				for j in range(0, len(missing_rows)):
+					row = missing_rows[j]
+					result[row, start:end] = values[j]
+					new_values[feature_keys[row]] = values[j]
+			start = end
+			
+		#Save new values:
+		self.cache.setValues(new_values)
+		return result
+		
+	def isContextFreeFeature(self, feature):
+		#Features whose values depend exclusively on the candidate:
+		context_free_features = set(['lengthFeature', 'numberOfTokens', 'syllableFeature', 'senseCount', 'synonymCount', 'hypernymCount', 'hyponymCount', 'minDepth', 'maxDepth', 'averageDepth', 'lexiconFeature', 'morphologicalFeature'])
+		return feature[0].__name__ in context_free_features
+		
+	def getWordTable(self, data):
+		#Assign each substitution to the row of its candidate in a table of unique candidates:
+		words = []
+		word_rows = {}
+		indexes = []
+		for line in data:
+			for subst in line[3:len(line)]:
+				word = subst.strip().split(':')[1].strip()
+				if word not in word_rows:
+					word_rows[word] = len(words)
+					words.append(word)
+				indexes.append(word_rows[word])
+		return words, numpy.array(indexes, dtype=numpy.int64)
+		
+	def calculateWordFeature(self, feature, table):
+		words, indexes = table
+		
+		#Calculate the feature once for each unique candidate:
+		word_data = [['', '', '0'] + ['0:'+word for word in words]]
+		word_values = feature[0].__call__(word_data, feature[1])
+		
+		#Scatter the values over the substitutions:
+		if len(indexes)==0:
+			return []
+		if self.getMatrixType()==object:
+			return [word_values[i] for i in indexes]
+		return numpy.asarray(word_values, dtype=self.dtype)[indexes]
+		
+	def getFeatureSignature(self, feature):
+		#Features are identified by their names, arguments, and the modification times of their resource files:
+		signature = feature[0].__name__
+		for arg in feature[1]:
+			signature += '\t' + self.getArgumentSignature(arg)
+		return signature
+		
+	def getArgumentSignature(self, arg):
+		if isinstance(arg, (bool, int, float)):
+			return repr(arg)
+		elif isinstance(arg, str):
+			signature = repr(arg)
+			for path in [arg, arg+'.db', arg+'.dat', arg+'.dir']:
+				if os.path.isfile(path):
+					signature += ':' + repr(os.path.getmtime(path))
+			return signature
+		elif isinstance(arg, dict):
+			return 'dict:' + hashlib.sha1(repr(sorted(arg.items())).encode('utf8')).hexdigest()
+		elif hasattr(arg, '__dict__'):
+			attributes = [(name, value) for name, value in sorted(vars(arg).items()) if isinstance(value, (bool, int, float, str))]
+			return arg.__class__.__name__ + ':' + repr(attributes)
+		else:
+			return repr(arg)
+			
+	def getCacheKey(self, signature, instance):
+		key = signature+'\t'+instance
+		if not isinstance(key, bytes):
+			key = key.encode('utf8')
+		return hashlib.sha1(key).hexdigest()
+		
+	def getFeatureWidths(self):
+		"""
+		Returns the number of columns produced by each of the selected features.
+	
+		@return: A list with the number of columns of each feature, in the order they were added.
+		"""
+		span_features = set(['collocationalFeature', 'frequencyCollocationalFeature', 'taggedFrequencyCollocationalFeature', 'binaryTaggedFrequencyCollocationalFeature', 'popCollocationalFeature'])
+		widths = []
 		for feature in self.features:
-			values.append(feature[0].__call__(data, feature[1]))
-		vector = self.generateVector(values, 0)
-		return vector
+			name = feature[0].__name__
+			args = feature[1]
+			if name in span_features:
+				widths.append((args[1]+1)*(args[2]+1))
+			elif name=='wordVectorValuesFeature':
+				widths.append(args[1])
+			else:
+				widths.append(1)
+		return widths
+		
+	def getMatrixType(self):
+		nominal_features = set(['candidateNominalFeature', 'ngramNominalFeature', 'candidatePOSNominalFeature', 'POSNgramNominalFeature', 'POSNgramWithCandidateNominalFeature'])
+		for feature in self.features:
+			if feature[0].__name__ in nominal_features:
+				return object
+		return self.dtype
 		
 	def generateVector(self, feature_vector, index):
 		result = []
@@ -130,7 +514,7 @@ class FeatureEstimator:
 			tagged_sents = self.temp_resources['tagged_sents']
 		else:
 			sentences = [l[0].strip().split(' ') for l in data]
-			tagged_sents = tagger.tag_sents(sentences)
+			tagged_sents = tagSentences(tagger, sentences)
 			self.temp_resources['tagged_sents'] = tagged_sents
 		
 		for i in range(0, len(data)):
@@ -147,104 +531,25 @@ class FeatureEstimator:
 	
 	def minimumWordVectorSimilarityFeature(self, data, args):
 		model = self.resources[args[0]]
-		result = []
-		for line in data:
-			target = line[1].strip().lower().replace(' ', '_')
-			for subst in line[3:len(line)]:
-				words = subst.strip().split(':')[1].strip()
-				similarities = []
-				cand_size = 0
-				for word in words.split(' '):
-					cand_size += 1
-					try:
-						similarities.append(model.similarity(target, word))
-					except KeyError:
-						try:
-							similarities.append(model.similarity(target, word.lower()))
-						except KeyError:
-							pass
-				if len(similarities)>0:
-					similarity = numpy.min(similarities)
-					result.append(similarity)
-				else:
-					result.append(0.0)
-		return result
+		targets = [line[1].strip().lower().replace(' ', '_') for line in data]
+		return self.getCandidateWordVectorSimilarities(model, data, targets, 'minimum')
 		
 	def maximumWordVectorSimilarityFeature(self, data, args):
 		model = self.resources[args[0]]
-		result = []
-		for line in data:
-			target = line[1].strip().lower().replace(' ', '_')
-			for subst in line[3:len(line)]:
-				words = subst.strip().split(':')[1].strip()
-				similarities = []
-				cand_size = 0
-				for word in words.split(' '):
-					cand_size += 1
-					try:
-						similarities.append(model.similarity(target, word))
-					except KeyError:
-						try:
-							similarities.append(model.similarity(target, word.lower()))
-						except KeyError:
-							pass
-				if len(similarities)>0:
-					similarity = numpy.max(similarities)
-					result.append(similarity)
-				else:
-					result.append(0.0)
-		return result
+		targets = [line[1].strip().lower().replace(' ', '_') for line in data]
+		return self.getCandidateWordVectorSimilarities(model, data, targets, 'maximum')
 		
 	def averageWordVectorSimilarityFeature(self, data, args):
 		model = self.resources[args[0]]
-		result = []
-		for line in data:
-			target = line[1].strip().lower().replace(' ', '_')
-			for subst in line[3:len(line)]:
-				words = subst.strip().split(':')[1].strip()
-				similarities = []
-				cand_size = 0
-				for word in words.split(' '):
-					cand_size += 1
-					try:
-						similarities.append(model.similarity(target, word))
-					except KeyError:
-						try:
-							similarities.append(model.similarity(target, word.lower()))
-						except KeyError:
-							pass
-				if len(similarities)>0:
-					similarity = numpy.mean(similarities)
-					result.append(similarity)
-				else:
-					result.append(0.0)
-		return result
+		targets = [line[1].strip().lower().replace(' ', '_') for line in data]
+		return self.getCandidateWordVectorSimilarities(model, data, targets, 'average')
 	
 	def wordVectorSimilarityFeature(self, data, args):
 		model = self.resources[args[0]]
-		result = []
-		for line in data:
-			target = line[1].strip().lower()
-			for subst in line[3:len(line)]:
-				words = subst.strip().split(':')[1].strip()
-				similarity = 0.0
-				cand_size = 0
-				for word in words.split(' '):
-					cand_size += 1
-					try:
-						similarity += model.similarity(target, word)
-					except KeyError:
-						try:
-							similarity += model.similarity(target, word.lower())
-						except KeyError:
-							pass
-				similarity /= cand_size
-				result.append(similarity)
-		return result
+		targets = [line[1].strip().lower() for line in data]
+		return self.getCandidateWordVectorSimilarities(model, data, targets, 'total')
 		
 	def taggedWordVectorSimilarityFeature(self, data, args):
-		result = []
-		
 		model = self.resources[args[0]]
 		tagger = self.resources[args[1]]
 		pos_type = args[2]
@@ -255,7 +560,7 @@ class FeatureEstimator:
 			tagged_sents = self.temp_resources['tagged_sents']
 		else:
 			sentences = [l[0].strip().split(' ') for l in data]
-			tagged_sents = tagger.tag_sents(sentences)
+			tagged_sents = tagSentences(tagger, sentences)
 			self.temp_resources['tagged_sents'] = tagged_sents
 			
 		#Transform them to the right format:
@@ -268,26 +573,64 @@ class FeatureEstimator:
 				transformed.append(tokens)
 			tagged_sents = transformed
 
+		#Tag targets and candidates with the POS tag of the target:
+		targets = []
+		suffixes = []
 		for i in range(0, len(data)):
 			line = data[i]
 			target = line[1].strip().lower()
 			head = int(line[2].strip())
 			target_pos = tagged_sents[i][head][1]
+			targets.append(target+'|||'+target_pos)
+			suffixes.append('|||'+target_pos)
+		return self.getCandidateWordVectorSimilarities(model, data, targets, 'total', suffixes)
+		
+	def getCandidateWordVectorSimilarities(self, model, data, targets, reduction, suffixes=None):
+		#Pair each word of each candidate with the target of its instance:
+		pair_targets = []
+		pair_words = []
+		pair_lowers = []
+		starts = []
+		for i in range(0, len(data)):
+			line = data[i]
+			suffix = ''
+			if suffixes:
+				suffix = suffixes[i]
 			for subst in line[3:len(line)]:
+				starts.append(len(pair_words))
 				words = subst.strip().split(':')[1].strip()
-				similarity = 0.0
-				cand_size = 0
 				for word in words.split(' '):
-					cand_size += 1
-					try:
-						similarity += model.similarity(target+'|||'+target_pos, word+'|||'+target_pos)
-					except KeyError:
-						try:
-							similarity += model.similarity(target+'|||'+target_pos, word.lower()+'|||'+target_pos)
-						except KeyError:
-							pass
-				similarity /= cand_size
-				result.append(similarity)
+					pair_targets.append(targets[i])
+					pair_words.append(word+suffix)
+					pair_lowers.append(word.lower()+suffix)
+		if len(starts)==0:
+			return []
+		starts = numpy.array(starts, dtype=numpy.int64)
+		
+		#Resolve vocabulary indexes, falling back to lowercased words:
+		target_indexes = getWordVectorIndexes(model, pair_targets)
+		word_indexes = getWordVectorIndexes(model, pair_words)
+		lower_indexes = getWordVectorIndexes(model, pair_lowers)
+		word_indexes = numpy.where(word_indexes>=0, word_indexes, lower_indexes)
+		mask = (target_indexes>=0) & (word_indexes>=0)
+		
+		#Calculate all cosine similarities at once:
+		similarities = numpy.einsum('ij,ij->i', getUnitWordVectors(model, target_indexes), getUnitWordVectors(model, word_indexes))
+		
+		#Reduce the similarities of the words of each candidate:
+		counts = numpy.add.reduceat(mask.astype(numpy.int64), starts)
+		if reduction=='minimum':
+			result = numpy.minimum.reduceat(numpy.where(mask, similarities, numpy.inf), starts)
+		elif reduction=='maximum':
+			result = numpy.maximum.reduceat(numpy.where(mask, similarities, -numpy.inf), starts)
+		else:
+			result = numpy.add.reduceat(numpy.where(mask, similarities, 0.0), starts)
+			if reduction=='average':
+				result /= numpy.maximum(counts, 1)
+			else:
+				sizes = numpy.diff(numpy.append(starts, len(pair_words)))
+				result /= sizes
+		result[counts==0] = 0.0
 		return result
 	
 	def wordVectorValuesFeature(self, data, args):
@@ -360,6 +703,15 @@ class FeatureEstimator:
 		
 	def syllableFeature(self, data, args):
 		mat = args[0]
+		#Count syllables in-process, if possible:
+		if hasattr(mat, 'countSyllables'):
+			result = []
+			for line in data:
+				for subst in line[3:len(line)]:
+					word = subst.strip().split(':')[1].strip()
+					result.append(mat.countSyllables(word))
+			return result
+
 		#Create the input for the Java application:
 		input = []
 		for line in data:
@@ -373,7 +725,9 @@ class FeatureEstimator:
 		#Decode output:
 		out = []
 		for o in outr:
-			out.append(o.decode("latin1").replace(' ', '-'))
+			if isinstance(o, bytes):
+				o = o.decode("latin1")
+			out.append(o.replace(' ', '-'))
 	
 		#Calculate number of syllables
 		result = []
@@ -394,16 +748,8 @@ class FeatureEstimator:
 			head = int(line[2])
 			spanlv = range(0, spanl+1)
 			spanrv = range(0, spanr+1)
-			for subst in line[3:len(line)]:
-				word = subst.split(':')[1].strip()
-				values = []
-				for span1 in spanlv:
-					for span2 in spanrv:
-						ngram, bosv, eosv = self.getNgram(word, sent, head, span1, span2)
-						aux = model.score(ngram, bos=bosv, eos=eosv)
-						#aux = model.score(ngram)
-						values.append(aux)
-				result.append(values)
+			words = [subst.split(':')[1].strip() for subst in line[3:len(line)]]
+			result.extend(self.getSpanScores(model, words, sent, head, spanlv, spanrv))
 		return result
 		
 	def frequencyCollocationalFeature(self, data, args):
@@ -411,7 +757,7 @@ class FeatureEstimator:
 		spanl = args[1]
 		spanr = args[2]
 		result = []
-		counts = self.resources[ngrams]
+		instance_ngrams = []
 		for line in data:
 			sent = line[0].strip().split(' ')
 			target = line[1]
@@ -420,19 +766,25 @@ class FeatureEstimator:
 			spanrv = range(0, spanr+1)
 			for subst in line[3:len(line)]:
 				word = subst.split(':')[1].strip()
-				values = []
 				for span1 in spanlv:
 					for span2 in spanrv:
 						ngram, bosv, eosv = self.getNgram(word, sent, head, span1, span2)
-						if ngram in counts:
-							values.append(counts[ngram])
-						else:
-							values.append(0.0)
-				result.append(values)
+						instance_ngrams.append(ngram)
+		
+		#Get the counts of all n-grams at once:
+		counts = self.getNgramCounts(ngrams, instance_ngrams)
+		size = (spanl+1)*(spanr+1)
+		for i in range(0, len(instance_ngrams), size):
+			values = []
+			for ngram in instance_ngrams[i:i+size]:
+				if counts[ngram] is not None:
+					values.append(counts[ngram])
+				else:
+					values.append(0.0)
+			result.append(values)
 		return result
 		
 	def taggedFrequencyCollocationalFeature(self, data, args):
-		counts = self.resources[args[0]]
 		spanl = args[1]
 		spanr = args[2]
 		tagger = self.resources[args[3]]
@@ -444,7 +796,7 @@ class FeatureEstimator:
 			tagged_sents = self.temp_resources['tagged_sents']
 		else:
 			sentences = [l[0].strip().split(' ') for l in data]
-			tagged_sents = tagger.tag_sents(sentences)
+			tagged_sents = tagSentences(tagger, sentences)
 			self.temp_resources['tagged_sents'] = tagged_sents
 			
 		#Transform them to the right format:
@@ -457,7 +809,7 @@ class FeatureEstimator:
 				transformed.append(tokens)
 			tagged_sents = transformed
 		
-		result = []
+		instance_ngrams = []
 		for i in range(0, len(data)):
 			line = data[i]
 			sent = ['<s>'] + [tokendata[1] for tokendata in tagged_sents[i]] + ['</s>']
@@ -467,19 +819,26 @@ class FeatureEstimator:
 			spanrv = range(0, spanr+1)
 			for subst in line[3:len(line)]:
 				word = subst.split(':')[1].strip()
-				values = []
 				for span1 in spanlv:
 					for span2 in spanrv:
 						ngram, bosv, eosv = self.getNgram(word, sent, head, span1, span2)
-						if ngram in counts:
-							values.append(counts[ngram])
-						else:
-							values.append(0.0)
-				result.append(values)
+						instance_ngrams.append(ngram)
+		
+		#Get the counts of all n-grams at once:
+		counts = self.getNgramCounts(args[0], instance_ngrams)
+		result = []
+		size = (spanl+1)*(spanr+1)
+		for i in range(0, len(instance_ngrams), size):
+			values = []
+			for ngram in instance_ngrams[i:i+size]:
+				if counts[ngram] is not None:
+					values.append(counts[ngram])
+				else:
+					values.append(0.0)
+			result.append(values)
 		return result
 		
 	def binaryTaggedFrequencyCollocationalFeature(self, data, args):
-		counts = self.resources[args[0]]
 		spanl = args[1]
 		spanr = args[2]
 		tagger = self.resources[args[3]]
@@ -491,7 +850,7 @@ class FeatureEstimator:
 			tagged_sents = self.temp_resources['tagged_sents']
 		else:
 			sentences = [l[0].strip().split(' ') for l in data]
-			tagged_sents = tagger.tag_sents(sentences)
+			tagged_sents = tagSentences(tagger, sentences)
 			self.temp_resources['tagged_sents'] = tagged_sents
 			
 		#Transform them to the right format:
@@ -504,7 +863,7 @@ class FeatureEstimator:
 				transformed.append(tokens)
 			tagged_sents = transformed
 		
-		result = []
+		instance_ngrams = []
 		for i in range(0, len(data)):
 			line = data[i]
 			sent = ['<s>'] + [tokendata[1] for tokendata in tagged_sents[i]] + ['</s>']
@@ -514,15 +873,23 @@ class FeatureEstimator:
 			spanrv = range(0, spanr+1)
 			for subst in line[3:len(line)]:
 				word = subst.split(':')[1].strip()
-				values = []
 				for span1 in spanlv:
 					for span2 in spanrv:
 						ngram, bosv, eosv = self.getNgram(word, sent, head, span1, span2)
-						if ngram in counts:
-							values.append(1.0)
-						else:
-							values.append(0.0)
-				result.append(values)
+						instance_ngrams.append(ngram)
+		
+		#Get the counts of all n-grams at once:
+		counts = self.getNgramCounts(args[0], instance_ngrams)
+		result = []
+		size = (spanl+1)*(spanr+1)
+		for i in range(0, len(instance_ngrams), size):
+			values = []
+			for ngram in instance_ngrams[i:i+size]:
+				if counts[ngram] is not None:
+					values.append(1.0)
+				else:
+					values.append(0.0)
+			result.append(values)
 		return result
 	
 	def popCollocationalFeature(self, data, args):
@@ -630,7 +997,7 @@ class FeatureEstimator:
 		spanl = args[1]
 		spanr = args[2]
 		result = []
-		counts = self.resources[ngrams]
+		instance_ngrams = []
 		for line in data:
 			sent = line[0].strip().split(' ')
 			target = line[1]
@@ -638,10 +1005,15 @@ class FeatureEstimator:
 			for subst in line[3:len(line)]:
 				word = subst.split(':')[1].strip()
 				ngram, bosv, eosv = self.getNgram(word, sent, head, spanl, spanr)
-				if ngram in counts:
-					result.append(counts[ngram])
-				else:
-					result.append(0.0)
+				instance_ngrams.append(ngram)
+		
+		#Get the counts of all n-grams at once:
+		counts = self.getNgramCounts(ngrams, instance_ngrams)
+		for ngram in instance_ngrams:
+			if counts[ngram] is not None:
+				result.append(counts[ngram])
+			else:
+				result.append(0.0)
 		return result
 		
 	def binaryNgramFrequencyFeature(self, data, args):
@@ -649,7 +1021,7 @@ class FeatureEstimator:
 		spanl = args[1]
 		spanr = args[2]
 		result = []
-		counts = self.resources[ngrams]
+		instance_ngrams = []
 		for line in data:
 			sent = line[0].strip().split(' ')
 			target = line[1]
@@ -657,10 +1029,15 @@ class FeatureEstimator:
 			for subst in line[3:len(line)]:
 				word = subst.split(':')[1].strip()
 				ngram, bosv, eosv = self.getNgram(word, sent, head, spanl, spanr)
-				if ngram in counts:
-					result.append(1.0)
-				else:
-					result.append(0.0)
+				instance_ngrams.append(ngram)
+		
+		#Get the counts of all n-grams at once:
+		counts = self.getNgramCounts(ngrams, instance_ngrams)
+		for ngram in instance_ngrams:
+			if counts[ngram] is not None:
+				result.append(1.0)
+			else:
+				result.append(0.0)
 		return result
 		
 	def popNgramProbabilityFeature(self, data, args):
@@ -690,26 +1067,41 @@ class FeatureEstimator:
 		spanl = args[1]
 		spanr = args[2]
 		result = []
-		counts = self.resources[ngrams]
+		instance_ngrams = []
 		for line in data:
 			sent = line[0].strip()
 			target = line[1]
 			head = int(line[2])
 			for subst in line[3:len(line)]:
 				word = subst.split(':')[1].strip()
-				ngrams = self.getPopNgrams(word, sent, head, spanl, spanl)
-				maxscore = -999999
-				for ngram in ngrams:
-					aux = 0.0
-					if ngram[0] in counts:
-						aux = counts[ngram[0]]
-					
-					if aux>maxscore:
-						maxscore = aux
-				result.append(maxscore)
+				instance_ngrams.append([ngram[0] for ngram in self.getPopNgrams(word, sent, head, spanl, spanl)])
+		
+		#Get the counts of all n-grams at once:
+		counts = self.getNgramCounts(args[0], [ngram for pop_ngrams in instance_ngrams for ngram in pop_ngrams])
+		for pop_ngrams in instance_ngrams:
+			maxscore = -999999
+			for ngram in pop_ngrams:
+				aux = 0.0
+				if counts[ngram] is not None:
+					aux = counts[ngram]
+				
+				if aux>maxscore:
+					maxscore = aux
+			result.append(maxscore)
 				
 		return result
 	
+	def getNgramCounts(self, path, ngrams):
+		#Resolve all n-grams in one batched lookup, reusing the ones resolved by other features for the same instances:
+		if 'ngram_counts' not in self.temp_resources:
+			self.temp_resources['ngram_counts'] = {}
+		if path not in self.temp_resources['ngram_counts']:
+			self.temp_resources['ngram_counts'][path] = {}
+		known = self.temp_resources['ngram_counts'][path]
+		missing = [ngram for ngram in set(ngrams) if ngram not in known]
+		known.update(getCounts(self.resources[path], missing))
+		return known
+		
 	def getNgram(self, cand, tokens, head, configl, configr):
 		if configl==0 and configr==0:
 			return cand, False, False
@@ -728,6 +1120,51 @@ class FeatureEstimator:
 				result += tokens[i] + ' '
 			return result.strip(), bosv, eosv
 	
+	def getSpanScores(self, model, cands, tokens, head, spansl, spansr):
+		#Produces the same scores as getNgram followed by model.score, but scores each left context only once:
+		result = [[] for cand in cands]
+		for configl in spansl:
+			start = max(0, head-configl)
+			left_score, left_state = self.getLanguageModelScore(model, self.getInitialState(model, start==0), tokens[start:head])
+			for i in range(0, len(cands)):
+				cand = cands[i]
+				cand_score, state = self.getLanguageModelScore(model, left_state, [cand])
+				score = left_score + cand_score
+				
+				#Extend the n-gram to the right one token at a time:
+				end = head+1
+				for configr in spansr:
+					if configl==0 and configr==0:
+						result[i].append(model.score(cand, bos=False, eos=False))
+						continue
+					right_end = min(len(tokens), head+configr+1)
+					right_score, state = self.getLanguageModelScore(model, state, tokens[end:right_end])
+					score += right_score
+					end = max(end, right_end)
+					value = score
+					if right_end==len(tokens):
+						value += model.BaseScore(state, '</s>', kenlm.State())
+					result[i].append(value)
+		return result
+		
+	def getInitialState(self, model, bos):
+		state = kenlm.State()
+		if bos:
+			model.BeginSentenceWrite(state)
+		else:
+			model.NullContextWrite(state)
+		return state
+		
+	def getLanguageModelScore(self, model, state, tokens):
+		#Scores a sequence of tokens from a given state, as model.score does:
+		score = 0.0
+		for token in tokens:
+			for word in token.split():
+				out_state = kenlm.State()
+				score += model.BaseScore(state, word, out_state)
+				state = out_state
+		return score, state
+		
 	def getPopNgrams(self, cand, sent, head, configl, configr):
 		if configl==0 and configr==0:
 			bos = False
@@ -787,11 +1224,9 @@ class FeatureEstimator:
 			sent = line[0].strip().split(' ')
 			target = line[1]
 			head = int(line[2])
-			for subst in line[3:len(line)]:
-				word = subst.split(':')[1].strip()
-				ngram, bosv, eosv = self.getNgram(word, sent, head, 9999, 9999)
-				aux = model.score(ngram, bos=bosv, eos=eosv)
-				result.append(aux)
+			words = [subst.split(':')[1].strip() for subst in line[3:len(line)]]
+			for values in self.getSpanScores(model, words, sent, head, [9999], [9999]):
+				result.append(values[0])
 		return result
 		
 	def reverseSentenceProbabilityFeature(self, data, args):
@@ -805,11 +1240,9 @@ class FeatureEstimator:
 				invsent.append(sent[len(sent)-1-i])
 			target = line[1]
 			head = len(sent)-1-int(line[2])
-			for subst in line[3:len(line)]:
-				word = subst.split(':')[1].strip()
-				ngram, bosv, eosv = self.getNgram(word, invsent, head, 9999, 9999)
-				aux = model.score(ngram, bos=bosv, eos=eosv)
-				result.append(aux)
+			words = [subst.split(':')[1].strip() for subst in line[3:len(line)]]
+			for values in self.getSpanScores(model, words, invsent, head, [9999], [9999]):
+				result.append(values[0])
 		return result
 		
 	def prefixProbabilityFeature(self, data, args):
@@ -821,11 +1254,9 @@ class FeatureEstimator:
 			target = line[1]
 			head = int(line[2])
 			sent = sent[0:head+1]
-			for subst in line[3:len(line)]:
-				word = subst.split(':')[1].strip()
-				ngram, bosv, eosv = self.getNgram(word, sent, head, 9999, 9999)
-				aux = model.score(ngram, bos=bosv, eos=eosv)
-				result.append(aux)
+			words = [subst.split(':')[1].strip() for subst in line[3:len(line)]]
+			for values in self.getSpanScores(model, words, sent, head, [9999], [9999]):
+				result.append(values[0])
 		return result
 		
 	def reversePrefixProbabilityFeature(self, data, args):
@@ -840,11 +1271,9 @@ class FeatureEstimator:
 			target = line[1]
 			head = len(sent)-1-int(line[2])
 			invsent = invsent[0:head+1]
-			for subst in line[3:len(line)]:
-				word = subst.split(':')[1].strip()
-				ngram, bosv, eosv = self.getNgram(word, invsent, head, 9999, 9999)
-				aux = model.score(ngram, bos=bosv, eos=eosv)
-				result.append(aux)
+			words = [subst.split(':')[1].strip() for subst in line[3:len(line)]]
+			for values in self.getSpanScores(model, words, invsent, head, [9999], [9999]):
+				result.append(values[0])
 		return result
 		
 	def senseCount(self, data, args):
@@ -1707,6 +2136,7 @@ class FeatureEstimator:
 	def wordVectorContextSimilarityFeature(self, data, args):
 		model = self.resources[args[0]]
 		tagger = self.resources[args[1]]
+		engine = args[2]
 		result = []
 		
 		#Get tagged sentences:
@@ -1715,25 +2145,30 @@ class FeatureEstimator:
 			tagged_sents = self.temp_resources['tagged_sents']
 		else:
 			sentences = [l[0].strip().split(' ') for l in data]
-			tagged_sents = tagger.tag_sents(sentences)
+			tagged_sents = tagSentences(tagger, sentences)
 			self.temp_resources['tagged_sents'] = tagged_sents
 			
+		#Get content words in sentences:
+		all_content_words = []
 		for i in range(0, len(data)):
-			line = data[i]
-			tokens = line[0].strip().split(' ')
-			target = line[1].strip().lower()
-			head = int(line[2].strip())
-			
-			#Get content words in sentence:
+			tokens = data[i][0].strip().split(' ')
 			content_words = set([])
 			for j in range(0, len(tokens)):
 				token = tokens[j]
 				tag = tagged_sents[i][j][1]
 				if self.isContentWord(token, tag):
 					content_words.add(token)
+			all_content_words.append(content_words)
+		
+		if engine=='sum':
+			return self.getContextWordVectorSimilarities(model, data, all_content_words)
 			
-			#Produce divisor:
-			divisor = float(len(content_words))
+		for i in range(0, len(data)):
+			line = data[i]
+			content_words = all_content_words[i]
+			
+			#Produce divisor, which is 1 for sentences without content words, so that their similarities are 0.0:
+			divisor = float(max(len(content_words), 1))
 			
 			for subst in line[3:len(line)]:
 				word = subst.strip().split(':')[1].strip()
@@ -1754,6 +2189,7 @@ class FeatureEstimator:
 		model = self.resources[args[0]]
 		tagger = self.resources[args[1]]
 		pos_type = args[2]
+		engine = args[3]
 		result = []
 		
 		#Get tagged sentences:
@@ -1762,7 +2198,7 @@ class FeatureEstimator:
 			tagged_sents = self.temp_resources['tagged_sents']
 		else:
 			sentences = [l[0].strip().split(' ') for l in data]
-			tagged_sents = tagger.tag_sents(sentences)
+			tagged_sents = tagSentences(tagger, sentences)
 			self.temp_resources['tagged_sents'] = tagged_sents
 			
 		
@@ -1779,14 +2215,13 @@ class FeatureEstimator:
 		else:
 			model_tagged_sents = tagged_sents
 			
+		#Get content words in sentences and the tags of targets:
+		all_content_words = []
+		suffixes = []
 		for i in range(0, len(data)):
 			line = data[i]
 			tokens = line[0].strip().split(' ')
-			target = line[1].strip().lower()
 			head = int(line[2].strip())
-			target_pos = model_tagged_sents[i][head][1]
-			
-			#Get content words in sentence:
 			content_words = set([])
 			for j in range(0, len(tokens)):
 				token = tokens[j]
@@ -1794,9 +2229,19 @@ class FeatureEstimator:
 				model_tag = model_tagged_sents[i][j][1]
 				if self.isContentWord(token, tag):
 					content_words.add(token+'|||'+model_tag)
+			all_content_words.append(content_words)
+			suffixes.append('|||'+model_tagged_sents[i][head][1])
+			
+		if engine=='sum':
+			return self.getContextWordVectorSimilarities(model, data, all_content_words, suffixes)
+			
+		for i in range(0, len(data)):
+			line = data[i]
+			target_pos = model_tagged_sents[i][int(line[2].strip())][1]
+			content_words = all_content_words[i]
 			
-			#Produce divisor:
-			divisor = float(len(content_words))
+			#Produce divisor, which is 1 for sentences without content words, so that their similarities are 0.0:
+			divisor = float(max(len(content_words), 1))
 			
 			for subst in line[3:len(line)]:
 				word = subst.strip().split(':')[1].strip()
@@ -1813,6 +2258,48 @@ class FeatureEstimator:
 				result.append(similarity)
 		return result
 		
+	def getContextWordVectorSimilarities(self, model, data, all_content_words, suffixes=None):
+		#The average similarity to the context equals the similarity to the sum of the context's unit vectors over its size:
+		context_words = []
+		context_lines = []
+		divisors = numpy.zeros(len(data))
+		for i in range(0, len(data)):
+			divisors[i] = len(all_content_words[i])
+			for content_word in all_content_words[i]:
+				context_words.append(content_word)
+				context_lines.append(i)
+		context_vectors = getUnitWordVectors(model, getWordVectorIndexes(model, context_words))
+		contexts = numpy.zeros((len(data), context_vectors.shape[1]))
+		numpy.add.at(contexts, numpy.array(context_lines, dtype=numpy.int64), context_vectors)
+		
+		#Get vectors of candidates, falling back to lowercased words:
+		words = []
+		lowers = []
+		lines = []
+		for i in range(0, len(data)):
+			line = data[i]
+			suffix = ''
+			if suffixes:
+				suffix = suffixes[i]
+			for subst in line[3:len(line)]:
+				word = subst.strip().split(':')[1].strip()
+				words.append(word+suffix)
+				lowers.append(word.lower()+suffix)
+				lines.append(i)
+		if len(words)==0:
+			return []
+		lines = numpy.array(lines, dtype=numpy.int64)
+		word_indexes = getWordVectorIndexes(model, words)
+		word_indexes = numpy.where(word_indexes>=0, word_indexes, getWordVectorIndexes(model, lowers))
+		word_vectors = getUnitWordVectors(model, word_indexes)
+		
+		#Calculate one dot product per candidate:
+		result = numpy.einsum('ij,ij->i', contexts[lines], word_vectors)
+		line_divisors = divisors[lines]
+		result[line_divisors==0] = 0.0
+		line_divisors[line_divisors==0] = 1.0
+		return result/line_divisors
+		
 	def nullLinkNominalFeature(self, data, args):
 		parser = self.resources[args[0]]
 		
@@ -1882,6 +2369,8 @@ class FeatureEstimator:
 		ngrams = args[0]
 		result = []
 		counts = self.resources[ngrams]
+		if hasattr(counts, 'getSuffixCounts'):
+			return self.getTrieBackoffBehaviors(counts, data)
 		for line in data:
 			sent = line[0].strip().split(' ')
 			target = line[1]
@@ -1915,6 +2404,56 @@ class FeatureEstimator:
 				result.append(backoff)
 		return result
 		
+	def getTrieBackoffBehaviors(self, trie, data):
+		#Find the counts of all n-grams of the backoff behavior feature with two traversals of an n-gram trie:
+		result = []
+		for line in data:
+			sent = line[0].strip().split(' ')
+			head = int(line[2])
+			context = sent[max(0, head-2):head]
+			
+			#Get counts of the n-grams that precede the target:
+			in2f = False
+			in1f = False
+			if head>0:
+				context_counts = self.getSuffixPresence(trie.getSuffixCounts(context))
+				in2f = context_counts[len(context)-1]
+				in1f = context_counts[0]
+				
+			for subst in line[3:len(line)]:
+				word = subst.split(':')[1].strip()
+				size = len(word.split(' '))
+				
+				#Get counts of the n-grams that end with the candidate:
+				cand_counts = self.getSuffixPresence(trie.getSuffixCounts(context + word.split(' ')))
+				in2t = cand_counts[size+len(context)-1]
+				in1t = cand_counts[size+min(1, head)-1]
+				in0t = cand_counts[size-1]
+				if head==0:
+					in2f = in0t
+					in1f = in0t
+				
+				backoff = -1
+				if in2t:
+					backoff = 7.0
+				elif in2f and in1t:
+					backoff = 6.0
+				elif in1t:
+					backoff = 5.0
+				elif in2f and in0t:
+					backoff = 4.0
+				elif in1f and in0t:
+					backoff = 3.0
+				elif in0t:
+					backoff = 2.0
+				else:
+					backoff = 1.0
+				result.append(backoff)
+		return result
+		
+	def getSuffixPresence(self, counts):
+		return [count>0 for count in counts]
+		
 	def candidateNominalFeature(self, data, args):
 		result = []
 		for line in data:
@@ -1953,7 +2492,7 @@ class FeatureEstimator:
 			tagged_sents = self.temp_resources['tagged_sents']
 		else:
 			sentences = [l[0].strip().split(' ') for l in data]
-			tagged_sents = tagger.tag_sents(sentences)
+			tagged_sents = tagSentences(tagger, sentences)
 			self.temp_resources['tagged_sents'] = tagged_sents
 			
 		#Transform them to the right format:
@@ -1989,7 +2528,7 @@ class FeatureEstimator:
 			tagged_sents = self.temp_resources['tagged_sents']
 		else:
 			sentences = [l[0].strip().split(' ') for l in data]
-			tagged_sents = tagger.tag_sents(sentences)
+			tagged_sents = tagSentences(tagger, sentences)
 			self.temp_resources['tagged_sents'] = tagged_sents
 			
 		#Transform them to the right format:
@@ -2031,7 +2570,7 @@ class FeatureEstimator:
 			tagged_sents = self.temp_resources['tagged_sents']
 		else:
 			sentences = [l[0].strip().split(' ') for l in data]
-			tagged_sents = tagger.tag_sents(sentences)
+			tagged_sents = tagSentences(tagger, sentences)
 			self.temp_resources['tagged_sents'] = tagged_sents
 			
 		#Transform them to the right format:
@@ -2153,7 +2692,10 @@ class FeatureEstimator:
 		return result
 		
 	def readNgramFile(self, ngram_file):
-		counts = shelve.open(ngram_file, protocol=pickle.HIGHEST_PROTOCOL)
+		#Open count stores directly, and shelve files otherwise:
+		counts = openCountStore(ngram_file)
+		if counts is None:
+			counts = shelve.open(ngram_file, protocol=pickle.HIGHEST_PROTOCOL)
 		return counts
 
 	def isContentWord(self, word, tag):
@@ -2169,6 +2711,7 @@ class FeatureEstimator:
 	
 		@param model: Path to a binary word vector model.
 		For instructions on how to create the model, please refer to the LEXenstein Manual.
+		An embedding store created with the convertWordVectorModel function can also be used.
 		@param size: Number of feature values that represent a word in the model.
 		@param orientation: Whether the feature is a simplicity of complexity measure.
 		Possible values: Complexity, Simplicity.
@@ -2178,7 +2721,7 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if model not in self.resources:
-				m = gensim.models.KeyedVectors.load_word2vec_format(model, binary=True)
+				m = getWordVectorModel(model)
 				self.resources[model] = m
 			self.features.append((self.wordVectorValuesFeature, [model, size]))
 			for i in range(0, size):
@@ -2206,7 +2749,7 @@ class FeatureEstimator:
 		else:
 			os.environ['JAVAHOME'] = java_path
 			if pos_model not in self.resources:
-				tagger = StanfordPOSTagger(pos_model, stanford_tagger)
+				tagger = getPOSTagger(pos_model, stanford_tagger, java_path)
 				self.resources[pos_model] = tagger
 			if condprob_model not in self.resources:
 				m = pickle.load(open(condprob_model, 'rb'))
@@ -2222,6 +2765,7 @@ class FeatureEstimator:
 	
 		@param model: Path to a binary word vector model.
 		For instructions on how to create the model, please refer to the LEXenstein Manual.
+		An embedding store created with the convertWordVectorModel function can also be used.
 		@param orientation: Whether the feature is a simplicity of complexity measure.
 		Possible values: Complexity, Simplicity.
 		"""
@@ -2230,7 +2774,7 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if model not in self.resources:
-				m = gensim.models.KeyedVectors.load_word2vec_format(model, binary=True)
+				m = getWordVectorModel(model)
 				self.resources[model] = m
 			self.features.append((self.wordVectorSimilarityFeature, [model]))
 			self.identifiers.append(('Word Vector Similarity (Model: '+model+')', orientation))
@@ -2244,6 +2788,7 @@ class FeatureEstimator:
 	
 		@param model: Path to a binary tagged word vector model.
 		For instructions on how to create the model, please refer to the LEXenstein Manual.
+		An embedding store created with the convertWordVectorModel function can also be used.
 		@param pos_model: Path to a POS tagging model for the Stanford POS Tagger.
 		The models can be downloaded from the following link: http://nlp.stanford.edu/software/tagger.shtml
 		@param stanford_tagger: Path to the "stanford-postagger.jar" file.
@@ -2261,10 +2806,10 @@ class FeatureEstimator:
 		else:
 			os.environ['JAVAHOME'] = java_path
 			if model not in self.resources:
-				m = gensim.models.KeyedVectors.load_word2vec_format(model, binary=True)
+				m = getWordVectorModel(model)
 				self.resources[model] = m
 			if pos_model not in self.resources:
-				tagger = StanfordPOSTagger(pos_model, stanford_tagger)
+				tagger = getPOSTagger(pos_model, stanford_tagger, java_path)
 				self.resources[pos_model] = tagger
 			self.features.append((self.taggedWordVectorSimilarityFeature, [model, pos_model, pos_type]))
 			self.identifiers.append(('Word Vector Similarity (Model: '+model+') (POS Model: '+pos_model+') (POS Type: '+pos_type+')', orientation))
@@ -2331,7 +2876,7 @@ class FeatureEstimator:
 		Adds a syllable count feature to the estimator.
 		The value will be the number of syllables of each candidate.
 	
-		@param mat: A configured MorphAdornerToolkit object.
+		@param mat: A configured MorphAdornerToolkit object, or a HyphenationSyllabifier object, which counts syllables without resorting to MorphAdorner.
 		@param orientation: Whether the feature is a simplicity of complexity measure.
 		Possible values: Complexity, Simplicity.
 		"""
@@ -2360,7 +2905,7 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if language_model not in self.resources:
-				model = kenlm.LanguageModel(language_model)
+				model = getLanguageModel(language_model)
 				self.resources[language_model] = model
 			self.features.append((self.collocationalFeature, [language_model, leftw, rightw]))
 			for i in range(0, leftw+1):
@@ -2376,6 +2921,8 @@ class FeatureEstimator:
 		To produce the ngram counts file, the user must first acquire a large corpus of text.
 		In sequence, the user can then use SRILM to produce an ngram counts file with the "-write" option.
 		Finally, the user must create a shelve file using the "addNgramCountsFileToShelve" function from the "util" module.
+		Alternatively, the user can create a read-only n-gram count store, which is faster to build and query, using the "createNgramCountStore" function from the "counts" module.
+		If exact counts do not fit in memory, approximate counts can be served by a count-min sketch created with the "createCountMinSketch" function from the "counts" module.
 	
 		@param ngram_file: Path to a shelve file containing n-gram frequency counts.
 		@param leftw: Maximum number of tokens to the left.
@@ -2406,6 +2953,8 @@ class FeatureEstimator:
 		To produce this file, one must first parse a corpus and create a corpus with n-grams in the aforementioned format.
 		The user can then use SRILM to produce an ngram counts file with the "-write" option.
 		Finally, the user must create a shelve file using the "addNgramCountsFileToShelve" function from the "util" module.
+		Alternatively, the user can create a read-only n-gram count store, which is faster to build and query, using the "createNgramCountStore" function from the "counts" module.
+		If exact counts do not fit in memory, approximate counts can be served by a count-min sketch created with the "createCountMinSketch" function from the "counts" module.
 	
 		@param ngram_file: Path to a shelve file containing n-gram frequency counts.
 		@param leftw: Maximum number of tokens to the left.
@@ -2430,7 +2979,7 @@ class FeatureEstimator:
 				self.resources[ngram_file] = counts
 			os.environ['JAVAHOME'] = java_path
 			if pos_model not in self.resources:
-				tagger = StanfordPOSTagger(pos_model, stanford_tagger)
+				tagger = getPOSTagger(pos_model, stanford_tagger, java_path)
 				self.resources[pos_model] = tagger
 			self.features.append((self.taggedFrequencyCollocationalFeature, [ngram_file, leftw, rightw, pos_model, pos_type]))
 			for i in range(0, leftw+1):
@@ -2448,8 +2997,11 @@ class FeatureEstimator:
 		To produce this file, one must first parse a corpus and create a corpus with n-grams in the aforementioned format.
 		The user can then use SRILM to produce an ngram counts file with the "-write" option.
 		Finally, the user must create a shelve file using the "addNgramCountsFileToShelve" function from the "util" module.
+		Alternatively, the user can create a read-only n-gram count store, which is faster to build and query, using the "createNgramCountStore" function from the "counts" module.
+		If exact counts do not fit in memory, approximate counts can be served by a count-min sketch created with the "createCountMinSketch" function from the "counts" module.
 	
 		@param ngram_file: Path to a shelve file containing n-gram frequency counts.
+		Since the feature only checks whether keys exist, a much smaller Bloom filter created with the "createBloomFilter" function from the "counts" module can also be used.
 		@param leftw: Maximum number of tokens to the left.
 		@param rightw: Maximum number of tokens to the right.
 		@param pos_model: Path to a POS tagging model for the Stanford POS Tagger.
@@ -2472,7 +3024,7 @@ class FeatureEstimator:
 				self.resources[ngram_file] = counts
 			os.environ['JAVAHOME'] = java_path
 			if pos_model not in self.resources:
-				tagger = StanfordPOSTagger(pos_model, stanford_tagger)
+				tagger = getPOSTagger(pos_model, stanford_tagger, java_path)
 				self.resources[pos_model] = tagger
 			self.features.append((self.binaryTaggedFrequencyCollocationalFeature, [ngram_file, leftw, rightw, pos_model, pos_type]))
 			for i in range(0, leftw+1):
@@ -2497,7 +3049,7 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if language_model not in self.resources:
-				model = kenlm.LanguageModel(language_model)
+				model = getLanguageModel(language_model)
 				self.resources[language_model] = model
 			self.features.append((self.popCollocationalFeature, [language_model, leftw, rightw]))
 			for i in range(0, leftw+1):
@@ -2520,7 +3072,7 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if language_model not in self.resources:
-				model = kenlm.LanguageModel(language_model)
+				model = getLanguageModel(language_model)
 				self.resources[language_model] = model
 			self.features.append((self.ngramProbabilityFeature, [language_model, leftw, rightw]))
 			self.identifiers.append(('N-Gram Probability Feature ['+str(leftw)+', '+str(rightw)+'] (LM: '+language_model+')', orientation))
@@ -2532,6 +3084,8 @@ class FeatureEstimator:
 		To produce the ngram counts file, the user must first acquire a large corpus of text.
 		In sequence, the user can then use SRILM to produce an ngram counts file with the "-write" option.
 		Finally, the user must create a shelve file using the "addNgramCountsFileToShelve" function from the "util" module.
+		Alternatively, the user can create a read-only n-gram count store, which is faster to build and query, using the "createNgramCountStore" function from the "counts" module.
+		If exact counts do not fit in memory, approximate counts can be served by a count-min sketch created with the "createCountMinSketch" function from the "counts" module.
 	
 		@param ngram_file: Path to a shelve file containing n-gram frequency counts.
 		@param leftw: Number of tokens to the left.
@@ -2556,8 +3110,11 @@ class FeatureEstimator:
 		To produce the ngram counts file, the user must first acquire a large corpus of text.
 		In sequence, the user can then use SRILM to produce an ngram counts file with the "-write" option.
 		Finally, the user must create a shelve file using the "addNgramCountsFileToShelve" function from the "util" module.
+		Alternatively, the user can create a read-only n-gram count store, which is faster to build and query, using the "createNgramCountStore" function from the "counts" module.
+		If exact counts do not fit in memory, approximate counts can be served by a count-min sketch created with the "createCountMinSketch" function from the "counts" module.
 	
 		@param ngram_file: Path to a shelve file containing n-gram frequency counts.
+		Since the feature only checks whether keys exist, a much smaller Bloom filter created with the "createBloomFilter" function from the "counts" module can also be used.
 		@param leftw: Number of tokens to the left.
 		@param rightw: Number of tokens to the right.
 		@param orientation: Whether the feature is a simplicity of complexity measure.
@@ -2589,7 +3146,7 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if language_model not in self.resources:
-				model = kenlm.LanguageModel(language_model)
+				model = getLanguageModel(language_model)
 				self.resources[language_model] = model
 			self.features.append((self.popNgramProbabilityFeature, [language_model, leftw, rightw]))
 			self.identifiers.append(('Pop N-Gram Frequency Feature ['+str(leftw)+', '+str(rightw)+'] (LM: '+language_model+')', orientation))
@@ -2601,6 +3158,8 @@ class FeatureEstimator:
 		To produce the ngram counts file, the user must first acquire a large corpus of text.
 		In sequence, the user can then use SRILM to produce an ngram counts file with the "-write" option.
 		Finally, the user must create a shelve file using the "addNgramCountsFileToShelve" function from the "util" module.
+		Alternatively, the user can create a read-only n-gram count store, which is faster to build and query, using the "createNgramCountStore" function from the "counts" module.
+		If exact counts do not fit in memory, approximate counts can be served by a count-min sketch created with the "createCountMinSketch" function from the "counts" module.
 	
 		@param ngram_file: Path to a shelve file containing n-gram frequency counts.
 		@param leftw: Number of tokens to the left.
@@ -2631,7 +3190,7 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if language_model not in self.resources:
-				model = kenlm.LanguageModel(language_model)
+				model = getLanguageModel(language_model)
 				self.resources[language_model] = model
 			self.features.append((self.sentenceProbabilityFeature, [language_model]))
 			self.identifiers.append(('Sentence Probability (LM: '+language_model+')', orientation))
@@ -2650,7 +3209,7 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if language_model not in self.resources:
-				model = kenlm.LanguageModel(language_model)
+				model = getLanguageModel(language_model)
 				self.resources[language_model] = model
 			self.features.append((self.reverseSentenceProbabilityFeature, [language_model]))
 			self.identifiers.append(('Reverse Sentence Probability (LM: '+language_model+')', orientation))
@@ -2668,7 +3227,7 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if language_model not in self.resources:
-				model = kenlm.LanguageModel(language_model)
+				model = getLanguageModel(language_model)
 				self.resources[language_model] = model
 			self.features.append((self.prefixProbabilityFeature, [language_model]))
 			self.identifiers.append(('Prefix Probability (LM: '+language_model+')', orientation))
@@ -2687,7 +3246,7 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if language_model not in self.resources:
-				model = kenlm.LanguageModel(language_model)
+				model = getLanguageModel(language_model)
 				self.resources[language_model] = model
 			self.features.append((self.reversePrefixProbabilityFeature, [language_model]))
 			self.identifiers.append(('Reverse Prefix Probability (LM: '+language_model+')', orientation))
@@ -2867,11 +3426,11 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if language_model not in self.resources:
-				model = kenlm.LanguageModel(language_model)
+				model = getLanguageModel(language_model)
 				self.resources[language_model] = model
 			os.environ['JAVAHOME'] = java_path
 			if dependency_models not in self.resources:
-				parser = StanfordParser(path_to_jar=stanford_parser, path_to_models_jar=dependency_models)
+				parser = getDependencyParser(stanford_parser, dependency_models, java_path)
 				self.resources[dependency_models] = parser
 			self.features.append((self.subjectDependencyProbabilityFeature, [language_model, dependency_models]))
 			self.identifiers.append(('Subject Dependency Probability Feature (Language Model: '+language_model+') (Models: '+dependency_models+')', orientation))
@@ -2887,6 +3446,8 @@ class FeatureEstimator:
 		Finally, one can then run any language modelling tool to produce a language model in ARPA format.
 	
 		@param dep_counts_file: Path to a shelve file containing dependency link counts.
+		A count store created with the "createNgramCountStore" function from the "counts" module can also be used.
+		Since the feature only checks whether keys exist, a much smaller Bloom filter created with the "createBloomFilter" function from the "counts" module can also be used.
 		@param stanford_parser: Path to the "stanford-parser.jar" file.
 		The parser can be downloaded from the following link: http://nlp.stanford.edu/software/lex-parser.shtml
 		@param dependency_models: Path to a JAR file containing parsing models.
@@ -2905,7 +3466,7 @@ class FeatureEstimator:
 				self.resources[dep_counts_file] = counts
 			os.environ['JAVAHOME'] = java_path
 			if dependency_models not in self.resources:
-				parser = StanfordParser(path_to_jar=stanford_parser, path_to_models_jar=dependency_models)
+				parser = getDependencyParser(stanford_parser, dependency_models, java_path)
 				self.resources[dependency_models] = parser
 			self.features.append((self.binarySubjectDependencyFeature, [dep_counts_file, dependency_models]))
 			self.identifiers.append(('Binary Subject Dependency Feature (Dependency Link Counts File: '+dep_counts_file+') (Models: '+dependency_models+')', orientation))
@@ -2921,6 +3482,7 @@ class FeatureEstimator:
 		Finally, one can then run any language modelling tool to produce a language model in ARPA format.
 	
 		@param dep_counts_file: Path to a shelve file containing dependency link counts.
+		A count store created with the "createNgramCountStore" function from the "counts" module can also be used.
 		@param stanford_parser: Path to the "stanford-parser.jar" file.
 		The parser can be downloaded from the following link: http://nlp.stanford.edu/software/lex-parser.shtml
 		@param dependency_models: Path to a JAR file containing parsing models.
@@ -2939,7 +3501,7 @@ class FeatureEstimator:
 				self.resources[dep_counts_file] = counts
 			os.environ['JAVAHOME'] = java_path
 			if dependency_models not in self.resources:
-				parser = StanfordParser(path_to_jar=stanford_parser, path_to_models_jar=dependency_models)
+				parser = getDependencyParser(stanford_parser, dependency_models, java_path)
 				self.resources[dependency_models] = parser
 			self.features.append((self.subjectDependencyFrequencyFeature, [dep_counts_file, dependency_models]))
 			self.identifiers.append(('Subject Dependency Frequency Feature (Dependency Link Counts File: '+dep_counts_file+') (Models: '+dependency_models+')', orientation))
@@ -2969,11 +3531,11 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if language_model not in self.resources:
-				model = kenlm.LanguageModel(language_model)
+				model = getLanguageModel(language_model)
 				self.resources[language_model] = model
 			os.environ['JAVAHOME'] = java_path
 			if dependency_models not in self.resources:
-				parser = StanfordParser(path_to_jar=stanford_parser, path_to_models_jar=dependency_models)
+				parser = getDependencyParser(stanford_parser, dependency_models, java_path)
 				self.resources[dependency_models] = parser
 			self.features.append((self.objectDependencyProbabilityFeature, [language_model, dependency_models]))
 			self.identifiers.append(('Object Dependency Probability Feature (Language Model: '+language_model+') (Models: '+dependency_models+')', orientation))
@@ -2989,6 +3551,8 @@ class FeatureEstimator:
 		Finally, one can then run any language modelling tool to produce a language model in ARPA format.
 	
 		@param dep_counts_file: Path to a shelve file containing dependency link counts.
+		A count store created with the "createNgramCountStore" function from the "counts" module can also be used.
+		Since the feature only checks whether keys exist, a much smaller Bloom filter created with the "createBloomFilter" function from the "counts" module can also be used.
 		@param stanford_parser: Path to the "stanford-parser.jar" file.
 		The parser can be downloaded from the following link: http://nlp.stanford.edu/software/lex-parser.shtml
 		@param dependency_models: Path to a JAR file containing parsing models.
@@ -3007,7 +3571,7 @@ class FeatureEstimator:
 				self.resources[dep_counts_file] = counts
 			os.environ['JAVAHOME'] = java_path
 			if dependency_models not in self.resources:
-				parser = StanfordParser(path_to_jar=stanford_parser, path_to_models_jar=dependency_models)
+				parser = getDependencyParser(stanford_parser, dependency_models, java_path)
 				self.resources[dependency_models] = parser
 			self.features.append((self.binaryObjectDependencyFeature, [dep_counts_file, dependency_models]))
 			self.identifiers.append(('Binary Object Dependency Feature (Dependency Link Counts File: '+dep_counts_file+') (Models: '+dependency_models+')', orientation))
@@ -3023,6 +3587,7 @@ class FeatureEstimator:
 		Finally, one can then run any language modelling tool to produce a language model in ARPA format.
 	
 		@param dep_counts_file: Path to a shelve file containing dependency link counts.
+		A count store created with the "createNgramCountStore" function from the "counts" module can also be used.
 		@param stanford_parser: Path to the "stanford-parser.jar" file.
 		The parser can be downloaded from the following link: http://nlp.stanford.edu/software/lex-parser.shtml
 		@param dependency_models: Path to a JAR file containing parsing models.
@@ -3041,7 +3606,7 @@ class FeatureEstimator:
 				self.resources[dep_counts_file] = counts
 			os.environ['JAVAHOME'] = java_path
 			if dependency_models not in self.resources:
-				parser = StanfordParser(path_to_jar=stanford_parser, path_to_models_jar=dependency_models)
+				parser = getDependencyParser(stanford_parser, dependency_models, java_path)
 				self.resources[dependency_models] = parser
 			self.features.append((self.objectDependencyFrequencyFeature, [dep_counts_file, dependency_models]))
 			self.identifiers.append(('Object Dependency Frequency Feature (Dependency Link Counts File: '+dep_counts_file+') (Models: '+dependency_models+')', orientation))
@@ -3071,11 +3636,11 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if language_model not in self.resources:
-				model = kenlm.LanguageModel(language_model)
+				model = getLanguageModel(language_model)
 				self.resources[language_model] = model
 			os.environ['JAVAHOME'] = java_path
 			if dependency_models not in self.resources:
-				parser = StanfordParser(path_to_jar=stanford_parser, path_to_models_jar=dependency_models)
+				parser = getDependencyParser(stanford_parser, dependency_models, java_path)
 				self.resources[dependency_models] = parser
 			self.features.append((self.allDependencyProbabilityFeature, [language_model, dependency_models]))
 			self.identifiers.append(('Dependency Probability Feature (Language Model: '+language_model+') (Models: '+dependency_models+')', orientation))
@@ -3091,6 +3656,8 @@ class FeatureEstimator:
 		Finally, one can then run any language modelling tool to produce a language model in ARPA format.
 	
 		@param dep_counts_file: Path to a shelve file containing dependency link counts.
+		A count store created with the "createNgramCountStore" function from the "counts" module can also be used.
+		Since the feature only checks whether keys exist, a much smaller Bloom filter created with the "createBloomFilter" function from the "counts" module can also be used.
 		@param stanford_parser: Path to the "stanford-parser.jar" file.
 		The parser can be downloaded from the following link: http://nlp.stanford.edu/software/lex-parser.shtml
 		@param dependency_models: Path to a JAR file containing parsing models.
@@ -3109,7 +3676,7 @@ class FeatureEstimator:
 				self.resources[dep_counts_file] = counts
 			os.environ['JAVAHOME'] = java_path
 			if dependency_models not in self.resources:
-				parser = StanfordParser(path_to_jar=stanford_parser, path_to_models_jar=dependency_models)
+				parser = getDependencyParser(stanford_parser, dependency_models, java_path)
 				self.resources[dependency_models] = parser
 			self.features.append((self.binaryAllDependencyFeature, [dep_counts_file, dependency_models]))
 			self.identifiers.append(('Binary All Dependency Feature (Dependency Link Counts File: '+dep_counts_file+') (Models: '+dependency_models+')', orientation))
@@ -3125,6 +3692,7 @@ class FeatureEstimator:
 		Finally, one can then run any language modelling tool to produce a language model in ARPA format.
 	
 		@param dep_counts_file: Path to a shelve file containing dependency link counts.
+		A count store created with the "createNgramCountStore" function from the "counts" module can also be used.
 		@param stanford_parser: Path to the "stanford-parser.jar" file.
 		The parser can be downloaded from the following link: http://nlp.stanford.edu/software/lex-parser.shtml
 		@param dependency_models: Path to a JAR file containing parsing models.
@@ -3143,18 +3711,19 @@ class FeatureEstimator:
 				self.resources[dep_counts_file] = counts
 			os.environ['JAVAHOME'] = java_path
 			if dependency_models not in self.resources:
-				parser = StanfordParser(path_to_jar=stanford_parser, path_to_models_jar=dependency_models)
+				parser = getDependencyParser(stanford_parser, dependency_models, java_path)
 				self.resources[dependency_models] = parser
 			self.features.append((self.allDependencyFrequencyFeature, [dep_counts_file, dependency_models]))
 			self.identifiers.append(('All Dependency Frequency Feature (Dependency Link Counts File: '+dep_counts_file+') (Models: '+dependency_models+')', orientation))
 			
-	def addWordVectorContextSimilarityFeature(self, model, pos_model, stanford_tagger, java_path, orientation):
+	def addWordVectorContextSimilarityFeature(self, model, pos_model, stanford_tagger, java_path, orientation, engine='sum'):
 		"""
 		Adds a word vector context similarity feature to the estimator.
 		The value will be the average similarity between the word vector of a candidate and the vectors of all content word in the target word's context.
 	
 		@param model: Path to a binary word vector model.
 		For instructions on how to create the model, please refer to the LEXenstein Manual.
+		An embedding store created with the convertWordVectorModel function can also be used.
 		@param pos_model: Path to a POS tagging model for the Stanford POS Tagger.
 		The models can be downloaded from the following link: http://nlp.stanford.edu/software/tagger.shtml
 		@param stanford_tagger: Path to the "stanford-postagger.jar" file.
@@ -3163,22 +3732,26 @@ class FeatureEstimator:
 		Can be commonly found in "/usr/bin/java" in Unix/Linux systems, or in "C:/Program Files/Java/jdk_version/java.exe" in Windows systems.
 		@param orientation: Whether the feature is a simplicity of complexity measure.
 		Possible values: Complexity, Simplicity.
+		@param engine: How the similarities are calculated.
+		Values supported: sum (sums the unit vectors of the context and calculates one similarity per candidate), pairwise (calculates the similarity between each candidate and each content word)
 		"""
 		
 		if orientation not in ['Complexity', 'Simplicity']:
 			print('Orientation must be Complexity or Simplicity')
+		elif engine not in ['sum', 'pairwise']:
+			print('Engine must be sum or pairwise')
 		else:
 			if model not in self.resources:
-				m = gensim.models.KeyedVectors.load_word2vec_format(model, binary=True)
+				m = getWordVectorModel(model)
 				self.resources[model] = m
 			os.environ['JAVAHOME'] = java_path
 			if pos_model not in self.resources:
-				tagger = StanfordPOSTagger(pos_model, stanford_tagger)
+				tagger = getPOSTagger(pos_model, stanford_tagger, java_path)
 				self.resources[pos_model] = tagger
-			self.features.append((self.wordVectorContextSimilarityFeature, [model, pos_model]))
+			self.features.append((self.wordVectorContextSimilarityFeature, [model, pos_model, engine]))
 			self.identifiers.append(('Word Vector Context Similarity (Model: '+model+') (POS Model: '+pos_model+')', orientation))
 
-	def addTaggedWordVectorContextSimilarityFeature(self, model, pos_model, stanford_tagger, java_path, pos_type, orientation):
+	def addTaggedWordVectorContextSimilarityFeature(self, model, pos_model, stanford_tagger, java_path, pos_type, orientation, engine='sum'):
 		"""
 		Adds a tagged word vector context similarity feature to the estimator.
 		The value will be the average similarity between the word vector of a candidate and the vectors of all content word in the target word's context.
@@ -3187,6 +3760,7 @@ class FeatureEstimator:
 	
 		@param model: Path to a binary tagged word vector model.
 		For instructions on how to create the model, please refer to the LEXenstein Manual.
+		An embedding store created with the convertWordVectorModel function can also be used.
 		@param pos_model: Path to a POS tagging model for the Stanford POS Tagger.
 		The models can be downloaded from the following link: http://nlp.stanford.edu/software/tagger.shtml
 		@param stanford_tagger: Path to the "stanford-postagger.jar" file.
@@ -3197,19 +3771,23 @@ class FeatureEstimator:
 		Values supported: treebank, paetzold
 		@param orientation: Whether the feature is a simplicity of complexity measure.
 		Possible values: Complexity, Simplicity.
+		@param engine: How the similarities are calculated.
+		Values supported: sum (sums the unit vectors of the context and calculates one similarity per candidate), pairwise (calculates the similarity between each candidate and each content word)
 		"""
 		
 		if orientation not in ['Complexity', 'Simplicity']:
 			print('Orientation must be Complexity or Simplicity')
+		elif engine not in ['sum', 'pairwise']:
+			print('Engine must be sum or pairwise')
 		else:
 			if model not in self.resources:
-				m = gensim.models.KeyedVectors.load_word2vec_format(model, binary=True)
+				m = getWordVectorModel(model)
 				self.resources[model] = m
 			os.environ['JAVAHOME'] = java_path
 			if pos_model not in self.resources:
-				tagger = StanfordPOSTagger(pos_model, stanford_tagger)
+				tagger = getPOSTagger(pos_model, stanford_tagger, java_path)
 				self.resources[pos_model] = tagger
-			self.features.append((self.taggedWordVectorContextSimilarityFeature, [model, pos_model, pos_type]))
+			self.features.append((self.taggedWordVectorContextSimilarityFeature, [model, pos_model, pos_type, engine]))
 			self.identifiers.append(('Tagged Word Vector Context Similarity (Model: '+model+') (POS Model: '+pos_model+') (POS Type: '+pos_type+')', orientation))
 			
 	def addNullLinkNominalFeature(self, stanford_parser, dependency_models, java_path, orientation):
@@ -3231,7 +3809,7 @@ class FeatureEstimator:
 		else:
 			os.environ['JAVAHOME'] = java_path
 			if dependency_models not in self.resources:
-				parser = StanfordParser(path_to_jar=stanford_parser, path_to_models_jar=dependency_models)
+				parser = getDependencyParser(stanford_parser, dependency_models, java_path)
 				self.resources[dependency_models] = parser
 				
 			self.features.append((self.nullLinkNominalFeature, [dependency_models]))
@@ -3242,6 +3820,7 @@ class FeatureEstimator:
 		Adds a nominal language model backoff behavior nominal feature to the estimator.
 	
 		@param ngram_file: Path to a shelve file containing n-gram frequency counts.
+		An n-gram trie created with the "createNgramTrie" function from the "counts" module finds all n-grams needed by the feature in two traversals, and is considerably faster.
 		@param orientation: Whether the feature is a simplicity of complexity measure.
 		Possible values: Complexity, Simplicity.
 		"""
@@ -3347,7 +3926,7 @@ class FeatureEstimator:
 		"""
 		os.environ['JAVAHOME'] = java_path
 		if pos_model not in self.resources:
-			tagger = StanfordPOSTagger(pos_model, stanford_tagger)
+			tagger = getPOSTagger(pos_model, stanford_tagger, java_path)
 			self.resources[pos_model] = tagger
 			
 		self.features.append((self.candidatePOSNominalFeature, [pos_model, pos_type]))
@@ -3371,7 +3950,7 @@ class FeatureEstimator:
 		"""
 		os.environ['JAVAHOME'] = java_path
 		if pos_model not in self.resources:
-			tagger = StanfordPOSTagger(pos_model, stanford_tagger)
+			tagger = getPOSTagger(pos_model, stanford_tagger, java_path)
 			self.resources[pos_model] = tagger
 			
 		self.features.append((self.POSNgramNominalFeature, [leftw, rightw, pos_model, pos_type]))
@@ -3395,7 +3974,7 @@ class FeatureEstimator:
 		"""
 		os.environ['JAVAHOME'] = java_path
 		if pos_model not in self.resources:
-			tagger = StanfordPOSTagger(pos_model, stanford_tagger)
+			tagger = getPOSTagger(pos_model, stanford_tagger, java_path)
 			self.resources[pos_model] = tagger
 			
 		self.features.append((self.POSNgramWithCandidateNominalFeature, [leftw, rightw, pos_model, pos_type]))
@@ -3434,7 +4013,7 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if language_model not in self.resources:
-				model = kenlm.LanguageModel(language_model)
+				model = getLanguageModel(language_model)
 				self.resources[language_model] = model
 			self.features.append((self.averageTokenProbabilityFeature, [language_model]))
 			self.identifiers.append(('Average Token Probability (LM: '+language_model+')', orientation))
@@ -3453,7 +4032,7 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if language_model not in self.resources:
-				model = kenlm.LanguageModel(language_model)
+				model = getLanguageModel(language_model)
 				self.resources[language_model] = model
 			self.features.append((self.maximumTokenProbabilityFeature, [language_model]))
 			self.identifiers.append(('Maximum Token Probability (LM: '+language_model+')', orientation))
@@ -3472,7 +4051,7 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if language_model not in self.resources:
-				model = kenlm.LanguageModel(language_model)
+				model = getLanguageModel(language_model)
 				self.resources[language_model] = model
 			self.features.append((self.minimumTokenProbabilityFeature, [language_model]))
 			self.identifiers.append(('Minimum Token Probability (LM: '+language_model+')', orientation))
@@ -3484,6 +4063,7 @@ class FeatureEstimator:
 	
 		@param model: Path to a binary word vector model.
 		For instructions on how to create the model, please refer to the LEXenstein Manual.
+		An embedding store created with the convertWordVectorModel function can also be used.
 		@param orientation: Whether the feature is a simplicity of complexity measure.
 		Possible values: Complexity, Simplicity.
 		"""
@@ -3492,7 +4072,7 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if model not in self.resources:
-				m = gensim.models.KeyedVectors.load_word2vec_format(model, binary=True)
+				m = getWordVectorModel(model)
 				self.resources[model] = m
 			self.features.append((self.minimumWordVectorSimilarityFeature, [model]))
 			self.identifiers.append(('Minimum Word Vector Similarity (Model: '+model+')', orientation))
@@ -3504,6 +4084,7 @@ class FeatureEstimator:
 	
 		@param model: Path to a binary word vector model.
 		For instructions on how to create the model, please refer to the LEXenstein Manual.
+		An embedding store created with the convertWordVectorModel function can also be used.
 		@param orientation: Whether the feature is a simplicity of complexity measure.
 		Possible values: Complexity, Simplicity.
 		"""
@@ -3512,7 +4093,7 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if model not in self.resources:
-				m = gensim.models.KeyedVectors.load_word2vec_format(model, binary=True)
+				m = getWordVectorModel(model)
 				self.resources[model] = m
 			self.features.append((self.maximumWordVectorSimilarityFeature, [model]))
 			self.identifiers.append(('Maximum Word Vector Similarity (Model: '+model+')', orientation))
@@ -3524,6 +4105,7 @@ class FeatureEstimator:
 	
 		@param model: Path to a binary word vector model.
 		For instructions on how to create the model, please refer to the LEXenstein Manual.
+		An embedding store created with the convertWordVectorModel function can also be used.
 		@param orientation: Whether the feature is a simplicity of complexity measure.
 		Possible values: Complexity, Simplicity.
 		"""
@@ -3532,7 +4114,7 @@ class FeatureEstimator:
 			print('Orientation must be Complexity or Simplicity')
 		else:
 			if model not in self.resources:
-				m = gensim.models.KeyedVectors.load_word2vec_format(model, binary=True)
+				m = getWordVectorModel(model)
 				self.resources[model] = m
 			self.features.append((self.averageWordVectorSimilarityFeature, [model]))
 			self.identifiers.append(('Average Word Vector Similarity (Model: '+model+')', orientation))
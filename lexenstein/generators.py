@@ -11,6 +11,10 @@ import os
 import gensim
 from nltk.stem.wordnet import WordNetLemmatizer
 from nltk.stem.porter import PorterStemmer
+from lexenstein.embeddings import *
+from lexenstein.languagemodels import *
+from lexenstein.caches import *
+from lexenstein.workers import *
 
 class PaetzoldPhraseGenerator:
 
@@ -20,10 +24,11 @@ class PaetzoldPhraseGenerator:
 	
 		@param w2vmodel: Binary word vector model annotated with universal POS tags and phrases.
 		For more information on how to produce the model, please refer to the LEXenstein Manual.
+		An embedding store created with the convertWordVectorModel function can also be used.
 		"""
 		self.lemmatizer = WordNetLemmatizer()
 		self.stemmer = PorterStemmer()
-		self.model = gensim.models.KeyedVectors.load_word2vec_format(w2vmodel, binary=True)
+		self.model = getWordVectorModel(w2vmodel)
 		self.prohibited_edges = prohibited_edges
 		self.prohibited_chars = prohibited_chars
 
@@ -48,19 +53,14 @@ class PaetzoldPhraseGenerator:
 			data.append(d)
 		lexf.close()
 		
+		#Search the similar words of all targets at once:
+		words = [d[1].replace(' ', '_') for d in data]
+		most_sims = getMostSimilarWords(self.model, words, topn=50)
+
 		subs = []
 		cands = set([])
 		for i in range(0, len(data)):
-			d = data[i]
-
-			word = d[1].replace(' ', '_')
-
-			most_sim = []
-			try:
-				most_sim = self.model.most_similar(positive=[word], topn=50)
-			except KeyError:
-				most_sim = []
-
+			most_sim = most_sims[i] or []
 			subs.append([w[0] for w in most_sim])
 			
 		subs_filtered = self.filterSubs(data, subs)
@@ -143,6 +143,7 @@ class PaetzoldGenerator:
 	
 		@param posw2vmodel: Binary word vector model annotated with universal POS tags.
 		For more information on how to produce the model, please refer to the LEXenstein Manual.
+		An embedding store created with the convertWordVectorModel function can also be used.
 		@param nc: NorvigCorrector object.
 		@param pos_model: Path to a POS tagging model for the Stanford POS Tagger.
 		The models can be downloaded from the following link: http://nlp.stanford.edu/software/tagger.shtml
@@ -153,10 +154,12 @@ class PaetzoldGenerator:
 		"""
 		self.lemmatizer = WordNetLemmatizer()
 		self.stemmer = PorterStemmer()
-		self.model = gensim.models.KeyedVectors.load_word2vec_format(posw2vmodel, binary=True)
+		self.model = getWordVectorModel(posw2vmodel)
+		#Vocabulary indexes of the words of each tag, built on the first search:
+		self.partitions = None
 		self.nc = nc
 		os.environ['JAVAHOME'] = java_path
-		self.tagger = StanfordPOSTagger(pos_model, stanford_tagger)
+		self.tagger = getPOSTagger(pos_model, stanford_tagger, java_path)
 
 	def getSubstitutions(self, victor_corpus, amount):
 		"""
@@ -183,7 +186,7 @@ class PaetzoldGenerator:
 			sents.append(sent)
 		lexf.close()
 		
-		tagged_sents = self.tagger.tag_sents(sents)
+		tagged_sents = tagSentences(self.tagger, sents)
 		return tagged_sents
 
 	def getInitialSet(self, victor_corpus, tsents, amount):
@@ -222,63 +225,70 @@ class PaetzoldGenerator:
 			stem = trgsstems[i]
 			trgmap[target] = (lemma, stem)
 	
-		subs = []
-		cands = set([])
+		words = []
+		wordsc = []
 		for i in range(0, len(data)):
 			d = data[i]
 
 			t = trgs[i]
-			tstem = trgsstems[i]
-			tlemma = trgslemmas[i] 
 			tc = trgsc[i]
-			tcstem = trgscstems[i]
-			tclemma = trgsclemmas[i]
 
 			tags = tsents[i]
 			head = int(d[2].strip())
 			tag = tags[head][1]
 
-			word = t+'|||'+self.getClass(tag)
-			wordc = tc+'|||'+self.getClass(tag)
+			words.append(t+'|||'+self.getClass(tag))
+			wordsc.append(tc+'|||'+self.getClass(tag))
 
-			most_sim = []
-			try:
-				most_sim = self.model.most_similar(positive=[word], topn=50)
-			except KeyError:
-				try:
-					most_sim = self.model.most_similar(positive=[wordc], topn=50)
-				except KeyError:
-					most_sim = []
+		#Search similar words with the same tags as the targets, until enough of them are left after filtering:
+		subs_filtered = [[] for d in data]
+		candmap = {}
+		pending = list(range(0, len(data)))
+		topn = max(50, amount)
+		probes = getattr(self.model, 'probes', None)
+		while len(pending)>0:
+			most_sims = self.getMostSimilarWords([words[i] for i in pending], [wordsc[i] for i in pending], topn, probes)
 
-			subs.append([word[0] for word in most_sim])
-			
-		subsr = subs
-		subs = []
-		for l in subsr:
-			lr = []
-			for inst in l:
-				cand = inst.split('|||')[0].strip()
-				encc = None
-				try:
-					encc = cand.encode('ascii')
-				except Exception:
+			subs = []
+			cands = set([])
+			for most_sim in most_sims:
+				lr = []
+				for inst in [word[0] for word in most_sim or []]:
+					cand = inst.split('|||')[0].strip()
 					encc = None
-				if encc:
-					cands.add(cand)
-					lr.append(inst)
-			subs.append(lr)
-			
-		cands = list(cands)
-		candslemmas = self.lemmatizeWords(cands)
-		candsstems = self.stemWords(cands)
-		candmap = {}
-		for i in range(0, len(cands)):
-			cand = cands[i]
-			lemma = candslemmas[i]
-			stem = candsstems[i]
-			candmap[cand] = (lemma, stem)
-		
-		subs_filtered = self.filterSubs(data, tsents, subs, candmap, trgs, trgsc, trgsstems, trgscstems, trgslemmas, trgsclemmas)
+					try:
+						encc = cand.encode('ascii')
+					except Exception:
+						encc = None
+					if encc:
+						if cand not in candmap:
+							cands.add(cand)
+						lr.append(inst)
+				subs.append(lr)
+
+			cands = list(cands)
+			candslemmas = self.lemmatizeWords(cands)
+			candsstems = self.stemWords(cands)
+			for i in range(0, len(cands)):
+				cand = cands[i]
+				lemma = candslemmas[i]
+				stem = candsstems[i]
+				candmap[cand] = (lemma, stem)
+
+			sel = lambda values: [values[i] for i in pending]
+			filtered = self.filterSubs(sel(data), sel(tsents), subs, candmap, sel(trgs), sel(trgsc), sel(trgsstems), sel(trgscstems), sel(trgslemmas), sel(trgsclemmas))
+
+			#Search again the targets with too few candidates, if their tags have more words, visiting more clusters of approximate indexes:
+			remaining = []
+			for j in range(0, len(pending)):
+				subs_filtered[pending[j]] = filtered[j]
+				tag = words[pending[j]].split('|||')[-1]
+				if len(filtered[j])<amount and most_sims[j] is not None and len(self.partitions.get(tag, []))>topn+1:
+					remaining.append(pending[j])
+			pending = remaining
+			topn *= 2
+			if probes:
+				probes *= 2
 		
 		final_cands = {}
 		for i in range(0, len(data)):
@@ -291,6 +301,34 @@ class PaetzoldGenerator:
 		
 		return final_cands
 		
+	def getMostSimilarWords(self, words, wordsc, topn, probes=None):
+		#Build the partitions of the vocabulary by tag only once:
+		if self.partitions is None:
+			self.partitions = getWordVectorPartitions(self.model)
+
+		#Search each word only among the words with its tag, then the corrected versions of the words not found:
+		most_sims = self.getPartitionedSimilarWords(words, topn, probes)
+		missing = [i for i in range(0, len(words)) if most_sims[i] is None]
+		most_simsc = self.getPartitionedSimilarWords([wordsc[i] for i in missing], topn, probes)
+		for i in range(0, len(missing)):
+			most_sims[missing[i]] = most_simsc[i]
+		return most_sims
+
+	def getPartitionedSimilarWords(self, words, topn, probes=None):
+		groups = {}
+		for i in range(0, len(words)):
+			tag = words[i].split('|||')[-1]
+			if tag not in groups:
+				groups[tag] = []
+			groups[tag].append(i)
+		result = [None]*len(words)
+		for tag in groups:
+			if tag in self.partitions:
+				most_sims = getMostSimilarWords(self.model, [words[i] for i in groups[tag]], topn=topn, subset=self.partitions[tag], probes=probes)
+				for j in range(0, len(groups[tag])):
+					result[groups[tag][j]] = most_sims[j]
+		return result
+
 	def lemmatizeWords(self, words):
 		result = []
 		for word in words:
@@ -382,10 +420,11 @@ class GlavasGenerator:
 	
 		@param w2vmodel: Binary parsed word vector model.
 		For more information on how to produce the model, please refer to the LEXenstein Manual.
+		An embedding store created with the convertWordVectorModel function can also be used.
 		"""
 		self.lemmatizer = WordNetLemmatizer()
 		self.stemmer = PorterStemmer()
-		self.model = gensim.models.KeyedVectors.load_word2vec_format(w2vmodel, binary=True)
+		self.model = getWordVectorModel(w2vmodel)
 
 	def getSubstitutions(self, victor_corpus, amount):
 		"""
@@ -428,23 +467,13 @@ class GlavasGenerator:
 			stem = trgsstems[i]
 			trgmap[target] = (lemma, stem)
 	
+		#Search the similar words of all targets at once:
+		most_sims = getMostSimilarWords(self.model, trgs, topn=50)
+
 		subs = []
 		cands = set([])
 		for i in range(0, len(data)):
-			d = data[i]
-
-			t = trgs[i]
-			tstem = trgsstems[i]
-			tlemma = trgslemmas[i]
-
-			word = t
-
-			most_sim = []
-			try:
-				most_sim = self.model.most_similar(positive=[word], topn=50)
-			except KeyError:
-				most_sim = []
-
+			most_sim = most_sims[i] or []
 			subs.append([word[0] for word in most_sim])
 			
 		subsr = subs
@@ -529,7 +558,7 @@ class KauchakGenerator:
 		"""
 		Creates a KauchakGenerator instance.
 	
-		@param mat: MorphAdornerToolkit object.
+		@param mat: MorphAdornerToolkit object, or an InflectionToolkit object, which inflects words without resorting to MorphAdorner.
 		@param parallel_pos_file: Path to the parsed parallel corpus from which to extract substitutions.
 		For more information about the file's format, refer to the LEXenstein Manual.
 		@param alignments_file: Path to the alignments for the parsed parallel corpus from which to extract substitutions.
@@ -784,12 +813,17 @@ class KauchakGenerator:
 		return final_substitutions
 		
 	def getInflections(self, verbstems):
-		data1 = self.mat.conjugateVerbs(verbstems, 'PAST_PERFECT_PARTICIPLE', 'FIRST_PERSON_SINGULAR')
-		data2 = self.mat.conjugateVerbs(verbstems, 'PAST_PARTICIPLE', 'FIRST_PERSON_SINGULAR')
-		data3 = self.mat.conjugateVerbs(verbstems, 'PRESENT_PARTICIPLE', 'FIRST_PERSON_SINGULAR')
-		data4 = self.mat.conjugateVerbs(verbstems, 'PRESENT', 'FIRST_PERSON_SINGULAR')
-		data5 = self.mat.conjugateVerbs(verbstems, 'PAST', 'FIRST_PERSON_SINGULAR')
-		return self.correctWords(data1), self.correctWords(data2), self.correctWords(data3), self.correctWords(data4), self.correctWords(data5)
+		#Conjugate verbs in all tenses with a single request:
+		tenses = ['PAST_PERFECT_PARTICIPLE', 'PAST_PARTICIPLE', 'PRESENT_PARTICIPLE', 'PRESENT', 'PAST']
+		table = self.mat.conjugateVerbsTable(verbstems, tenses, ['FIRST_PERSON_SINGULAR'])
+		data = []
+		for tense in tenses:
+			data.extend(table[(tense, 'FIRST_PERSON_SINGULAR')])
+		
+		#Correct all conjugations at once:
+		data = self.correctWords(data)
+		n = len(verbstems)
+		return data[0:n], data[n:2*n], data[2*n:3*n], data[3*n:4*n], data[4*n:5*n]
 
 	def getSingulars(self, plurstems):
 		data = self.mat.inflectNouns(plurstems, 'singular')
@@ -826,9 +860,13 @@ class KauchakGenerator:
 		return self.correctWords(rsings), self.correctWords(rplurs), self.correctWords(rverbs)
 		
 	def correctWords(self, words):
+		#Correct each distinct word only once:
+		corrections = {}
 		result = []
 		for word in words:
-			result.append(self.nc.correct(word))
+			if word not in corrections:
+				corrections[word] = self.nc.correct(word)
+			result.append(corrections[word])
 		return result
 
 class YamamotoGenerator:
@@ -837,7 +875,7 @@ class YamamotoGenerator:
 		"""
 		Creates a YamamotoGenerator instance.
 	
-		@param mat: MorphAdornerToolkit object.
+		@param mat: MorphAdornerToolkit object, or an InflectionToolkit object, which inflects words without resorting to MorphAdorner.
 		@param dictionary_key: Key for the Merriam Dictionary.
 		@param nc: NorvigCorrector object.
 		For more information on how to get the key for free, please refer to the LEXenstein Manual
@@ -1026,12 +1064,17 @@ class YamamotoGenerator:
 		return final_substitutions
 		
 	def getInflections(self, verbstems):
-		data1 = self.mat.conjugateVerbs(verbstems, 'PAST_PERFECT_PARTICIPLE', 'FIRST_PERSON_SINGULAR')
-		data2 = self.mat.conjugateVerbs(verbstems, 'PAST_PARTICIPLE', 'FIRST_PERSON_SINGULAR')
-		data3 = self.mat.conjugateVerbs(verbstems, 'PRESENT_PARTICIPLE', 'FIRST_PERSON_SINGULAR')
-		data4 = self.mat.conjugateVerbs(verbstems, 'PRESENT', 'FIRST_PERSON_SINGULAR')
-		data5 = self.mat.conjugateVerbs(verbstems, 'PAST', 'FIRST_PERSON_SINGULAR')
-		return self.correctWords(data1), self.correctWords(data2), self.correctWords(data3), self.correctWords(data4), self.correctWords(data5)
+		#Conjugate verbs in all tenses with a single request:
+		tenses = ['PAST_PERFECT_PARTICIPLE', 'PAST_PARTICIPLE', 'PRESENT_PARTICIPLE', 'PRESENT', 'PAST']
+		table = self.mat.conjugateVerbsTable(verbstems, tenses, ['FIRST_PERSON_SINGULAR'])
+		data = []
+		for tense in tenses:
+			data.extend(table[(tense, 'FIRST_PERSON_SINGULAR')])
+		
+		#Correct all conjugations at once:
+		data = self.correctWords(data)
+		n = len(verbstems)
+		return data[0:n], data[n:2*n], data[2*n:3*n], data[3*n:4*n], data[4*n:5*n]
 
 	def getSingulars(self, plurstems):
 		data = self.mat.inflectNouns(plurstems, 'singular')
@@ -1110,9 +1153,13 @@ class YamamotoGenerator:
 		return substitutions_initial
 
 	def correctWords(self, words):
+		#Correct each distinct word only once:
+		corrections = {}
 		result = []
 		for word in words:
-			result.append(self.nc.correct(word))
+			if word not in corrections:
+				corrections[word] = self.nc.correct(word)
+			result.append(corrections[word])
 		return result
 
 class MerriamGenerator:
@@ -1121,7 +1168,7 @@ class MerriamGenerator:
 		"""
 		Creates a MerriamGenerator instance.
 	
-		@param mat: MorphAdornerToolkit object.
+		@param mat: MorphAdornerToolkit object, or an InflectionToolkit object, which inflects words without resorting to MorphAdorner.
 		@param thesaurus_key: Key for the Merriam Thesaurus.
 		For more information on how to get the key for free, please refer to the LEXenstein Manual
 		@param nc: NorvigCorrector object.
@@ -1310,12 +1357,17 @@ class MerriamGenerator:
 		return final_substitutions
 		
 	def getInflections(self, verbstems):
-		data1 = self.mat.conjugateVerbs(verbstems, 'PAST_PERFECT_PARTICIPLE', 'FIRST_PERSON_SINGULAR')
-		data2 = self.mat.conjugateVerbs(verbstems, 'PAST_PARTICIPLE', 'FIRST_PERSON_SINGULAR')
-		data3 = self.mat.conjugateVerbs(verbstems, 'PRESENT_PARTICIPLE', 'FIRST_PERSON_SINGULAR')
-		data4 = self.mat.conjugateVerbs(verbstems, 'PRESENT', 'FIRST_PERSON_SINGULAR')
-		data5 = self.mat.conjugateVerbs(verbstems, 'PAST', 'FIRST_PERSON_SINGULAR')
-		return self.correctWords(data1), self.correctWords(data2), self.correctWords(data3), self.correctWords(data4), self.correctWords(data5)
+		#Conjugate verbs in all tenses with a single request:
+		tenses = ['PAST_PERFECT_PARTICIPLE', 'PAST_PARTICIPLE', 'PRESENT_PARTICIPLE', 'PRESENT', 'PAST']
+		table = self.mat.conjugateVerbsTable(verbstems, tenses, ['FIRST_PERSON_SINGULAR'])
+		data = []
+		for tense in tenses:
+			data.extend(table[(tense, 'FIRST_PERSON_SINGULAR')])
+		
+		#Correct all conjugations at once:
+		data = self.correctWords(data)
+		n = len(verbstems)
+		return data[0:n], data[n:2*n], data[2*n:3*n], data[3*n:4*n], data[4*n:5*n]
 
 	def getSingulars(self, plurstems):
 		data = self.mat.inflectNouns(plurstems, 'singular')
@@ -1398,9 +1450,13 @@ class MerriamGenerator:
 		return substitutions_initial
 
 	def correctWords(self, words):
+		#Correct each distinct word only once:
+		corrections = {}
 		result = []
 		for word in words:
-			result.append(self.nc.correct(word))
+			if word not in corrections:
+				corrections[word] = self.nc.correct(word)
+			result.append(corrections[word])
 		return result
 
 #Class for the Wordnet Generator
@@ -1410,7 +1466,7 @@ class WordnetGenerator:
 		"""
 		Creates a WordnetGenerator instance.
 	
-		@param mat: MorphAdornerToolkit object.
+		@param mat: MorphAdornerToolkit object, or an InflectionToolkit object, which inflects words without resorting to MorphAdorner.
 		@param nc: NorvigCorrector object.
 		@param pos_model: Path to a POS tagging model for the Stanford POS Tagger.
 		The models can be downloaded from the following link: http://nlp.stanford.edu/software/tagger.shtml
@@ -1422,7 +1478,7 @@ class WordnetGenerator:
 		self.mat = mat
 		self.nc = nc
 		os.environ['JAVAHOME'] = java_path
-		self.tagger = StanfordPOSTagger(pos_model, stanford_tagger)
+		self.tagger = getPOSTagger(pos_model, stanford_tagger, java_path)
 
 	def getSubstitutions(self, victor_corpus):
 		"""
@@ -1842,7 +1898,7 @@ class WordnetGenerator:
 			heads.append(head)
 		lexf.close()
 		
-		tagged_sents = self.tagger.tag_sents(sents)
+		tagged_sents = tagSentences(self.tagger, sents)
 		
 		for i in range(0, len(sents)):
 			target = targets[i]
@@ -1875,9 +1931,13 @@ class WordnetGenerator:
 				subs[target][tag].extend(cands)
 		
 	def correctWords(self, words):
+		#Correct each distinct word only once:
+		corrections = {}
 		result = []
 		for word in words:
-			result.append(self.nc.correct(word))
+			if word not in corrections:
+				corrections[word] = self.nc.correct(word)
+			result.append(corrections[word])
 		return result
 
 	def cleanLemma(self, lem):
@@ -1902,7 +1962,7 @@ class BiranGenerator:
 		"""
 		Creates a BiranGenerator instance.
 	
-		@param mat: MorphAdornerToolkit object.
+		@param mat: MorphAdornerToolkit object, or an InflectionToolkit object, which inflects words without resorting to MorphAdorner.
 		@param complex_vocab: Path to a vocabulary of complex words.
 		For more information on how to create the file, refer to the LEXenstein Manual.
 		@param simple_vocab: Path to a vocabulary of simple words.
@@ -1922,12 +1982,12 @@ class BiranGenerator:
 
 		self.complex_vocab = self.getVocab(complex_vocab)
 		self.simple_vocab = self.getVocab(simple_vocab)
-		self.complex_lm = kenlm.LanguageModel(complex_lm)
-		self.simple_lm = kenlm.LanguageModel(simple_lm)
+		self.complex_lm = getLanguageModel(complex_lm)
+		self.simple_lm = getLanguageModel(simple_lm)
 		self.mat = mat
 		self.nc = nc
 		os.environ['JAVAHOME'] = java_path
-		self.tagger = StanfordPOSTagger(pos_model, stanford_tagger)
+		self.tagger = getPOSTagger(pos_model, stanford_tagger, java_path)
 
 	def getSubstitutions(self, victor_corpus):
 		"""
@@ -2188,7 +2248,7 @@ class BiranGenerator:
 			heads.append(head)
 		lexf.close()
 		
-		tagged_sents = self.tagger.tag_sents(sents)
+		tagged_sents = tagSentences(self.tagger, sents)
 		
 		for i in range(0, len(sents)):
 			target = targets[i]
@@ -2243,7 +2303,11 @@ class BiranGenerator:
 			return None
 
 	def correctWords(self, words):
+		#Correct each distinct word only once:
+		corrections = {}
 		result = []
 		for word in words:
-			result.append(self.nc.correct(word))
+			if word not in corrections:
+				corrections[word] = self.nc.correct(word)
+			result.append(corrections[word])
 		return result
@@ -0,0 +1,209 @@
+import re
+import codecs
+
+vowels = 'aeiouy'
+consonants = 'bcdfghjklmnpqrstvwxz'
+
+#Consonant pairs that are pronounced as a single consonant:
+digraphs = ['ch', 'ck', 'gh', 'ph', 'qu', 'sh', 'th', 'wh']
+
+#Vowel pairs that are pronounced in separate syllables, as in "radio", and the contexts in which they are not:
+split_vowels = ['ia', 'io', 'iu', 'ua', 'uo']
+joined_vowels = ['cia', 'cio', 'ciu', 'gia', 'gio', 'sia', 'sio', 'tia', 'tio', 'xio', 'nio', 'llia', 'llio']
+
+#Vowel pairs that are only pronounced in separate syllables in some contexts, as in "science", "idea" and "going", and the exceptions of these contexts, as in "friend" and "sea":
+hiatus_patterns = ['i1en', 'i1et', 'i1er.', 'i1ers.', 'e1a.', 'cre1a', 're1ali', '.re1act', 'the1at', '.re1i', 'de1it', 'de1o', 'the1o', 'ge1og', 'o1ic.', 'o1ics.', 'o1em', 'o1et', 'u1id.', 'u1ids.', 'ru1in', 'u1ity', 'y1er']
+joined_hiatus_patterns = ['i2end', 'ci2en', 'ti2en', 'sci3en', 'di2er', '.pi2er', '.ti2er', '.se2a.', '.te2a.', '.pe2a.', '.fle2a.', '.ple2a.', 'cre2atu', '.re2ig']
+
+def getDefaultPatterns():
+	"""
+	Produces a set of hyphenation patterns in the format of Liang's algorithm, which encode the syllabification rules of English:
+	a consonant between vowels starts a syllable (ba-con), consonant pairs between vowels are split (bas-ket), except when pronounced as one (fa-ther), and
+	"-le" endings take the consonant before them (ta-ble), while the silent endings "-e", "-es" and "-ed" do not form syllables (make, makes, loved).
+	Vowels followed by "-ing" (go-ing), and vowel pairs in the contexts listed in hiatus_patterns (sci-ence, i-de-a), are pronounced in separate syllables.
+
+	@return A list of patterns, such as "a1ba".
+	"""
+	patterns = []
+	for v1 in vowels:
+		for c in consonants:
+			for v2 in vowels:
+				patterns.append(v1 + '1' + c + v2)
+		for c1 in consonants:
+			for c2 in consonants:
+				patterns.append(v1 + c1 + '1' + c2)
+		for d in digraphs:
+			patterns.append(v1 + '1' + d)
+	for d in digraphs:
+		patterns.append(d[0] + '2' + d[1])
+		for c in consonants:
+			patterns.append(c + '1' + d)
+	for pair in split_vowels:
+		patterns.append(pair[0] + '1' + pair[1])
+	for group in joined_vowels:
+		patterns.append(group[0:-1] + '2' + group[-1])
+	for v in vowels:
+		patterns.append(v + '1ing')
+	patterns.extend(hiatus_patterns)
+	patterns.extend(joined_hiatus_patterns)
+	for v in vowels:
+		patterns.append('qu2' + v)
+	for c in consonants:
+		patterns.append('2' + c + 'e.')
+		patterns.append('3' + c + 'le.')
+		if c not in 'td':
+			patterns.append('2' + c + 'ed.')
+		if c not in 'cgsxzh':
+			patterns.append('2' + c + 'es.')
+		for c1 in consonants:
+			if c not in 'td':
+				patterns.append(c1 + '2' + c + 'ed.')
+			if c not in 'cgsxzh':
+				patterns.append(c1 + '2' + c + 'es.')
+	return patterns
+
+def readPatternFile(path):
+	"""
+	Reads the hyphenation patterns of a file in the format distributed with TeX, such as the "hyph-en-us.pat.txt" file of the hyph-utf8 project.
+
+	@param path: Path to the file.
+	@return A list of patterns.
+	"""
+	patterns = []
+	f = codecs.open(path, encoding='utf8')
+	for line in f:
+		line = line.split('%')[0]
+		for token in line.strip().split():
+			if '\\' not in token and '{' not in token and '}' not in token:
+				patterns.append(token)
+	f.close()
+	return patterns
+
+def isApostrophe(separator):
+	#Both straight and typographic apostrophes are accepted, either as text or as UTF-8 bytes:
+	if isinstance(separator, bytes):
+		return separator in [b"'", b'\xe2\x80\x99']
+	return separator in [u"'", u'\u2019']
+
+class HyphenationSyllabifier:
+
+	def __init__(self, patterns=None, exceptions={}, max_memo=1000000):
+		"""
+		Creates an instance of the HyphenationSyllabifier class.
+		A HyphenationSyllabifier splits words in syllables with Liang's hyphenation algorithm, without resorting to external processes.
+		It can be used in place of a MorphAdornerToolkit object by FeatureEstimator's addSyllableFeature.
+		The syllables of each word are calculated only once.
+
+		@param patterns: Path to a file of hyphenation patterns in the format distributed with TeX, such as "hyph-en-us.pat.txt".
+		If None, the patterns produced by getDefaultPatterns are used.
+		@param exceptions: Dictionary that assigns words to their syllables separated by hyphens, such as {'table': 'ta-ble'}.
+		@param max_memo: Maximum number of words whose syllables are kept in memory.
+		"""
+		self.pattern_file = patterns
+		if patterns is None:
+			patterns = getDefaultPatterns()
+		else:
+			patterns = readPatternFile(patterns)
+		self.patterns = {}
+		self.max_length = 0
+		for pattern in patterns:
+			self.addPattern(pattern)
+		self.exceptions = {}
+		for word in exceptions:
+			self.exceptions[word.lower()] = exceptions[word].split('-')
+		self.max_memo = max_memo
+		self.memo = {}
+
+	def addPattern(self, pattern):
+		#Store the letters of the pattern and the values between them:
+		letters = re.sub('[0-9]', '', pattern)
+		values = [0]*(len(letters)+1)
+		position = 0
+		for char in pattern:
+			if char.isdigit():
+				values[position] = int(char)
+			else:
+				position += 1
+		self.patterns[letters] = values
+		self.max_length = max(self.max_length, len(letters))
+
+	def getSyllables(self, word):
+		"""
+		Splits a word in syllables.
+
+		@param word: Word to be split.
+		@return: List of the syllables of the word.
+		"""
+		if word in self.memo:
+			return self.memo[word]
+		result = []
+		#Split words at characters other than letters, as in "well-known":
+		parts = re.split('([^a-zA-Z]+)', word)
+		for i in range(0, len(parts), 2):
+			if len(parts[i])>0:
+				syllables = self.hyphenate(parts[i])
+				#Join contractions after apostrophes to the syllables before them, as in "doesn't" and "they're":
+				if len(result)>0 and isApostrophe(parts[i-1]) and (parts[i].lower() in ['re', 've'] or not re.search('[aeiouy]', parts[i].lower())):
+					result[-1] += parts[i-1] + parts[i]
+				else:
+					result.extend(syllables)
+		if len(result)==0:
+			result = [word]
+		if len(self.memo)>=self.max_memo:
+			self.memo = {}
+		self.memo[word] = result
+		return result
+
+	def hyphenate(self, word):
+		lower = word.lower()
+		if lower in self.exceptions:
+			return self.exceptions[lower]
+
+		#Find the highest value of all patterns at each position of the word:
+		work = '.' + lower + '.'
+		points = [0]*(len(work)+1)
+		for i in range(0, len(work)):
+			for j in range(i+1, min(len(work), i+self.max_length)+1):
+				values = self.patterns.get(work[i:j])
+				if values:
+					for k in range(0, len(values)):
+						if values[k]>points[i+k]:
+							points[i+k] = values[k]
+
+		#Split word at odd values:
+		result = []
+		start = 0
+		for i in range(1, len(word)):
+			if points[i+1] % 2 == 1:
+				result.append(word[start:i])
+				start = i
+		result.append(word[start:])
+
+		#Join syllables without vowels to the ones before them, as in "strength":
+		syllables = []
+		for part in result:
+			if len(syllables)>0 and not re.search('[aeiouy]', part.lower()):
+				syllables[-1] += part
+			else:
+				syllables.append(part)
+		if len(syllables)>1 and not re.search('[aeiouy]', syllables[0].lower()):
+			syllables = [syllables[0]+syllables[1]] + syllables[2:]
+		return syllables
+
+	def countSyllables(self, word):
+		"""
+		Counts the syllables of a word.
+
+		@param word: Word whose syllables are to be counted.
+		@return: The number of syllables of the word.
+		"""
+		return len(self.getSyllables(word))
+
+	def splitSyllables(self, words):
+		"""
+		Splits a set of words in syllables, as MorphAdornerToolkit's splitSyllables does.
+
+		@param words: List of words to be split.
+		@return: List of words with their syllables separated by hyphen markers.
+		"""
+		return ['-'.join(self.getSyllables(word)) for word in words]
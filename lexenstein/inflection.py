@@ -0,0 +1,597 @@
+import re
+from nltk.stem.porter import PorterStemmer
+from lexenstein.hyphenation import *
+
+#Irregular verbs, as "lemma past past_participle":
+irregular_verb_data = '''arise arose arisen
+awake awoke awoken
+be was been
+bear bore borne
+beat beat beaten
+become became become
+begin began begun
+bend bent bent
+bet bet bet
+bind bound bound
+bite bit bitten
+bleed bled bled
+blow blew blown
+break broke broken
+breed bred bred
+bring brought brought
+build built built
+burn burnt burnt
+burst burst burst
+buy bought bought
+cast cast cast
+catch caught caught
+choose chose chosen
+cling clung clung
+come came come
+cost cost cost
+creep crept crept
+cut cut cut
+deal dealt dealt
+dig dug dug
+do did done
+draw drew drawn
+dream dreamt dreamt
+drink drank drunk
+drive drove driven
+eat ate eaten
+fall fell fallen
+feed fed fed
+feel felt felt
+fight fought fought
+find found found
+flee fled fled
+fling flung flung
+fly flew flown
+forbid forbade forbidden
+forecast forecast forecast
+foresee foresaw foreseen
+forget forgot forgotten
+forgive forgave forgiven
+freeze froze frozen
+get got gotten
+give gave given
+go went gone
+grind ground ground
+grow grew grown
+hang hung hung
+have had had
+hear heard heard
+hide hid hidden
+hit hit hit
+hold held held
+hurt hurt hurt
+keep kept kept
+kneel knelt knelt
+know knew known
+lay laid laid
+lead led led
+lean leant leant
+leap leapt leapt
+learn learnt learnt
+leave left left
+lend lent lent
+let let let
+lie lay lain
+light lit lit
+lose lost lost
+make made made
+mean meant meant
+meet met met
+mislead misled misled
+mistake mistook mistaken
+overcome overcame overcome
+overtake overtook overtaken
+pay paid paid
+prove proved proven
+put put put
+quit quit quit
+read read read
+rid rid rid
+ride rode ridden
+ring rang rung
+rise rose risen
+run ran run
+say said said
+see saw seen
+seek sought sought
+sell sold sold
+send sent sent
+set set set
+sew sewed sewn
+shake shook shaken
+shed shed shed
+shine shone shone
+shoot shot shot
+show showed shown
+shrink shrank shrunk
+shut shut shut
+sing sang sung
+sink sank sunk
+sit sat sat
+sleep slept slept
+slide slid slid
+sling slung slung
+slit slit slit
+speak spoke spoken
+speed sped sped
+spend spent spent
+spin spun spun
+spit spat spat
+split split split
+spread spread spread
+spring sprang sprung
+stand stood stood
+steal stole stolen
+stick stuck stuck
+sting stung stung
+stink stank stunk
+stride strode stridden
+strike struck struck
+string strung strung
+strive strove striven
+swear swore sworn
+sweep swept swept
+swell swelled swollen
+swim swam swum
+swing swung swung
+take took taken
+teach taught taught
+tear tore torn
+tell told told
+think thought thought
+throw threw thrown
+thrust thrust thrust
+tread trod trodden
+undergo underwent undergone
+understand understood understood
+undertake undertook undertaken
+undo undid undone
+upset upset upset
+wake woke woken
+wear wore worn
+weave wove woven
+weep wept wept
+win won won
+wind wound wound
+withdraw withdrew withdrawn
+withhold withheld withheld
+withstand withstood withstood
+wring wrung wrung
+write wrote written'''
+
+#Irregular nouns, as "singular plural":
+irregular_noun_data = '''alumnus alumni
+analysis analyses
+axis axes
+bacterium bacteria
+basis bases
+cactus cacti
+calf calves
+child children
+crisis crises
+criterion criteria
+curriculum curricula
+datum data
+diagnosis diagnoses
+elf elves
+foot feet
+fungus fungi
+goose geese
+half halves
+hypothesis hypotheses
+knife knives
+leaf leaves
+life lives
+loaf loaves
+louse lice
+man men
+medium media
+mouse mice
+nucleus nuclei
+oasis oases
+ox oxen
+parenthesis parentheses
+person people
+phenomenon phenomena
+radius radii
+self selves
+sheaf sheaves
+shelf shelves
+stimulus stimuli
+syllabus syllabi
+thesis theses
+thief thieves
+tooth teeth
+wife wives
+wolf wolves
+woman women'''
+
+#Nouns with identical singular and plural forms:
+uninflected_nouns = set('aircraft bison cattle deer equipment fish information moose news offspring salmon series sheep shrimp species swine trout'.split())
+
+#Nouns ending in "o" that take "es" in the plural:
+es_nouns = set('echo embargo hero potato tomato torpedo veto'.split())
+
+#Irregular adjectives and adverbs, as "lemma comparative superlative":
+irregular_adjective_data = '''bad worse worst
+far farther farthest
+good better best
+ill worse worst
+little less least
+many more most
+much more most
+well better best'''
+
+#Verbs ending in "ee" whose past forms end in "eed", and forms with final "e" too short for the suffix rules:
+ee_verbs = set('agree decree disagree free guarantee knee referee'.split())
+short_lemmas = {'owed': 'owe', 'owing': 'owe', 'eyed': 'eye', 'eying': 'eye', 'died': 'die', 'lied': 'lie', 'tied': 'tie', 'sued': 'sue', 'suing': 'sue'}
+
+#Verbs of more than one syllable that double their final consonant:
+doubling_verbs = set('abhor admit begin commit compel confer control deter equip excel expel forget incur infer occur omit patrol permit prefer propel rebel recur refer regret submit transfer upset'.split())
+
+#Tables compiled from the data above, loaded once per process:
+irregular_verbs = {}
+irregular_nouns = {}
+irregular_adjectives = {}
+irregular_lemmas = {}
+for line in irregular_verb_data.split('\n'):
+	lemma, past, participle = line.split(' ')
+	irregular_verbs[lemma] = (past, participle)
+	irregular_lemmas.setdefault(past, lemma)
+	irregular_lemmas.setdefault(participle, lemma)
+for line in irregular_noun_data.split('\n'):
+	singular, plural = line.split(' ')
+	irregular_nouns[singular] = plural
+	irregular_lemmas.setdefault(plural, singular)
+for line in irregular_adjective_data.split('\n'):
+	lemma, comparative, superlative = line.split(' ')
+	irregular_adjectives[lemma] = (comparative, superlative)
+	irregular_lemmas.setdefault(comparative, lemma)
+	irregular_lemmas.setdefault(superlative, lemma)
+irregular_singulars = dict([(irregular_nouns[singular], singular) for singular in irregular_nouns])
+for lemma in ['was', 'were', 'is', 'am', 'are', 'been', 'being']:
+	irregular_lemmas[lemma] = 'be'
+for lemma in ['has', 'having']:
+	irregular_lemmas[lemma] = 'have'
+irregular_lemmas['does'] = 'do'
+irregular_lemmas['goes'] = 'go'
+
+vowels = 'aeiou'
+cvc_pattern = re.compile('(^|[^aeiou])[aeiou][^aeiouwxy]$')
+vowel_groups = re.compile('[aeiouy]+')
+
+class InflectionToolkit:
+
+	def __init__(self):
+		"""
+		Creates an instance of the InflectionToolkit class.
+		An InflectionToolkit inflects English words with suffix rules and tables of irregular forms, without resorting to external processes.
+		It offers the same methods as the MorphAdornerToolkit class, and can be used in place of it by any of LEXenstein's classes.
+		"""
+		self.stemmer = PorterStemmer()
+		self.syllabifier = HyphenationSyllabifier()
+
+	def lemmatizeWords(self, words):
+		"""
+		Lemmatizes a set of words.
+
+		@param words: List of words to be lemmatized.
+		@return: List of the lemmas of the words passed as input.
+		"""
+		return [self.lemmatize(word) for word in words]
+
+	def stemWords(self, words):
+		"""
+		Porter stems a set of words.
+
+		@param words: List of words to be Porter stemmed.
+		@return: List of the Porter stems of the words passed as input.
+		"""
+		return [self.stemmer.stem(word) for word in words]
+
+	def conjugateVerbs(self, lemmas, tense, person):
+		"""
+		Conjugate a set of verbs in a given tense.
+		Perfect tenses are produced with auxiliary verbs, as in "have walked".
+
+		@param lemmas: Lemmas of verbs to be conjugated.
+		@param tense: Tense in which to conjugate the verbs.
+		Tenses available: PAST, PAST_PARTICIPLE, PAST_PERFECT, PAST_PERFECT_PARTICIPLE, PERFECT, PRESENT, PRESENT_PARTICIPLE.
+		@param person: Person in which to conjugate the verbs.
+		Tenses available: FIRST_PERSON_SINGULAR, FIRST_PERSON_PLURAL, SECOND_PERSON_SINGULAR, SECOND_PERSON_PLURAL, THIRD_PERSON_SINGULAR, THIRD_PERSON_PLURAL.
+		@return: List of the conjugated versions of the verb lemmas passed as input.
+		"""
+		return [self.conjugate(lemma, tense, person) for lemma in lemmas]
+
+	def conjugateVerbsTable(self, lemmas, tenses, persons=['FIRST_PERSON_SINGULAR']):
+		"""
+		Conjugate a set of verbs in several tenses and persons at once.
+
+		@param lemmas: Lemmas of verbs to be conjugated.
+		@param tenses: List of tenses in which to conjugate the verbs.
+		Tenses available: PAST, PAST_PARTICIPLE, PAST_PERFECT, PAST_PERFECT_PARTICIPLE, PERFECT, PRESENT, PRESENT_PARTICIPLE.
+		@param persons: List of persons in which to conjugate the verbs.
+		Persons available: FIRST_PERSON_SINGULAR, FIRST_PERSON_PLURAL, SECOND_PERSON_SINGULAR, SECOND_PERSON_PLURAL, THIRD_PERSON_SINGULAR, THIRD_PERSON_PLURAL.
+		@return: Dictionary that assigns each (tense, person) tuple to the list of conjugated versions of the verb lemmas passed as input.
+		"""
+		result = {}
+		for tense in tenses:
+			for person in persons:
+				result[(tense, person)] = self.conjugateVerbs(lemmas, tense, person)
+		return result
+
+	def inflectNouns(self, lemmas, number):
+		"""
+		Inflect a list of nouns to its singular or plural form.
+
+		@param lemmas: Lemmas of nouns to be inflected.
+		@param number: Form in which to inflect the lemmas.
+		Forms available: singular, plural.
+		@return: List of the inflected versions of the noun lemmas passed as input.
+		"""
+		if number=='plural':
+			return [self.pluralize(lemma) for lemma in lemmas]
+		return [self.singularize(lemma) for lemma in lemmas]
+
+	def tenseVerbs(self, lemmas, verbs):
+		"""
+		Retrieve the tense of a given set of verbs.
+
+		@param lemmas: Lemmas of verbs to be tensed.
+		@param verbs: Verbs in their original forms.
+		@return: List of the tenses and persons of the verb passed as input.
+		Tenses available: PAST, PAST_PARTICIPLE, PAST_PERFECT, PAST_PERFECT_PARTICIPLE, PERFECT, PRESENT, PRESENT_PARTICIPLE.
+		Persons available: FIRST_PERSON_SINGULAR, FIRST_PERSON_PLURAL, SECOND_PERSON_SINGULAR, SECOND_PERSON_PLURAL, THIRD_PERSON_SINGULAR, THIRD_PERSON_PLURAL.
+		"""
+		result = []
+		for i in range(0, len(lemmas)):
+			lemma = lemmas[i].lower()
+			verb = verbs[i].lower()
+			if verb==self.getPresentParticiple(lemma):
+				result.append(['PRESENT_PARTICIPLE', 'FIRST_PERSON_SINGULAR'])
+			elif verb==self.getThirdPerson(lemma):
+				result.append(['PRESENT', 'THIRD_PERSON_SINGULAR'])
+			elif verb==self.getPast(lemma) or verb=='were':
+				result.append(['PAST', 'FIRST_PERSON_SINGULAR'])
+			elif verb==self.getPastParticiple(lemma):
+				result.append(['PAST_PARTICIPLE', 'FIRST_PERSON_SINGULAR'])
+			else:
+				result.append(['PRESENT', 'FIRST_PERSON_SINGULAR'])
+		return result
+
+	def splitSyllables(self, words):
+		"""
+		Splits a set of words in syllables, with the hyphenation patterns of a HyphenationSyllabifier.
+
+		@param words: List of words to be lemmatized.
+		@return: List of words with their syllables separated by hyphen markers.
+		"""
+		return self.syllabifier.splitSyllables(words)
+
+	def inflectAdjectives(self, lemmas, form):
+		"""
+		Inflect a list of adjectives/adverbs to its singular or plural form.
+
+		@param lemmas: Lemmas of adjectives/adverbs to be inflected.
+		@param form: Form in which to inflect the lemmas.
+		Forms available: comparative, superlative.
+		@return: List of the inflected versions of the adjective/adverb lemmas passed as input.
+		"""
+		return [self.compare(lemma, form) for lemma in lemmas]
+
+	def lemmatize(self, word):
+		w = word.lower()
+		if w in irregular_lemmas:
+			return irregular_lemmas[w]
+		if w in irregular_verbs or w in irregular_nouns or w in uninflected_nouns:
+			return w
+		if w in short_lemmas:
+			return short_lemmas[w]
+		#Participles and past forms:
+		if w.endswith('ying') and len(w)==5:
+			return w[0] + 'ie'
+		#Verbs ending in "ee" keep it, as in "agreed" and "seeing", while other words ending in "eed" are lemmas, as in "need":
+		if w.endswith('eed'):
+			return w[0:len(w)-1] if w[0:len(w)-1] in ee_verbs else w
+		if w.endswith('eeing'):
+			return w[0:len(w)-3]
+		for suffix in ['ing', 'ed']:
+			if w.endswith(suffix) and len(w)>len(suffix)+1:
+				stem = w[0:len(w)-len(suffix)]
+				if not any([c in vowels+'y' for c in stem]):
+					continue
+				if suffix=='ed' and stem.endswith('i'):
+					return stem[0:len(stem)-1] + 'y'
+				return self.restoreStem(stem)
+		#Plurals and third person forms:
+		if w.endswith('ies') and len(w)>4:
+			return w[0:len(w)-3] + 'y'
+		if w.endswith('ves') and w in irregular_singulars:
+			return irregular_singulars[w]
+		if re.search('(ss|x|z|ch|sh)es$', w) or (w.endswith('oes') and w[0:len(w)-2] in es_nouns):
+			return w[0:len(w)-2]
+		if w.endswith('s') and not re.search('(ss|us|is)$', w) and len(w)>3:
+			return w[0:len(w)-1]
+		#Comparatives and superlatives:
+		for suffix in ['iest', 'ier']:
+			if w.endswith(suffix) and len(w)>len(suffix)+2:
+				return w[0:len(w)-len(suffix)] + 'y'
+		return w
+
+	def restoreStem(self, stem):
+		#Undo consonant doubling, as in "stopped":
+		if len(stem)>2 and stem[-1]==stem[-2] and stem[-1] not in vowels+'lsz':
+			return stem[0:len(stem)-1]
+		#Restore final "e", as in "making" and "produced":
+		if re.search('(v|[^z]z|c|dg|ur|at|ut)$', stem) and not re.search('[aeiou][aeiou][^aeiou]$', stem):
+			return stem + 'e'
+		if len(vowel_groups.findall(stem))==1 and cvc_pattern.search(stem):
+			return stem + 'e'
+		return stem
+
+	def pluralize(self, word):
+		w = word.lower()
+		if w in irregular_nouns:
+			return irregular_nouns[w]
+		if w in uninflected_nouns:
+			return w
+		if re.search('(s|x|z|ch|sh)$', w) or w in es_nouns:
+			return w + 'es'
+		if re.search('[^aeiou]y$', w):
+			return w[0:len(w)-1] + 'ies'
+		return w + 's'
+
+	def singularize(self, word):
+		w = word.lower()
+		if w in irregular_singulars:
+			return irregular_singulars[w]
+		if w in uninflected_nouns or w in irregular_nouns:
+			return w
+		if w.endswith('ies') and len(w)>4:
+			return w[0:len(w)-3] + 'y'
+		if re.search('(ss|x|z|ch|sh)es$', w) or (w.endswith('oes') and w[0:len(w)-2] in es_nouns):
+			return w[0:len(w)-2]
+		if w.endswith('s') and not re.search('(ss|us|is)$', w):
+			return w[0:len(w)-1]
+		return w
+
+	def conjugate(self, lemma, tense, person):
+		w = lemma.lower()
+		if tense=='PRESENT':
+			if w=='be':
+				return {'FIRST_PERSON_SINGULAR': 'am', 'THIRD_PERSON_SINGULAR': 'is'}.get(person, 'are')
+			if person=='THIRD_PERSON_SINGULAR':
+				return self.getThirdPerson(w)
+			return w
+		if tense=='PAST':
+			if w=='be' and person not in ['FIRST_PERSON_SINGULAR', 'THIRD_PERSON_SINGULAR']:
+				return 'were'
+			return self.getPast(w)
+		if tense=='PAST_PARTICIPLE':
+			return self.getPastParticiple(w)
+		if tense=='PRESENT_PARTICIPLE':
+			return self.getPresentParticiple(w)
+		if tense=='PERFECT':
+			if person=='THIRD_PERSON_SINGULAR':
+				return 'has ' + self.getPastParticiple(w)
+			return 'have ' + self.getPastParticiple(w)
+		if tense=='PAST_PERFECT':
+			return 'had ' + self.getPastParticiple(w)
+		if tense=='PAST_PERFECT_PARTICIPLE':
+			return 'having ' + self.getPastParticiple(w)
+		return w
+
+	def getThirdPerson(self, w):
+		if w in ['be', 'have']:
+			return {'be': 'is', 'have': 'has'}[w]
+		if re.search('(s|x|z|ch|sh|[^aeiou]o)$', w):
+			return w + 'es'
+		if re.search('[^aeiou]y$', w):
+			return w[0:len(w)-1] + 'ies'
+		return w + 's'
+
+	def getPast(self, w):
+		if w in irregular_verbs:
+			return irregular_verbs[w][0]
+		return self.getRegularPast(w)
+
+	def getPastParticiple(self, w):
+		if w in irregular_verbs:
+			return irregular_verbs[w][1]
+		return self.getRegularPast(w)
+
+	def getRegularPast(self, w):
+		if w.endswith('e'):
+			return w + 'd'
+		if re.search('[^aeiou]y$', w):
+			return w[0:len(w)-1] + 'ied'
+		if w.endswith('c'):
+			return w + 'ked'
+		return self.getDoubledStem(w) + 'ed'
+
+	def getPresentParticiple(self, w):
+		if w=='be':
+			return 'being'
+		if w.endswith('ie'):
+			return w[0:len(w)-2] + 'ying'
+		if w.endswith('e') and not re.search('(ee|ye|oe)$', w) and len(w)>2:
+			return w[0:len(w)-1] + 'ing'
+		if w.endswith('c'):
+			return w + 'king'
+		return self.getDoubledStem(w) + 'ing'
+
+	def getDoubledStem(self, w):
+		#Double the final consonant of monosyllables, as in "stopping":
+		if w in doubling_verbs or (len(vowel_groups.findall(w))==1 and cvc_pattern.search(w)):
+			return w + w[-1]
+		return w
+
+	def compare(self, lemma, form):
+		w = lemma.lower()
+		index = 0 if form=='comparative' else 1
+		if w in irregular_adjectives:
+			return irregular_adjectives[w][index]
+		syllables = self.syllabifier.countSyllables(w)
+		if w.endswith('ly') or syllables>2 or (syllables==2 and not w.endswith('y')):
+			return ['more ', 'most '][index] + w
+		suffix = ['er', 'est'][index]
+		if w.endswith('e'):
+			return w + suffix[1:]
+		if re.search('[^aeiou]y$', w):
+			return w[0:len(w)-1] + 'i' + suffix
+		if syllables==1 and cvc_pattern.search(w):
+			return w + w[-1] + suffix
+		return w + suffix
+
+def getAgreementReport(toolkit, reference, words):
+	"""
+	Compares the outputs of two inflection toolkits over a list of words, such as the outputs of an InflectionToolkit and a MorphAdornerToolkit.
+
+	@param toolkit: An object with the methods of the MorphAdornerToolkit class.
+	@param reference: An object with the methods of the MorphAdornerToolkit class, whose outputs are taken as correct.
+	@param words: List of words to be processed by all operations.
+	Syllables are compared by their number, since toolkits may split words in different places.
+	@return A dictionary that assigns the name of each operation to a dictionary with the following keys:
+	agreement (proportion of words with equal outputs), and disagreements (list of (word, output, reference output) tuples).
+	"""
+	operations = {}
+	operations['lemmatize'] = lambda t: t.lemmatizeWords(words)
+	operations['singular'] = lambda t: t.inflectNouns(words, 'singular')
+	operations['plural'] = lambda t: t.inflectNouns(words, 'plural')
+	operations['comparative'] = lambda t: t.inflectAdjectives(words, 'comparative')
+	operations['superlative'] = lambda t: t.inflectAdjectives(words, 'superlative')
+	operations['PRESENT THIRD_PERSON_SINGULAR'] = lambda t: t.conjugateVerbs(words, 'PRESENT', 'THIRD_PERSON_SINGULAR')
+	for tense in ['PAST', 'PAST_PARTICIPLE', 'PRESENT_PARTICIPLE', 'PAST_PERFECT_PARTICIPLE']:
+		operations[tense + ' FIRST_PERSON_SINGULAR'] = (lambda tense: lambda t: t.conjugateVerbs(words, tense, 'FIRST_PERSON_SINGULAR'))(tense)
+	operations['syllables'] = lambda t: [str(len(line.strip().split('-'))) for line in t.splitSyllables(words)]
+
+	report = {}
+	for name in operations:
+		outputs = operations[name](toolkit)
+		references = operations[name](reference)
+		disagreements = []
+		for i in range(0, len(words)):
+			output = outputs[i].strip() if i<len(outputs) else ''
+			expected = references[i].strip() if i<len(references) else ''
+			if output!=expected:
+				disagreements.append((words[i], output, expected))
+		agreement = 1.0
+		if len(words)>0:
+			agreement = 1.0-float(len(disagreements))/float(len(words))
+		report[name] = {'agreement': agreement, 'disagreements': disagreements}
+	return report
+
+def printAgreementReport(report):
+	"""
+	Prints the agreement of each operation in a report produced by getAgreementReport, along with some of its disagreements.
+
+	@param report: A dictionary produced by getAgreementReport.
+	"""
+	for name in sorted(report.keys()):
+		examples = ['/'.join(d) for d in report[name]['disagreements'][0:5]]
+		print(name + '\t' + '%.4f' % report[name]['agreement'] + '\t' + ' '.join(examples))
@@ -0,0 +1,125 @@
+import os
+import time
+import kenlm
+
+#Language models loaded in this process, indexed by path:
+loaded_language_models = {}
+
+#Loading statistics of each language model, indexed by path:
+language_model_stats = {}
+
+#Load method used when none is specified:
+default_load_method = 'populate'
+
+def getLoadMethods():
+	#Map the names of the load methods to the ones of kenlm:
+	methods = {'lazy': kenlm.LoadMethod.LAZY, 'populate': kenlm.LoadMethod.POPULATE_OR_READ, 'populate_or_lazy': kenlm.LoadMethod.POPULATE_OR_LAZY, 'read': kenlm.LoadMethod.READ, 'parallel_read': kenlm.LoadMethod.PARALLEL_READ}
+	return methods
+
+def setDefaultLoadMethod(load_method):
+	"""
+	Sets the load method used by getLanguageModel when none is specified.
+	This affects all of LEXenstein's classes that use language models, such as BottRanker and FeatureEstimator.
+
+	@param load_method: How binary language models are loaded.
+	Values supported: lazy (memory-maps the model, which is read from disk as it is queried), populate (memory-maps the model and reads it all at once), populate_or_lazy, read (reads the model into allocated memory), parallel_read.
+	Models in ARPA format are always read.
+	"""
+	global default_load_method
+	if load_method not in getLoadMethods():
+		print('Load method must be one of: ' + ', '.join(sorted(getLoadMethods().keys())))
+	else:
+		default_load_method = load_method
+
+def getLanguageModel(path, load_method=None):
+	"""
+	Returns the language model stored in a given path.
+	Each model is loaded only once per process: all components that request the same path share the same object.
+	If a model was already loaded, it is returned regardless of the load method requested.
+
+	@param path: Path to a language model in ARPA or kenlm binary format.
+	@param load_method: How the model is loaded, as described in setDefaultLoadMethod.
+	If None, the default load method is used.
+	@return A kenlm.LanguageModel object.
+	"""
+	if path not in loaded_language_models:
+		if load_method is None:
+			load_method = default_load_method
+		config = kenlm.Config()
+		config.load_method = getLoadMethods()[load_method]
+
+		#Load model and measure the resources spent:
+		resident = getProcessResidentSize()
+		start = time.time()
+		loaded_language_models[path] = kenlm.LanguageModel(path, config)
+		stats = {}
+		stats['load_method'] = load_method
+		stats['load_time'] = time.time()-start
+		stats['load_resident_size'] = getProcessResidentSize()-resident
+		#Memory allocated for the model, as opposed to memory-mapped from its file:
+		stats['allocated_size'] = max(0, stats['load_resident_size']-getMappedResidentSize(path))
+		language_model_stats[path] = stats
+	return loaded_language_models[path]
+
+def releaseLanguageModel(path):
+	"""
+	Removes a language model from the models loaded in this process.
+	The model's memory is released once no component references it.
+
+	@param path: Path with which the model was loaded.
+	"""
+	if path in loaded_language_models:
+		del loaded_language_models[path]
+		del language_model_stats[path]
+
+def getLanguageModelStats():
+	"""
+	Returns the loading statistics of the language models loaded in this process.
+
+	@return A dictionary that assigns the path of each model to a dictionary with the following keys:
+	load_method, load_time (in seconds), load_resident_size (growth of the process' resident memory during loading, in bytes), allocated_size (memory allocated for the model, in bytes), and resident_size (current amount of memory occupied by the model, in bytes).
+	The current resident size includes the pages of memory-mapped models that were read from disk so far, and can only be measured in Linux systems.
+	"""
+	result = {}
+	for path in language_model_stats:
+		stats = dict(language_model_stats[path])
+		stats['resident_size'] = stats['allocated_size'] + getMappedResidentSize(path)
+		result[path] = stats
+	return result
+
+def printLanguageModelStats():
+	"""
+	Prints the loading statistics of the language models loaded in this process.
+	"""
+	stats = getLanguageModelStats()
+	for path in sorted(stats.keys()):
+		s = stats[path]
+		print(path + '\t' + s['load_method'] + '\t' + '%.2f' % s['load_time'] + 's\t' + '%.1f' % (s['resident_size']/1048576.0) + 'MB')
+
+def getProcessResidentSize():
+	#Read the resident set size of the process, in bytes:
+	try:
+		f = open('/proc/self/statm')
+		pages = int(f.read().split()[1])
+		f.close()
+		return pages*os.sysconf('SC_PAGE_SIZE')
+	except Exception:
+		return 0
+
+def getMappedResidentSize(path):
+	#Sum the resident memory of the mappings of a file, in bytes:
+	result = 0
+	try:
+		realpath = os.path.realpath(path)
+		f = open('/proc/self/smaps')
+		inside = False
+		for line in f:
+			fields = line.split()
+			if len(fields)>=5 and '-' in fields[0]:
+				inside = len(fields)>=6 and fields[5]==realpath
+			elif inside and fields[0]=='Rss:':
+				result += int(fields[1])*1024
+		f.close()
+	except Exception:
+		return 0
+	return result
@@ -1,14 +1,22 @@
 import subprocess
+from lexenstein.workers import *
+from lexenstein.caches import *
 
 class MorphAdornerToolkit:
 
-	def __init__(self, path):
+	def __init__(self, path, workers=False, cache=None):
 		"""
 		Creates an instance of the MorphAdornerToolkit class.
 	
 		@param path: Path to the root installation folder of Morph Adorner Toolkit.
+		@param workers: If False, each call starts a new process of the jar required.
+		If True, each jar is started only once, and kept running to answer all calls of all MorphAdornerToolkit objects of the process.
+		@param cache: A MorphologyCache object in which to store the results of the jars.
+		If None, no results are stored, and all requests are sent to the jars.
 		"""
 		
+		self.workers = workers
+		self.cache = cache
 		self.root = path
 		if not self.root.endswith('/'):
 			self.root += '/'
@@ -28,17 +36,7 @@ class MorphAdornerToolkit:
 		@return: List of the lemmas of the words passed as input.
 		"""
 		
-		input = ''
-		for word in words:
-			input += word + '\n'
-		input += '\n'
-
-		args = ['java', '-jar', self.lemmatizer]
-		proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, shell=False)
-		(out, err) = proc.communicate(input)
-
-		result = out.strip().split('\n')
-		return result
+		return self.runJar(self.lemmatizer, words)
 		
 	def stemWords(self, words):
 		"""
@@ -48,17 +46,7 @@ class MorphAdornerToolkit:
 		@return: List of the Porter stems of the words passed as input.
 		"""
 	
-		input = ''
-		for word in words:
-			input += word + '\n'
-		input += '\n'
-
-		args = ['java', '-jar', self.stemmer]
-		proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, shell=False)
-		(out, err) = proc.communicate(input)
-
-		result = out.strip().split('\n')
-		return result
+		return self.runJar(self.stemmer, words)
 
 	def conjugateVerbs(self, lemmas, tense, person):
 		"""
@@ -72,19 +60,37 @@ class MorphAdornerToolkit:
 		@return: List of the conjugated versions of the verb lemmas passed as input.
 		"""
 		
-		input = ''
-		for lemma in lemmas:
-			input += lemma + ' ' + tense +  ' ' + person + '\n'
-		input += '\n'
+		lines = [lemma + ' ' + tense +  ' ' + person for lemma in lemmas]
+		return self.runJar(self.conjugator, lines)
 
-		args = ['java', '-jar', self.conjugator]
-		proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, shell=False)
-		(out, err) = proc.communicate(input)
 
-		result = out.strip().split('\n')
+	def conjugateVerbsTable(self, lemmas, tenses, persons=['FIRST_PERSON_SINGULAR']):
+		"""
+		Conjugate a set of verbs in several tenses and persons at once.
+		All conjugations are produced by a single request to the conjugator.
+	
+		@param lemmas: Lemmas of verbs to be conjugated.
+		@param tenses: List of tenses in which to conjugate the verbs.
+		Tenses available: PAST, PAST_PARTICIPLE, PAST_PERFECT, PAST_PERFECT_PARTICIPLE, PERFECT, PRESENT, PRESENT_PARTICIPLE.
+		@param persons: List of persons in which to conjugate the verbs.
+		Persons available: FIRST_PERSON_SINGULAR, FIRST_PERSON_PLURAL, SECOND_PERSON_SINGULAR, SECOND_PERSON_PLURAL, THIRD_PERSON_SINGULAR, THIRD_PERSON_PLURAL.
+		@return: Dictionary that assigns each (tense, person) tuple to the list of conjugated versions of the verb lemmas passed as input.
+		"""
+		
+		lines = []
+		for tense in tenses:
+			for person in persons:
+				lines.extend([lemma + ' ' + tense +  ' ' + person for lemma in lemmas])
+		data = self.runJar(self.conjugator, lines)
+		
+		result = {}
+		c = 0
+		for tense in tenses:
+			for person in persons:
+				result[(tense, person)] = data[c:c+len(lemmas)]
+				c += len(lemmas)
 		return result
 
-
 	def inflectNouns(self, lemmas, number):
 		"""
 		Inflect a list of nouns to its singular or plural form.
@@ -95,17 +101,8 @@ class MorphAdornerToolkit:
 		@return: List of the inflected versions of the noun lemmas passed as input.
 		"""
 		
-		input = ''
-		for lemma in lemmas:
-			input += lemma + ' ' + number +  '\n'
-		input += '\n'
-
-		args = ['java', '-jar', self.inflector]
-		proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, shell=False)
-		(out, err) = proc.communicate(input)
-
-		result = out.strip().split('\n')
-		return result
+		lines = [lemma + ' ' + number for lemma in lemmas]
+		return self.runJar(self.inflector, lines)
 
 	def tenseVerbs(self, lemmas, verbs):
 		"""
@@ -118,16 +115,8 @@ class MorphAdornerToolkit:
 		Persons available: FIRST_PERSON_SINGULAR, FIRST_PERSON_PLURAL, SECOND_PERSON_SINGULAR, SECOND_PERSON_PLURAL, THIRD_PERSON_SINGULAR, THIRD_PERSON_PLURAL.
 		"""
 		
-		input = ''
-		for i in range(0, len(lemmas)):
-			input += lemmas[i] + ' ' + verbs[i] +  '\n'
-		input += '\n'
-
-		args = ['java', '-jar', self.tenser]
-		proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, shell=False)
-		(out, err) = proc.communicate(input)
-
-		result = [line.strip().split(' ') for line in out.strip().split('\n')]
+		lines = [lemmas[i] + ' ' + verbs[i] for i in range(0, len(lemmas))]
+		result = [line.strip().split(' ') for line in self.runJar(self.tenser, lines)]
 		return result
 
 
@@ -139,17 +128,13 @@ class MorphAdornerToolkit:
 		@return: List of words with their syllables separated by hyphen markers.
 		"""
 		
-		input = ''
-		for word in words:
-			input += word + '\n'
-		input += '\n'
-
-		args = ['java', '-jar', self.syllabler]
-		proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, shell=False)
-		(out, err) = proc.communicate(input)
-		
-		out = out.replace('\xc2\xad', '-')
-		result = out.strip().split('\n')
+		result = self.runJar(self.syllabler, words)
+		#Replace soft hyphens, which are decoded from UTF-8 by workers, but not by processes:
+		for i in range(0, len(result)):
+			if isinstance(result[i], bytes):
+				result[i] = result[i].replace(b'\xc2\xad', b'-')
+			else:
+				result[i] = result[i].replace(u'\u00ad', u'-')
 		return result
 		
 	def inflectAdjectives(self, lemmas, form):
@@ -162,12 +147,45 @@ class MorphAdornerToolkit:
 		@return: List of the inflected versions of the adjective/adverb lemmas passed as input.
 		"""
 		
+		lines = [lemma + ' ' + form for lemma in lemmas]
+		return self.runJar(self.adjinflector, lines)
+
+	def runJar(self, jar, lines):
+		"""
+		Sends a list of lines to one of the jars of the MorphAdorner Toolkit, and returns the line produced for each of them.
+	
+		@param jar: Path to the jar.
+		@param lines: Lines to be processed.
+		@return: List with the output line of each line passed as input.
+		"""
+		
+		if self.cache:
+			#Workers and processes produce different types of strings, so their results are stored apart:
+			mode = 'workers' if self.workers else 'process'
+			return self.cache.getResults(jar, lines, lambda missing: self.executeJar(jar, missing), mode)
+		return self.executeJar(jar, lines)
+
+	def executeJar(self, jar, lines):
+		if self.workers:
+			#Empty lines end the input of the jars, so they are not sent:
+			requests = [line for line in lines if len(line.strip())>0]
+			responses = getMorphAdornerWorker(jar).processRequests(requests)
+			result = []
+			index = 0
+			for line in lines:
+				if len(line.strip())>0:
+					result.append(responses[index].strip())
+					index += 1
+				else:
+					result.append('')
+			return result
+	
 		input = ''
-		for lemma in lemmas:
-			input += lemma + ' ' + form +  '\n'
+		for line in lines:
+			input += line + '\n'
 		input += '\n'
 
-		args = ['java', '-jar', self.adjinflector]
+		args = ['java', '-jar', jar]
 		proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, shell=False)
 		(out, err) = proc.communicate(input)
 
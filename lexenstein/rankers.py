@@ -1,5 +1,6 @@
 import os
 import kenlm
+from lexenstein.languagemodels import *
 import math
 from keras.optimizers import *
 from keras.models import *
@@ -576,7 +577,7 @@ class BottRanker:
 		For more information on how to create the file, refer to the LEXenstein Manual.
 		"""
 		
-		self.simple_lm = kenlm.LanguageModel(simple_lm)
+		self.simple_lm = getLanguageModel(simple_lm)
 		
 	def getRankings(self, victor_corpus, a1=1.0, a2=1.0):
 		"""
@@ -635,7 +636,7 @@ class YamamotoRanker:
 		For instructions on how to create the model, please refer to the LEXenstein Manual.
 		"""
 		
-		self.simple_lm = kenlm.LanguageModel(simple_lm)
+		self.simple_lm = getLanguageModel(simple_lm)
 		self.cooc_model = self.getModel(cooc_model)
 		
 	def getRankings(self, victor_corpus, a1=1.0, a2=1.0, a3=1.0, a4=1.0, a5=1.0):
@@ -778,8 +779,8 @@ class BiranRanker:
 		For more information on how to create the file, refer to the LEXenstein Manual.
 		"""
 		
-		self.complex_lm = kenlm.LanguageModel(complex_lm)
-		self.simple_lm = kenlm.LanguageModel(simple_lm)
+		self.complex_lm = getLanguageModel(complex_lm)
+		self.simple_lm = getLanguageModel(simple_lm)
 		
 	def getRankings(self, victor_corpus):
 		"""
@@ -1,4 +1,7 @@
 from lexenstein.util import *
+from lexenstein.embeddings import *
+from lexenstein.caches import *
+from lexenstein.workers import *
 import pywsd
 import gensim
 from scipy.spatial.distance import cosine
@@ -722,7 +725,7 @@ class POSProbSelector:
 		Can be commonly found in "/usr/bin/java" in Unix/Linux systems, or in "C:/Program Files/Java/jdk_version/java.exe" in Windows systems.
 		"""
 		os.environ['JAVAHOME'] = java_path
-		self.tagger = StanfordPOSTagger(pos_model, stanford_tagger)
+		self.tagger = getPOSTagger(pos_model, stanford_tagger, java_path)
 		self.model = pickle.load(open(condprob_model, 'rb'))
 
 	def selectCandidates(self, substitutions, victor_corpus):
@@ -769,7 +772,7 @@ class POSProbSelector:
 		lexf.close()
 		
 		#Tag sentences:
-		tagged_sents = self.tagger.tag_sents(sents)
+		tagged_sents = tagSentences(self.tagger, sents)
 		
 		for i in range(0, len(sents)):
 			target = targets[i]
@@ -849,7 +852,7 @@ class AluisioSelector:
 		Can be commonly found in "/usr/bin/java" in Unix/Linux systems, or in "C:/Program Files/Java/jdk_version/java.exe" in Windows systems.
 		"""
 		os.environ['JAVAHOME'] = java_path
-		self.tagger = StanfordPOSTagger(pos_model, stanford_tagger)
+		self.tagger = getPOSTagger(pos_model, stanford_tagger, java_path)
 		self.model = pickle.load(open(condprob_model, 'rb'))
 
 	def selectCandidates(self, substitutions, victor_corpus):
@@ -896,7 +899,7 @@ class AluisioSelector:
 		lexf.close()
 		
 		#Tag sentences:
-		tagged_sents = self.tagger.tag_sents(sents)
+		tagged_sents = tagSentences(self.tagger, sents)
 		
 		for i in range(0, len(sents)):
 			target = targets[i]
@@ -1213,6 +1216,7 @@ class WordVectorSelector:
 	
 		@param vector_model: Path to a binary word vector model.
 		For instructions on how to create the model, please refer to the LEXenstein Manual.
+		An embedding store created with the convertWordVectorModel function can also be used.
 		@param pos_model: Path to a POS tagging model for the Stanford POS Tagger.
 		The models can be downloaded from the following link: http://nlp.stanford.edu/software/tagger.shtml
 		@param stanford_tagger: Path to the "stanford-postagger.jar" file.
@@ -1222,10 +1226,10 @@ class WordVectorSelector:
 		@param pos_type: The type of POS tags with which the model's words are annotated, if any.
 		Values supported: none, treebank, paetzold
 		"""
-		self.model = gensim.models.KeyedVectors.load_word2vec_format(vector_model, binary=True)
+		self.model = getWordVectorModel(vector_model)
 		self.pos_type = pos_type
 		os.environ['JAVAHOME'] = java_path
-		self.tagger = StanfordPOSTagger(pos_model, stanford_tagger)
+		self.tagger = getPOSTagger(pos_model, stanford_tagger, java_path)
 	
 	def selectCandidates(self, substitutions, victor_corpus, proportion=1.0, proportion_type='percentage', stop_words_file=None, window=99999, onlyInformative=False, keepTarget=False, onePerWord=False):
 		"""
@@ -1275,7 +1279,7 @@ class WordVectorSelector:
 		lexf = open(victor_corpus)
 		sents = [line.strip().split('\t')[0].strip().split(' ') for line in lexf]
 		lexf.close()
-		tagged_sents = self.tagger.tag_sents(sents)
+		tagged_sents = tagSentences(self.tagger, sents)
 		
 		#Transform them to the right format:
 		if self.pos_type=='paetzold':
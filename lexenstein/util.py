@@ -2,6 +2,7 @@ import nltk
 import pickle
 import shelve
 import re
+import numpy
 
 def dependencyParseSentences(parser, sentences):
 	"""
@@ -11,22 +12,25 @@ def dependencyParseSentences(parser, sentences):
 	If whitespaces exists inside a token, then the token will be treated as separate tokens.
 	This method is an adaptation of the code provided by NLTK.
 
-	@param parser: An instance of the nltk.parse.stanford.StanfordParser class.
+	@param parser: An instance of the nltk.parse.stanford.StanfordParser class, or a StanfordParserWorker object, as returned by getDependencyParser.
 	@param sentences: Input sentences to parse.
 	Each sentence must be a list of tokens.
 	@return A list of the dependency links of each sentence.
 	Each dependency link is composed by the relation type, the source word, its position in the sentence, the target word, and its position in the sentence.
 	"""
-	cmd = [
-		'edu.stanford.nlp.parser.lexparser.LexicalizedParser',
-		'-model', parser.model_path,
-		'-sentences', 'newline',
-		'-outputFormat', 'typedDependencies',
-		'-tokenized',
-		'-escaper', 'edu.stanford.nlp.process.PTBEscapingProcessor',
-	]
+	if hasattr(parser, 'getDependencyOutput'):
+		output = parser.getDependencyOutput(sentences)
+	else:
+		cmd = [
+			'edu.stanford.nlp.parser.lexparser.LexicalizedParser',
+			'-model', parser.model_path,
+			'-sentences', 'newline',
+			'-outputFormat', 'typedDependencies',
+			'-tokenized',
+			'-escaper', 'edu.stanford.nlp.process.PTBEscapingProcessor',
+		]
 
-	output=parser._execute(cmd, '\n'.join(' '.join(sentence) for sentence in sentences), False)
+		output=parser._execute(cmd, '\n'.join(' '.join(sentence) for sentence in sentences), False)
 
 	depexp = re.compile("([^\\(]+)\\(([^\\,]+)\\,\s([^\\)]+)\\)")
 
@@ -232,6 +236,7 @@ def addNgramCountsFileToShelve(ngrams_file, model_file):
 	Adds a n-gram counts file to an either new, or existing shelve dictionary.
 	The shelve file can then be used for the calculation of several features.
 	The file must be in the format produced by the "-write" option of SRILM ngram-count application.
+	For large files, consider creating a read-only count store with the "createNgramCountStore" function from the "counts" module instead.
 	
 	@param ngrams_file: File containing n-gram counts.
 	@param model_file: Shelve file in which to save the n-gram counts file.
@@ -380,3 +385,44 @@ def produceWordCooccurrenceModel(text_file, window, model_file):
 			newline += word + ':' + str(coocs[target][word]) + '\t'
 		out.write(newline.strip() + '\n')
 	out.close()
+
+def getWordVectorIndexes(model, words):
+	"""
+	Returns the indexes of a list of words in the vocabulary of a word vector model.
+
+	@param model: A word vector model, such as a gensim KeyedVectors object.
+	@param words: List of words.
+	@return A numpy array with the index of each word, or -1 for words not in the vocabulary.
+	"""
+	if hasattr(model, 'key_to_index'):
+		vocab = model.key_to_index
+		return numpy.array([vocab.get(word, -1) for word in words], dtype=numpy.int64)
+	vocab = model.vocab
+	result = numpy.empty(len(words), dtype=numpy.int64)
+	for i in range(0, len(words)):
+		entry = vocab.get(words[i], None)
+		if entry is None:
+			result[i] = -1
+		else:
+			result[i] = entry.index
+	return result
+
+def getUnitWordVectors(model, indexes):
+	"""
+	Returns the unit-normalized vectors of a list of vocabulary indexes of a word vector model.
+
+	@param model: A word vector model, such as a gensim KeyedVectors object.
+	@param indexes: Numpy array of vocabulary indexes, as produced by getWordVectorIndexes.
+	@return A numpy matrix with one unit vector per index.
+	Indexes equal to -1 are assigned vectors of zeroes.
+	"""
+	vectors = model.vectors if hasattr(model, 'vectors') else model.syn0
+	
+	#Normalize each distinct vector only once:
+	unique, inverse = numpy.unique(indexes, return_inverse=True)
+	unit = numpy.array(vectors[numpy.maximum(unique, 0)], dtype=numpy.float64)
+	norms = numpy.sqrt(numpy.einsum('ij,ij->i', unit, unit))
+	norms[norms==0] = 1.0
+	unit /= norms[:, numpy.newaxis]
+	unit[unique<0] = 0.0
+	return unit[inverse.reshape(-1)]
@@ -0,0 +1,398 @@
+import os
+import time
+import subprocess
+import threading
+import atexit
+from nltk.tag.stanford import StanfordPOSTagger
+from nltk.parse.stanford import StanfordParser
+
+#Whether taggers and parsers are served by long-lived worker processes:
+use_workers = False
+
+#Worker processes started in this process, indexed by their settings:
+loaded_workers = {}
+
+def setStanfordWorkers(enabled):
+	"""
+	Sets whether the Stanford POS taggers and parsers of LEXenstein's classes are served by long-lived worker processes.
+	Workers load their models once, and then tag or parse sentences as they are requested, which avoids starting a Java Virtual Machine at every call.
+	This affects all of LEXenstein's classes that receive the "pos_model", "stanford_tagger" and "java_path" parameters, as well as FeatureEstimator's dependency parsing features.
+
+	@param enabled: If True, taggers and parsers created from now on are served by workers.
+	"""
+	global use_workers
+	use_workers = enabled
+
+def getPOSTagger(pos_model, stanford_tagger, java_path, timeout=60):
+	"""
+	Returns a Stanford POS tagger.
+	If workers were enabled with setStanfordWorkers, all calls with the same model share the same worker.
+
+	@param pos_model: Path to a POS tagging model for the Stanford POS Tagger.
+	@param stanford_tagger: Path to the "stanford-postagger.jar" file.
+	@param java_path: Path to the system's "java" executable.
+	@param timeout: Maximum number of seconds the worker can take to tag a sentence before it is restarted.
+	@return A StanfordTaggerWorker object if workers are enabled, or an nltk.tag.stanford.StanfordPOSTagger object otherwise.
+	"""
+	if not use_workers:
+		os.environ['JAVAHOME'] = java_path
+		return StanfordPOSTagger(pos_model, stanford_tagger)
+	key = ('tagger', pos_model, stanford_tagger, java_path)
+	if key not in loaded_workers:
+		loaded_workers[key] = StanfordTaggerWorker(pos_model, stanford_tagger, java_path, timeout=timeout)
+	return loaded_workers[key]
+
+def getDependencyParser(stanford_parser, dependency_models, java_path, timeout=120):
+	"""
+	Returns a Stanford parser, to be used with the "dependencyParseSentences" function from the "util" module.
+	If workers were enabled with setStanfordWorkers, all calls with the same models share the same worker.
+
+	@param stanford_parser: Path to the "stanford-parser.jar" file.
+	@param dependency_models: Path to a JAR file containing parsing models.
+	@param java_path: Path to the system's "java" executable.
+	@param timeout: Maximum number of seconds the worker can take to parse a sentence before it is restarted.
+	@return A StanfordParserWorker object if workers are enabled, or an nltk.parse.stanford.StanfordParser object otherwise.
+	"""
+	if not use_workers:
+		os.environ['JAVAHOME'] = java_path
+		return StanfordParser(path_to_jar=stanford_parser, path_to_models_jar=dependency_models)
+	key = ('parser', stanford_parser, dependency_models, java_path)
+	if key not in loaded_workers:
+		loaded_workers[key] = StanfordParserWorker(stanford_parser, dependency_models, java_path, timeout=timeout)
+	return loaded_workers[key]
+
+def getMorphAdornerWorker(jar, java_path='java', timeout=60):
+	"""
+	Returns the worker process of a MorphAdorner jar.
+	Each jar is started only once per process: all MorphAdornerToolkit objects share the same workers.
+
+	@param jar: Path to one of the jars of the MorphAdorner Toolkit, such as "WordLemmatizer.jar".
+	@param java_path: Path to the system's "java" executable.
+	@param timeout: Maximum number of seconds the jar can take to answer a request before it is restarted.
+	@return A ProcessWorker object.
+	"""
+	key = ('morphadorner', jar, java_path)
+	if key not in loaded_workers:
+		loaded_workers[key] = ProcessWorker([java_path, '-jar', jar], timeout=timeout)
+	return loaded_workers[key]
+
+def closeWorkers():
+	"""
+	Stops all worker processes started in this process.
+	"""
+	for key in list(loaded_workers.keys()):
+		loaded_workers[key].close()
+		del loaded_workers[key]
+
+def detachWorkers():
+	"""
+	Forgets the worker processes inherited from a parent process, without stopping them.
+	Must be called by forked processes, since the pipes of a worker cannot be shared between processes.
+	"""
+	loaded_workers.clear()
+
+atexit.register(closeWorkers)
+
+class ProcessWorker:
+
+	def __init__(self, command, block_output=False, max_batch=1000, max_restarts=1, timeout=None):
+		"""
+		Creates an instance of the ProcessWorker class.
+		A ProcessWorker manages a long-lived process that reads one request per line from its standard input, and writes one response per request to its standard output.
+		Requests made by several threads at the same time are sent to the process together.
+		If the process dies, it is restarted, and the requests it had not answered are sent again.
+
+		@param command: Command that starts the process, as a list of arguments.
+		@param block_output: If False, each response is a single line.
+		If True, each response is a block of lines terminated by an empty line.
+		@param max_batch: Maximum number of requests to be written to the process before reading its responses.
+		@param max_restarts: Maximum number of times the process is restarted for a single batch of requests.
+		@param timeout: Maximum number of seconds the process can take to answer each request.
+		If the process takes longer, it is considered dead and restarted.
+		If None, the process can take any time.
+		"""
+		self.command = command
+		self.block_output = block_output
+		self.max_batch = max_batch
+		self.max_restarts = max_restarts
+		self.timeout = timeout
+		self.process = None
+		self.condition = threading.Condition()
+		self.queue = []
+		self.busy = False
+		self.restarts = 0
+
+	def start(self):
+		"""
+		Starts the worker process, if it is not running.
+		"""
+		if self.process is None or self.process.poll() is not None:
+			devnull = open(os.devnull, 'wb')
+			self.process = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=devnull)
+			devnull.close()
+
+	def restart(self):
+		"""
+		Kills the worker process and starts a new one.
+		"""
+		self.stop()
+		self.restarts += 1
+		self.start()
+
+	def stop(self):
+		if self.process is not None:
+			try:
+				self.process.kill()
+				self.process.wait()
+			except Exception:
+				pass
+			self.process = None
+
+	def close(self):
+		"""
+		Stops the worker process once it finishes the requests it received.
+		"""
+		with self.condition:
+			if self.process is not None:
+				try:
+					self.process.stdin.close()
+					self.process.wait()
+				except Exception:
+					self.stop()
+				self.process = None
+
+	def processRequests(self, requests):
+		"""
+		Sends a list of requests to the worker process, and waits for their responses.
+		Can be called by several threads at the same time.
+
+		@param requests: List of requests, each one a single line.
+		@return A list with the response to each request.
+		If "block_output" is True, each response is a list of lines.
+		"""
+		entry = {'requests': requests, 'responses': None, 'error': None, 'done': threading.Event()}
+		with self.condition:
+			self.queue.append(entry)
+			leader = not self.busy
+			self.busy = True
+
+		#The first thread to arrive sends the requests of all threads waiting:
+		if leader:
+			self.dispatch()
+		entry['done'].wait()
+		if entry['error'] is not None:
+			raise entry['error']
+		return entry['responses']
+
+	def dispatch(self):
+		while True:
+			with self.condition:
+				if len(self.queue)==0:
+					self.busy = False
+					return
+				entries = self.queue
+				self.queue = []
+			requests = []
+			for entry in entries:
+				requests.extend(entry['requests'])
+			try:
+				responses = self.communicate(requests)
+				start = 0
+				for entry in entries:
+					entry['responses'] = responses[start:start+len(entry['requests'])]
+					start += len(entry['requests'])
+			except Exception as error:
+				for entry in entries:
+					entry['error'] = error
+			for entry in entries:
+				entry['done'].set()
+
+	def communicate(self, requests):
+		responses = []
+		for i in range(0, len(requests), self.max_batch):
+			batch = requests[i:i+self.max_batch]
+			attempts = 0
+			while True:
+				try:
+					self.start()
+					responses.extend(self.communicateBatch(batch))
+					break
+				except (IOError, OSError, EOFError):
+					attempts += 1
+					if attempts>self.max_restarts:
+						self.stop()
+						raise RuntimeError('Worker process failed: ' + ' '.join(self.command))
+					self.restart()
+		return responses
+
+	def communicateBatch(self, batch):
+		#Write requests in a separate thread, so that the process is never blocked by a full output pipe:
+		process = self.process
+		data = ''.join([request.replace('\n', ' ') + '\n' for request in batch]).encode('utf8')
+		def write():
+			try:
+				process.stdin.write(data)
+				process.stdin.flush()
+			except Exception:
+				pass
+		writer = threading.Thread(target=write)
+		writer.daemon = True
+		writer.start()
+
+		#Kill the process if it stops answering, which makes the reads below fail:
+		progress = [time.time()]
+		finished = threading.Event()
+		if self.timeout is not None:
+			watcher = threading.Thread(target=self.watch, args=(process, progress, finished))
+			watcher.daemon = True
+			watcher.start()
+
+		#Read responses:
+		responses = []
+		try:
+			for request in batch:
+				if self.block_output:
+					lines = []
+					line = self.readLine(process)
+					while line!='':
+						lines.append(line)
+						line = self.readLine(process)
+					responses.append(lines)
+				else:
+					responses.append(self.readLine(process))
+				progress[0] = time.time()
+		finally:
+			finished.set()
+		writer.join()
+		return responses
+
+	def watch(self, process, progress, finished):
+		while not finished.wait(min(self.timeout, 1.0)):
+			if time.time()-progress[0]>self.timeout:
+				self.kill(process)
+				return
+
+	def kill(self, process):
+		try:
+			process.kill()
+		except Exception:
+			pass
+
+	def readLine(self, process):
+		line = process.stdout.readline()
+		if len(line)==0:
+			raise EOFError('Worker process ended unexpectedly.')
+		return line.decode('utf8', 'replace').rstrip('\r\n')
+
+class StanfordTaggerWorker:
+
+	def __init__(self, pos_model, stanford_tagger, java_path, memory='2g', separator='_', timeout=60):
+		"""
+		Creates an instance of the StanfordTaggerWorker class.
+		A StanfordTaggerWorker tags sentences with a long-lived Stanford POS Tagger process, and can be used in place of nltk.tag.stanford.StanfordPOSTagger objects.
+		Instead of creating instances of this class directly, it is recommended to use the getPOSTagger function.
+
+		@param pos_model: Path to a POS tagging model for the Stanford POS Tagger.
+		The models can be downloaded from the following link: http://nlp.stanford.edu/software/tagger.shtml
+		@param stanford_tagger: Path to the "stanford-postagger.jar" file.
+		The tagger can be downloaded from the following link: http://nlp.stanford.edu/software/tagger.shtml
+		@param java_path: Path to the system's "java" executable.
+		Can be commonly found in "/usr/bin/java" in Unix/Linux systems, or in "C:/Program Files/Java/jdk_version/java.exe" in Windows systems.
+		@param memory: Maximum heap size of the Java Virtual Machine.
+		@param separator: Separator between words and tags in the output of the tagger.
+		@param timeout: Maximum number of seconds the tagger can take to tag a sentence before it is restarted.
+		"""
+		self._stanford_model = pos_model
+		self.separator = separator
+		command = [java_path, '-mx'+memory, '-cp', stanford_tagger, 'edu.stanford.nlp.tagger.maxent.MaxentTagger']
+		command += ['-model', pos_model, '-tokenize', 'false', '-sentenceDelimiter', 'newline', '-outputFormat', 'slashTags', '-tagSeparator', separator, '-encoding', 'utf8']
+		self.worker = ProcessWorker(command, timeout=timeout)
+
+	def tag_sents(self, sentences):
+		"""
+		Tags a set of sentences.
+
+		@param sentences: List of sentences, each one a list of tokens.
+		@return A list with the (word, tag) pairs of each sentence.
+		"""
+		#Empty lines produce no output, so empty sentences are not sent:
+		requests = []
+		indexes = []
+		for i in range(0, len(sentences)):
+			if len(sentences[i])>0:
+				requests.append(' '.join(sentences[i]))
+				indexes.append(i)
+		responses = self.worker.processRequests(requests)
+
+		result = [[] for sentence in sentences]
+		for i in range(0, len(indexes)):
+			tagged = []
+			for token in responses[i].strip().split(' '):
+				separator = token.rfind(self.separator)
+				tagged.append((token[0:separator], token[separator+len(self.separator):]))
+			result[indexes[i]] = tagged
+		return result
+
+	def tag(self, tokens):
+		"""
+		Tags a sentence.
+
+		@param tokens: List of tokens.
+		@return A list of (word, tag) pairs.
+		"""
+		return self.tag_sents([tokens])[0]
+
+	def close(self):
+		"""
+		Stops the worker process.
+		"""
+		self.worker.close()
+
+class StanfordParserWorker:
+
+	def __init__(self, stanford_parser, dependency_models, java_path, model_path='edu/stanford/nlp/models/lexparser/englishPCFG.ser.gz', memory='4g', timeout=120):
+		"""
+		Creates an instance of the StanfordParserWorker class.
+		A StanfordParserWorker produces dependency parses with a long-lived Stanford Parser process, and can be used in place of nltk.parse.stanford.StanfordParser objects by the "dependencyParseSentences" function from the "util" module.
+		Instead of creating instances of this class directly, it is recommended to use the getDependencyParser function.
+
+		@param stanford_parser: Path to the "stanford-parser.jar" file.
+		The parser can be downloaded from the following link: http://nlp.stanford.edu/software/lex-parser.shtml
+		@param dependency_models: Path to a JAR file containing parsing models.
+		The models can be downloaded from the following link: http://nlp.stanford.edu/software/lex-parser.shtml
+		@param java_path: Path to the system's "java" executable.
+		Can be commonly found in "/usr/bin/java" in Unix/Linux systems, or in "C:/Program Files/Java/jdk_version/java.exe" in Windows systems.
+		@param model_path: Path to the parsing model inside the models JAR file.
+		@param memory: Maximum heap size of the Java Virtual Machine.
+		@param timeout: Maximum number of seconds the parser can take to parse a sentence before it is restarted.
+		"""
+		self.model_path = model_path
+		command = [java_path, '-mx'+memory, '-cp', stanford_parser + os.pathsep + dependency_models, 'edu.stanford.nlp.parser.lexparser.LexicalizedParser']
+		command += ['-model', model_path, '-sentences', 'newline', '-outputFormat', 'typedDependencies', '-tokenized', '-escaper', 'edu.stanford.nlp.process.PTBEscapingProcessor', '-encoding', 'utf8', '-']
+		self.worker = ProcessWorker(command, block_output=True, timeout=timeout)
+
+	def getDependencyOutput(self, sentences):
+		"""
+		Parses a set of sentences.
+
+		@param sentences: List of sentences, each one a list of tokens.
+		@return The output of the parser, in the format read by the "dependencyParseSentences" function from the "util" module.
+		"""
+		#Empty lines produce no output, so empty sentences are not sent:
+		requests = [' '.join(sentence) for sentence in sentences if len(sentence)>0]
+		responses = self.worker.processRequests(requests)
+		output = ''
+		index = 0
+		for sentence in sentences:
+			if len(sentence)>0:
+				output += '\n'.join(responses[index]+['']) + '\n'
+				index += 1
+			else:
+				output += '\n'
+		return output
+
+	def close(self):
+		"""
+		Stops the worker process.
+		"""
+		self.worker.close()
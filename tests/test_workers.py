@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from lexenstein.workers import *
+
+#Fake worker that answers each line in upper case.
+#The first "crash" request ends the process, and the first "stall" request makes it stop answering.
+fake_worker = '''import os
+import sys
+import time
+folder = sys.argv[1]
+block = len(sys.argv)>2
+while True:
+	line = sys.stdin.readline()
+	if len(line)==0:
+		break
+	line = line.strip()
+	marker = os.path.join(folder, line)
+	if line in ['crash', 'stall'] and not os.path.exists(marker):
+		open(marker, 'w').close()
+		if line=='crash':
+			sys.exit(1)
+		time.sleep(3600)
+	sys.stdout.write(line.upper() + '\\n')
+	if block:
+		sys.stdout.write('\\n')
+	sys.stdout.flush()
+'''
+
+class ProcessWorkerTest(unittest.TestCase):
+
+	def setUp(self):
+		self.folder = tempfile.mkdtemp()
+		self.script = os.path.join(self.folder, 'worker.py')
+		f = open(self.script, 'w')
+		f.write(fake_worker)
+		f.close()
+		self.workers = []
+
+	def tearDown(self):
+		for worker in self.workers:
+			worker.stop()
+		shutil.rmtree(self.folder)
+
+	def getWorker(self, block_output=False, timeout=None):
+		command = [sys.executable, self.script, self.folder]
+		if block_output:
+			command.append('block')
+		worker = ProcessWorker(command, block_output=block_output, max_batch=7, timeout=timeout)
+		self.workers.append(worker)
+		return worker
+
+	def testConcurrentRequests(self):
+		worker = self.getWorker()
+		results = {}
+		def run(thread):
+			requests = ['t%d r%d' % (thread, i) for i in range(0, 50)]
+			results[thread] = (requests, worker.processRequests(requests))
+		threads = [threading.Thread(target=run, args=(i,)) for i in range(0, 8)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		for thread in results:
+			requests, responses = results[thread]
+			self.assertEqual(responses, [request.upper() for request in requests])
+		self.assertEqual(worker.restarts, 0)
+
+	def testBlockOutput(self):
+		worker = self.getWorker(block_output=True)
+		self.assertEqual(worker.processRequests(['a', 'b c']), [['A'], ['B C']])
+
+	def testCrashIsResent(self):
+		worker = self.getWorker()
+		requests = ['a', 'b', 'crash', 'c']
+		self.assertEqual(worker.processRequests(requests), ['A', 'B', 'CRASH', 'C'])
+		self.assertEqual(worker.restarts, 1)
+
+	def testStallIsKilled(self):
+		worker = self.getWorker(timeout=1)
+		start = time.time()
+		self.assertEqual(worker.processRequests(['a', 'stall', 'b']), ['A', 'STALL', 'B'])
+		self.assertEqual(worker.restarts, 1)
+		self.assertTrue(time.time()-start<30)
+
+	def testRepeatedFailuresRaise(self):
+		worker = ProcessWorker([sys.executable, '-c', 'import sys; sys.exit(1)'], max_restarts=1)
+		self.workers.append(worker)
+		self.assertRaises(RuntimeError, worker.processRequests, ['a'])
+
+if __name__ == '__main__':
+	unittest.main()